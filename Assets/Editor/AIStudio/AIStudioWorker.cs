@@ -0,0 +1,224 @@
+// Long-lived batchmode worker driven by utils/unity_worker.py.
+// Start: Unity -batchmode -projectPath <p> -executeMethod AIUnityStudio.Editor.AIStudioWorker.Run -workerDir <dir>
+// Jobs arrive as <dir>/jobs/<id>.json, results are written to <dir>/done/<id>.json.
+using System;
+using System.IO;
+using System.Linq;
+using System.Text;
+using UnityEditor;
+using UnityEditor.Build.Reporting;
+using UnityEditor.TestTools.TestRunner.Api;
+using UnityEngine;
+
+namespace AIUnityStudio.Editor
+{
+    [InitializeOnLoad]
+    public static class AIStudioWorker
+    {
+        const string DirKey = "AIStudioWorker.Dir";
+        const string JobKey = "AIStudioWorker.Job";
+        const string StateKey = "AIStudioWorker.State";
+
+        [Serializable]
+        class Job
+        {
+            public string id;
+            public string kind;
+            public string platform;
+            public string results;
+            public string filter;
+            public string target;
+            public string output;
+        }
+
+        [Serializable]
+        class Done
+        {
+            public string id;
+            public int returncode;
+            public string log;
+        }
+
+        static double _lastBeat;
+
+        // domain reloads (script changes, PlayMode tests) reset statics, so the
+        // worker state lives in SessionState and is picked up again here
+        static AIStudioWorker()
+        {
+            if (!string.IsNullOrEmpty(SessionState.GetString(DirKey, "")))
+            {
+                Attach();
+            }
+        }
+
+        public static void Run()
+        {
+            var args = Environment.GetCommandLineArgs();
+            var i = Array.IndexOf(args, "-workerDir");
+            var dir = i >= 0 && i + 1 < args.Length ? args[i + 1] : "Temp/AIStudioWorker";
+            Directory.CreateDirectory(Path.Combine(dir, "jobs"));
+            Directory.CreateDirectory(Path.Combine(dir, "done"));
+            SessionState.SetString(DirKey, dir);
+            SessionState.SetString(StateKey, "idle");
+            Attach();
+        }
+
+        static string WorkerDir => SessionState.GetString(DirKey, "");
+
+        static void Attach()
+        {
+            var api = ScriptableObject.CreateInstance<TestRunnerApi>();
+            api.RegisterCallbacks(new TestCallbacks());
+            EditorApplication.update -= Tick;
+            EditorApplication.update += Tick;
+        }
+
+        static void Beat()
+        {
+            if (EditorApplication.timeSinceStartup - _lastBeat < 1.0)
+            {
+                return;
+            }
+            _lastBeat = EditorApplication.timeSinceStartup;
+            var now = DateTimeOffset.UtcNow.ToUnixTimeMilliseconds() / 1000.0;
+            File.WriteAllText(Path.Combine(WorkerDir, "heartbeat"), now.ToString(System.Globalization.CultureInfo.InvariantCulture));
+        }
+
+        static void Tick()
+        {
+            if (string.IsNullOrEmpty(WorkerDir))
+            {
+                return;
+            }
+            Beat();
+            if (EditorApplication.isCompiling || EditorApplication.isUpdating)
+            {
+                return;
+            }
+            var state = SessionState.GetString(StateKey, "idle");
+            if (state == "running")
+            {
+                return;
+            }
+            if (state == "refreshed")
+            {
+                // the job waited for the import and any recompilation to finish
+                Execute(JsonUtility.FromJson<Job>(SessionState.GetString(JobKey, "{}")));
+                return;
+            }
+
+            var next = Directory.GetFiles(Path.Combine(WorkerDir, "jobs"), "*.json").OrderBy(p => p).FirstOrDefault();
+            if (next == null)
+            {
+                return;
+            }
+            var text = File.ReadAllText(next);
+            File.Delete(next);
+            SessionState.SetString(JobKey, text);
+            SessionState.SetString(StateKey, "refreshed");
+            // pick up files the pipeline wrote since the last job
+            AssetDatabase.Refresh();
+        }
+
+        static void Execute(Job job)
+        {
+            SessionState.SetString(StateKey, "running");
+            try
+            {
+                switch (job.kind)
+                {
+                    case "tests":
+                        RunTests(job);
+                        break;
+                    case "build":
+                        Build(job);
+                        break;
+                    case "shutdown":
+                        Finish(job.id, 0, "bye");
+                        EditorApplication.Exit(0);
+                        break;
+                    default:
+                        Finish(job.id, 1, $"unknown job kind '{job.kind}'");
+                        break;
+                }
+            }
+            catch (Exception e)
+            {
+                Finish(job.id, 1, e.ToString());
+            }
+        }
+
+        static void RunTests(Job job)
+        {
+            var mode = job.platform == "PlayMode" ? TestMode.PlayMode : TestMode.EditMode;
+            var filter = new Filter { testMode = mode };
+            if (!string.IsNullOrEmpty(job.filter))
+            {
+                filter.groupNames = job.filter.Split(';');
+            }
+            var api = ScriptableObject.CreateInstance<TestRunnerApi>();
+            api.Execute(new ExecutionSettings(filter));
+        }
+
+        static void Build(Job job)
+        {
+            var target = (BuildTarget)Enum.Parse(typeof(BuildTarget), job.target);
+            var options = new BuildPlayerOptions
+            {
+                scenes = EditorBuildSettings.scenes.Where(s => s.enabled).Select(s => s.path).ToArray(),
+                locationPathName = job.output,
+                target = target,
+                options = BuildOptions.None,
+            };
+            var report = BuildPipeline.BuildPlayer(options);
+            var log = new StringBuilder();
+            foreach (var step in report.steps)
+            {
+                foreach (var message in step.messages)
+                {
+                    log.AppendLine($"{message.type}: {message.content}");
+                }
+            }
+            log.AppendLine($"Build {report.summary.result}");
+            Finish(job.id, report.summary.result == BuildResult.Succeeded ? 0 : 1, log.ToString());
+        }
+
+        static void Finish(string id, int returncode, string log)
+        {
+            var done = new Done { id = id, returncode = returncode, log = log };
+            var path = Path.Combine(WorkerDir, "done", id + ".json");
+            File.WriteAllText(path + ".tmp", JsonUtility.ToJson(done));
+            File.Move(path + ".tmp", path);
+            SessionState.SetString(StateKey, "idle");
+        }
+
+        class TestCallbacks : ICallbacks
+        {
+            public void RunStarted(ITestAdaptor testsToRun) { }
+
+            public void RunFinished(ITestResultAdaptor result)
+            {
+                var job = JsonUtility.FromJson<Job>(SessionState.GetString(JobKey, "{}"));
+                if (job.kind != "tests")
+                {
+                    return;
+                }
+                // same test-run document the -runTests CLI writes
+                var xml = new StringBuilder();
+                xml.Append($"<test-run id=\"2\" testcasecount=\"{result.Test.TestCaseCount}\" result=\"{result.ResultState}\" ");
+                xml.Append($"total=\"{result.PassCount + result.FailCount + result.SkipCount + result.InconclusiveCount}\" ");
+                xml.Append($"passed=\"{result.PassCount}\" failed=\"{result.FailCount}\" ");
+                xml.Append($"inconclusive=\"{result.InconclusiveCount}\" skipped=\"{result.SkipCount}\" asserts=\"{result.AssertCount}\" ");
+                xml.Append($"duration=\"{result.Duration}\">");
+                xml.Append(result.ToXml().OuterXml);
+                xml.Append("</test-run>");
+                File.WriteAllText(job.results, xml.ToString());
+                Finish(job.id, result.FailCount > 0 ? 2 : 0, $"{result.PassCount} passed, {result.FailCount} failed");
+            }
+
+            public void TestStarted(ITestAdaptor test) { }
+
+            public void TestFinished(ITestResultAdaptor result) { }
+        }
+    }
+}
@@ -1,28 +1,74 @@
-"""Simple agent learning mechanism based on previous interactions."""
+"""Simple agent learning mechanism based on previous interactions.
+
+Hints come from the most similar successful input of the same agent
+(``difflib`` ratio above 0.7). An input seen before is found by its
+``hash``; for agents with at least ``EXACT_SCAN_LIMIT`` successes the
+candidates are taken from a MinHash LSH index over character 3-grams
+instead of comparing against every stored input.
+
+The log is bounded per agent: :func:`compact` keeps the newest
+``LEARNING_MAX_ENTRIES`` entries younger than ``LEARNING_MAX_AGE_DAYS``
+and only the latest success per input hash. It runs for an agent once it
+has recorded ``LEARNING_COMPACT_EVERY`` entries since its last compaction
+(the last compacted id per agent is kept under ``learning_compacted``) and
+for the whole log from ``tools/memctl.py compact``. Outputs longer than
+``LEARNING_BLOB_MIN_SIZE`` are kept in :mod:`utils.blob_store`; the entry
+holds a short preview in ``output`` and the digest in ``output_blob``.
+Blobs of removed entries are deleted by every compaction; a full one also
+drops any other blob no entry refers to.
+"""
 
 from __future__ import annotations
 
 import difflib
 import hashlib
 import json
+import os
+import struct
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
 from typing import Any, Dict, List
 
 import agent_memory
+from utils import blob_store
 from utils.agent_journal import log_action
 
+MAX_ENTRIES = int(os.getenv("LEARNING_MAX_ENTRIES", "1000"))
+MAX_AGE_DAYS = float(os.getenv("LEARNING_MAX_AGE_DAYS", "90"))
+BLOB_MIN_SIZE = int(os.getenv("LEARNING_BLOB_MIN_SIZE", "4096"))
+COMPACT_EVERY = int(os.getenv("LEARNING_COMPACT_EVERY", "100"))
+_PREVIEW = 200
+
 _LOG_KEY = "learning_log"
+_COMPACTED_KEY = "learning_compacted"
+# below this many successes a full scan is cheap and exact
+EXACT_SCAN_LIMIT = 200
+_THRESHOLD = 0.7
+# 8 bands of 4 rows: inputs with ~0.6 shingle similarity collide in a band
+_BANDS, _ROWS = 8, 4
+_SHINGLE = 3
+# candidates from the index compared with difflib
+_CANDIDATES = 8
+_INDEX_FIELDS = ("hash", "result", "bands")
+
 
+@dataclass
+class _Index:
+    generation: int = 0
+    last_id: int = 0
+    successes: int = 0
+    exact: Dict[str, int] = field(default_factory=dict)
+    bands: Dict[int, List[int]] = field(default_factory=dict)
 
-def _load_log() -> Dict[str, List[dict]]:
-    log = agent_memory.read(_LOG_KEY)
-    if log is None:
-        log = {}
-        agent_memory.write(_LOG_KEY, log)
-    return log
 
+_indexes: Dict[tuple, _Index] = {}
+_indexes_lock = threading.Lock()
 
-def _save_log(log: Dict[str, List[dict]]) -> None:
-    agent_memory.write(_LOG_KEY, log)
+
+def _load_entries(agent_name: str) -> List[dict]:
+    return agent_memory.read(_LOG_KEY, agent_name) or []
 
 
 def _normalize(data: Any) -> str:
@@ -38,36 +84,194 @@ def _hash(text: str) -> str:
     return hashlib.sha256(text.encode("utf-8")).hexdigest()
 
 
+def _bands(text: str) -> List[int]:
+    """Return the LSH band keys of the MinHash signature of ``text``."""
+    shingles = {"".join(chars) for chars in zip(*(text[k:] for k in range(_SHINGLE)))} or {text}
+    # each 64-byte blake2b digest provides 16 of the hash functions
+    salts = [b"minhash%d" % k for k in range(_BANDS * _ROWS // 16)]
+    rows = [
+        struct.unpack(
+            f"<{_BANDS * _ROWS}I",
+            b"".join(hashlib.blake2b(s.encode("utf-8"), digest_size=64, person=salt).digest() for salt in salts),
+        )
+        for s in shingles
+    ]
+    mins = [min(col) for col in zip(*rows)]
+    # band b holds every _BANDS-th minimum, starting at b
+    packed = [struct.pack(f"<{_ROWS + 1}I", b, *mins[b::_BANDS]) for b in range(_BANDS)]
+    return [int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little") for data in packed]
+
+
+def _add(index: _Index, rows: List[tuple]) -> None:
+    missing = [row_id for row_id, _, value in rows if value.get("result") == "success" and not value.get("bands")]
+    # entries stored before the index existed carry no band keys
+    inputs = {row_id: value.get("input", "") for row_id, value in agent_memory.log_values(missing).items()}
+    for row_id, _, value in rows:
+        index.last_id = row_id
+        if value.get("result") != "success":
+            continue
+        index.successes += 1
+        index.exact[value.get("hash")] = row_id
+        for band in value.get("bands") or _bands(inputs.get(row_id, "")):
+            index.bands.setdefault(band, []).append(row_id)
+
+
+def _index(agent_name: str) -> _Index:
+    """Return the index of ``agent_name``, updated with rows appended since."""
+    key = (str(agent_memory.DB_PATH), agent_name)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        generation, last_id = agent_memory.log_state(_LOG_KEY, agent_name)
+        if index is None or index.generation != generation:
+            # rows were rewritten or removed: start over
+            index = _indexes[key] = _Index(generation)
+        if last_id != index.last_id:
+            _add(index, list(agent_memory.iter_log(_LOG_KEY, agent_name, after=index.last_id, fields=_INDEX_FIELDS)))
+        return index
+
+
 def record_interaction(agent_name: str, input_data: Any, output: Any, result: str) -> None:
     """Store interaction details in shared memory."""
+    if not agent_memory.enabled():
+        # nothing would refer to the blob or use the bands
+        return
     input_str = _normalize(input_data)
     output_str = _normalize(output)
-    entry = {
-        "hash": _hash(input_str),
-        "input": input_str,
-        "output": output_str,
-        "result": result,
-    }
-    log = _load_log()
-    log.setdefault(agent_name, []).append(entry)
-    _save_log(log)
+    entry = _store_output(
+        {
+            "hash": _hash(input_str),
+            "input": input_str,
+            "output": output_str,
+            "result": result,
+            "ts": time.time(),
+        }
+    )
+    if result == "success":
+        entry["bands"] = _bands(input_str)
+    # one appended row per call instead of rewriting the whole log
+    row_id = agent_memory.append(_LOG_KEY, agent_name, entry)
     log_action("Learning", f"record {agent_name} {result}")
+    if row_id and COMPACT_EVERY > 0 and _compaction_due(agent_name):
+        compact(agent_name)
 
 
-def get_agent_hint(agent_name: str, input_data: Any) -> str | None:
-    """Return best matching successful output from past interactions."""
-    input_str = _normalize(input_data)
-    log = _load_log()
-    entries = log.get(agent_name, [])
+def _compaction_due(agent_name: str) -> bool:
+    compacted = agent_memory.read(_COMPACTED_KEY) or {}
+    return agent_memory.count_log(_LOG_KEY, agent_name, after=compacted.get(agent_name, 0)) >= COMPACT_EVERY
+
+
+def _store_output(entry: dict) -> dict:
+    """Move a large output into the blob store, keeping a preview."""
+    output = entry.get("output")
+    if isinstance(output, str) and len(output) > BLOB_MIN_SIZE:
+        entry["output_blob"] = blob_store.put(output)
+        entry["output"] = output[:_PREVIEW]
+    return entry
+
+
+def _output(entry: dict) -> str | None:
+    if entry.get("output_blob"):
+        stored = blob_store.get_text(entry["output_blob"])
+        if stored is not None:
+            return stored
+    return entry.get("output")
+
+
+def _best(candidates: List[dict], input_str: str) -> str | None:
     best_ratio = 0.0
-    best_output = None
-    for item in entries:
+    best = None
+    for item in candidates:
         if item.get("result") != "success":
             continue
         ratio = difflib.SequenceMatcher(None, item.get("input", ""), input_str).ratio()
-        if ratio > 0.7 and ratio > best_ratio:
+        if ratio > _THRESHOLD and ratio > best_ratio:
             best_ratio = ratio
-            best_output = item.get("output")
+            best = item
+    return _output(best) if best else None
+
+
+def _retained(rows: List[tuple], now: float) -> set:
+    """Return the ids of ``rows`` (oldest first) kept by the retention policy."""
+    keep = set()
+    successes = set()
+    for row_id, _, value in reversed(rows):
+        if len(keep) >= MAX_ENTRIES:
+            break
+        ts = value.get("ts")
+        if ts is not None and now - ts > MAX_AGE_DAYS * 86400:
+            continue
+        if value.get("result") == "success":
+            if value.get("hash") in successes:
+                continue
+            successes.add(value.get("hash"))
+        keep.add(row_id)
+    return keep
+
+
+def compact(agent_name: str | None = None) -> Dict[str, int]:
+    """Apply the retention policy to one agent or, by default, the whole log.
+
+    The blobs of removed entries are deleted unless another entry still
+    refers to them. A full compaction also moves large outputs stored inline
+    into the blob store and deletes every blob no entry refers to.
+    """
+    agents = [agent_name] if agent_name else agent_memory.log_buckets(_LOG_KEY)
+    now = time.time()
+    stats = {"removed": 0, "kept": 0, "blobs_moved": 0, "blobs_removed": 0}
+    compacted = {}
+    orphans = set()
+    for agent in agents:
+        rows = list(agent_memory.iter_log(_LOG_KEY, agent, fields=("hash", "result", "ts", "output_blob")))
+        keep = _retained(rows, now)
+        removed = [(row_id, value) for row_id, _, value in rows if row_id not in keep]
+        stats["removed"] += agent_memory.delete_log(_LOG_KEY, [row_id for row_id, _ in removed])
+        stats["kept"] += len(keep)
+        orphans.update(value["output_blob"] for _, value in removed if value.get("output_blob"))
+        if rows:
+            compacted[agent] = rows[-1][0]
+    with agent_memory.lock:
+        agent_memory.write(_COMPACTED_KEY, {**(agent_memory.read(_COMPACTED_KEY) or {}), **compacted})
+    if agent_name is not None and orphans:
+        # identical outputs share a blob: keep the ones other entries still use
+        rows = agent_memory.iter_log(_LOG_KEY, fields=("output_blob",))
+        referenced = {value.get("output_blob") for _, _, value in rows}
+        stats["blobs_removed"] = blob_store.gc(referenced & orphans, candidates=orphans)
+    if agent_name is None:
+        referenced = set()
+        rows = list(agent_memory.iter_log(_LOG_KEY, fields=("output_blob",)))
+        for row_id, _, value in rows:
+            if value.get("output_blob"):
+                referenced.add(value["output_blob"])
+        # entries written before the blob store carry their outputs inline
+        inline = [row_id for row_id, _, value in rows if not value.get("output_blob")]
+        for start in range(0, len(inline), 500):
+            end = start + 500
+            moved = {}
+            for row_id, value in agent_memory.log_values(inline[start:end]).items():
+                if value.get("output_blob") is None and _store_output(value).get("output_blob"):
+                    moved[row_id] = value
+                    referenced.add(value["output_blob"])
+            agent_memory.update_log(moved)
+            stats["blobs_moved"] += len(moved)
+        stats["blobs_removed"] = blob_store.gc(referenced)
+    log_action("Learning", f"compact {agent_name or 'all'}: {stats}")
+    return stats
+
+
+def get_agent_hint(agent_name: str, input_data: Any) -> str | None:
+    """Return best matching successful output from past interactions."""
+    input_str = _normalize(input_data)
+    index = _index(agent_name)
+    exact = index.exact.get(_hash(input_str))
+    if exact is not None:
+        best_output = _output(agent_memory.log_values([exact]).get(exact, {}))
+    elif index.successes < EXACT_SCAN_LIMIT:
+        best_output = _best(_load_entries(agent_name), input_str)
+    else:
+        votes = Counter(row_id for band in _bands(input_str) for row_id in index.bands.get(band, ()))
+        ids = [row_id for row_id, _ in votes.most_common(_CANDIDATES)]
+        values = agent_memory.log_values(ids)
+        best_output = _best([values[row_id] for row_id in ids if row_id in values], input_str)
     if best_output:
         log_action("Learning", f"hint {agent_name}")
     return best_output
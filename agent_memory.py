@@ -1,44 +1,406 @@
+"""Shared memory between agents.
+
+Values are kept in SQLite (``agent_memory.db``, WAL mode): ``write`` replaces
+one key, ``append`` adds one row to a keyed log, so neither rewrites the
+whole store and several processes can use it at once. Reads load only the
+requested key (or one bucket of a log). ``agent_memory.json`` is imported on
+first use and rewritten by :func:`snapshot` when a process that changed the
+store exits, for tools that read the file directly.
+
+Analytics code reads with :func:`iter_entries` and :func:`iter_items`,
+which stream from the database (or from a JSON file such as a snapshot)
+without enabling memory.
+"""
+
+from __future__ import annotations
+
+import atexit
 import json
+import os
+import sqlite3
+import threading
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, Iterator, Sequence, Tuple
 
 from utils.agent_journal import log_action
 
 MEMORY_PATH = Path("agent_memory.json")
+DB_PATH = Path(os.getenv("AGENT_MEMORY_DB", "agent_memory.db"))
 _enabled = False
-_data: Dict[str, Any] = {}
+# set by changes; only then is the JSON snapshot rewritten at exit
+_dirty = False
+# pipeline stages run in threads; hold this for read-modify-write updates
+lock = threading.RLock()
+_local = threading.local()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS log (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    value TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS log_bucket ON log (key, bucket, id);
+-- bumped whenever rows of a bucket ('' for the whole key) are removed,
+-- so readers can tell appends from rewrites
+CREATE TABLE IF NOT EXISTS log_generations (
+    key TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    PRIMARY KEY (key, bucket)
+);
+"""
+
+
+def _connect() -> sqlite3.Connection:
+    """Return this thread's connection to ``DB_PATH``."""
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.path != DB_PATH:
+        # autocommit: every statement is its own transaction unless BEGIN is used
+        conn = sqlite3.connect(DB_PATH, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        _local.conn, _local.path = conn, DB_PATH
+    return conn
+
+
+def _import_json(conn: sqlite3.Connection) -> None:
+    """Move ``agent_memory.json`` into an empty database once."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if conn.execute("PRAGMA user_version").fetchone()[0] == 0 and MEMORY_PATH.exists():
+            try:
+                data = json.loads(MEMORY_PATH.read_text(encoding="utf-8"))
+            except Exception:
+                data = {}
+            for key, value in data.items():
+                if key == "learning_log" and isinstance(value, dict):
+                    conn.executemany(
+                        "INSERT INTO log (key, bucket, value) VALUES (?, ?, ?)",
+                        [
+                            (key, bucket, json.dumps(v, ensure_ascii=False))
+                            for bucket, items in value.items()
+                            for v in items
+                        ],
+                    )
+                else:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO kv VALUES (?, ?)", (key, json.dumps(value, ensure_ascii=False))
+                    )
+        conn.execute("PRAGMA user_version = 1")
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
 
 
 def enable() -> None:
     """Enable shared memory and load existing data."""
-    global _enabled, _data
+    global _enabled
     _enabled = True
-    if MEMORY_PATH.exists():
-        try:
-            _data = json.loads(MEMORY_PATH.read_text(encoding="utf-8"))
-        except Exception:
-            _data = {}
+    _import_json(_connect())
+    atexit.unregister(_snapshot_at_exit)
+    atexit.register(_snapshot_at_exit)
     log_action("Memory", "enabled")
 
 
-def _save() -> None:
-    MEMORY_PATH.write_text(
-        json.dumps(_data, indent=2, ensure_ascii=False), encoding="utf-8"
-    )
+def enabled() -> bool:
+    """Return whether shared memory is enabled."""
+    return _enabled
 
 
 def write(key: str, value: Any) -> None:
     """Store a JSON-serializable value under key."""
     if not _enabled:
         return
-    _data[key] = value
-    _save()
+    conn = _connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute("DELETE FROM log WHERE key = ?", (key,))
+        _bump(conn, key)
+        conn.execute("INSERT OR REPLACE INTO kv VALUES (?, ?)", (key, json.dumps(value, ensure_ascii=False)))
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    _changed()
     log_action("Memory", f"write {key}")
 
 
-def read(key: str) -> Any:
-    """Read value from memory."""
+def append(key: str, bucket: str, value: Any) -> int | None:
+    """Append ``value`` to the list ``read(key)[bucket]`` without rewriting it.
+
+    Returns the id of the new row.
+    """
+    if not _enabled:
+        return None
+    cur = _connect().execute(
+        "INSERT INTO log (key, bucket, value) VALUES (?, ?, ?)", (key, bucket, json.dumps(value, ensure_ascii=False))
+    )
+    _changed()
+    log_action("Memory", f"append {key}/{bucket}")
+    return cur.lastrowid
+
+
+def _changed() -> None:
+    global _dirty
+    _dirty = True
+
+
+def _read(conn: sqlite3.Connection, key: str, bucket: str | None = None) -> Any:
+    row = conn.execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()
+    value = json.loads(row[0]) if row else None
+    query, params = "SELECT bucket, value FROM log WHERE key = ?", (key,)
+    if bucket is not None:
+        query, params = query + " AND bucket = ?", params + (bucket,)
+    rows = conn.execute(query + " ORDER BY id", params).fetchall()
+    if bucket is not None:
+        items = [json.loads(item) for _, item in rows]
+        stored = value.get(bucket) if isinstance(value, dict) else None
+        return None if stored is None and not items else list(stored or []) + items
+    if rows:
+        # appended rows extend the lists of a dict written earlier
+        value = dict(value) if isinstance(value, dict) else {}
+        for name, item in rows:
+            value[name] = list(value.get(name, [])) + [json.loads(item)]
+    return value
+
+
+def read(key: str, bucket: str | None = None) -> Any:
+    """Read value from memory; with ``bucket`` only that list of an appended key."""
     if not _enabled:
         return None
     log_action("Memory", f"read {key}")
-    return _data.get(key)
+    return _read(_connect(), key, bucket)
+
+
+def _bump(conn: sqlite3.Connection, key: str, buckets: Iterable[str] = ("",)) -> None:
+    conn.executemany(
+        "INSERT INTO log_generations VALUES (?, ?, 1) ON CONFLICT(key, bucket) DO UPDATE SET n = n + 1",
+        [(key, bucket) for bucket in buckets],
+    )
+
+
+def log_state(key: str, bucket: str | None = None) -> Tuple[int, int]:
+    """Return ``(generation, last id)`` of the rows appended to ``key``.
+
+    The last id grows with every append; the generation changes when rows
+    were removed, after which earlier reads of the log are stale. With
+    ``bucket`` only removals from that bucket (or of the whole key) count.
+    """
+    if not _enabled:
+        return 0, 0
+    conn = _connect()
+    generation = "SELECT coalesce(sum(n), 0) FROM log_generations WHERE key = ?"
+    query, params = "SELECT coalesce(max(id), 0) FROM log WHERE key = ?", (key,)
+    if bucket is not None:
+        generation += " AND bucket IN ('', ?)"
+        query, params = query + " AND bucket = ?", params + (bucket,)
+    return conn.execute(generation, params).fetchone()[0], conn.execute(query, params).fetchone()[0]
+
+
+def iter_log(
+    key: str, bucket: str | None = None, after: int = 0, fields: Sequence[str] | None = None
+) -> Iterator[Tuple[int, str, Any]]:
+    """Yield ``(id, bucket, value)`` of the rows appended to ``key`` after ``after``.
+
+    With ``fields`` the value is a dict of just those top-level fields,
+    extracted by SQLite so large values are never decoded in Python.
+    """
+    if not _enabled:
+        return
+    # json_extract returns a JSON array only for two or more paths
+    paths = tuple(f"$.{name}" for name in fields or ())
+    if len(paths) == 1:
+        paths += paths
+    column = "json_extract(value, " + ", ".join("?" for _ in paths) + ")" if paths else "value"
+    query, params = f"SELECT id, bucket, {column} FROM log WHERE key = ? AND id > ?", paths + (key, after)
+    if bucket is not None:
+        query, params = query + " AND bucket = ?", params + (bucket,)
+    for row_id, name, value in _connect().execute(query + " ORDER BY id", params):
+        value = json.loads(value)
+        if fields:
+            value = dict(zip(fields, value))
+        yield row_id, name, value
+
+
+def log_values(ids: Iterable[int]) -> Dict[int, Any]:
+    """Return the appended values with the given row ids."""
+    ids = list(ids)
+    if not _enabled or not ids:
+        return {}
+    rows = _connect().execute(f"SELECT id, value FROM log WHERE id IN ({', '.join('?' for _ in ids)})", ids)
+    return {row_id: json.loads(value) for row_id, value in rows}
+
+
+def count_log(key: str, bucket: str, after: int = 0) -> int:
+    """Return how many rows were appended to ``key``/``bucket`` after id ``after``."""
+    if not _enabled:
+        return 0
+    query = "SELECT count(*) FROM log WHERE key = ? AND bucket = ? AND id > ?"
+    return _connect().execute(query, (key, bucket, after)).fetchone()[0]
+
+
+def log_buckets(key: str) -> list[str]:
+    """Return the buckets that have rows appended to ``key``."""
+    if not _enabled:
+        return []
+    return [row[0] for row in _connect().execute("SELECT DISTINCT bucket FROM log WHERE key = ?", (key,))]
+
+
+def delete_log(key: str, ids: Iterable[int]) -> int:
+    """Remove appended rows of ``key`` by id; return how many were removed."""
+    ids = list(ids)
+    if not _enabled or not ids:
+        return 0
+    conn = _connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        buckets = set()
+        for start in range(0, len(ids), 500):
+            end = start + 500
+            chunk = ids[start:end]
+            buckets.update(
+                row[0]
+                for row in conn.execute(
+                    f"SELECT DISTINCT bucket FROM log WHERE key = ? AND id IN ({','.join('?' * len(chunk))})",
+                    (key, *chunk),
+                )
+            )
+        removed = conn.executemany("DELETE FROM log WHERE key = ? AND id = ?", [(key, i) for i in ids]).rowcount
+        _bump(conn, key, buckets)
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    _changed()
+    log_action("Memory", f"delete {removed} rows of {key}")
+    return removed
+
+
+def update_log(values: Dict[int, Any]) -> None:
+    """Replace the values of appended rows by id."""
+    if not _enabled or not values:
+        return
+    conn = _connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.executemany(
+            "UPDATE log SET value = ? WHERE id = ?",
+            [(json.dumps(value, ensure_ascii=False), row_id) for row_id, value in values.items()],
+        )
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    _changed()
+
+
+def vacuum() -> None:
+    """Return the space of removed rows to the file system."""
+    if not _enabled:
+        return
+    conn = _connect()
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.execute("VACUUM")
+
+
+def snapshot(path: Path | None = None) -> None:
+    """Write every key to ``agent_memory.json`` for readers of the file."""
+    if not _enabled:
+        return
+    conn = _connect()
+    keys = [r[0] for r in conn.execute("SELECT key FROM kv UNION SELECT DISTINCT key FROM log")]
+    data: Dict[str, Any] = {key: _read(conn, key) for key in sorted(keys)}
+    target = path or MEMORY_PATH
+    tmp = target.with_name(target.name + ".tmp")
+    tmp.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+    tmp.replace(target)
+
+
+def _snapshot_at_exit() -> None:
+    if _dirty:
+        snapshot()
+
+
+def _source(path: str | Path | None) -> Path:
+    """Return the store to read: ``path``, else the database if it exists, else the JSON file."""
+    if path is not None:
+        return Path(path)
+    return DB_PATH if DB_PATH.exists() else MEMORY_PATH
+
+
+def _open_readonly(path: Path) -> sqlite3.Connection:
+    return sqlite3.connect(f"file:{path.resolve()}?mode=ro", uri=True, timeout=30)
+
+
+def _load_json(path: Path) -> Dict[str, Any]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def iter_entries(
+    key: str = "learning_log", bucket: str | None = None, path: str | Path | None = None
+) -> Iterator[Tuple[str, Any]]:
+    """Yield ``(bucket, entry)`` of a log such as ``learning_log``.
+
+    Entries come grouped by bucket, oldest first, one row at a time from the
+    database; ``path`` may also name a JSON file with the old layout.
+    Works without :func:`enable`.
+    """
+    source = _source(path)
+    if source.suffix != ".db":
+        value = _load_json(source).get(key)
+        for name, items in value.items() if isinstance(value, dict) else []:
+            if bucket is None or name == bucket:
+                for item in items if isinstance(items, list) else []:
+                    yield name, item
+        return
+    if not source.exists():
+        return
+    conn = _open_readonly(source)
+    try:
+        row = conn.execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()
+        written = json.loads(row[0]) if row else {}
+        written = written if isinstance(written, dict) else {}
+        if bucket is None:
+            names = {r[0] for r in conn.execute("SELECT DISTINCT bucket FROM log WHERE key = ?", (key,))}
+            names |= set(written)
+        else:
+            names = {bucket}
+        for name in sorted(names):
+            for item in written.get(name, []):
+                yield name, item
+            for (value,) in conn.execute("SELECT value FROM log WHERE key = ? AND bucket = ? ORDER BY id", (key, name)):
+                yield name, json.loads(value)
+    except sqlite3.DatabaseError:
+        return
+    finally:
+        conn.close()
+
+
+def iter_items(path: str | Path | None = None, skip: Iterable[str] = ()) -> Iterator[Tuple[str, Any]]:
+    """Yield ``(key, value)`` of the keys stored with :func:`write`, one at a time."""
+    skip = set(skip)
+    source = _source(path)
+    if source.suffix != ".db":
+        for key, value in _load_json(source).items():
+            if key not in skip:
+                yield key, value
+        return
+    if not source.exists():
+        return
+    conn = _open_readonly(source)
+    try:
+        for key, value in conn.execute("SELECT key, value FROM kv ORDER BY key"):
+            if key not in skip:
+                yield key, json.loads(value)
+    except sqlite3.DatabaseError:
+        return
+    finally:
+        conn.close()
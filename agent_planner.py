@@ -7,8 +7,10 @@ from difflib import SequenceMatcher
 from pathlib import Path
 from typing import List
 
+import agent_memory
 
-_MEMORY_PATH = Path("agent_memory.json")
+# None: agent_memory.db, or agent_memory.json when there is no database
+_MEMORY_PATH: Path | None = None
 _PROJECT_MAP_PATH = Path("project_map.json")
 _AGENTS_PATH = Path("AGENTS.md")
 
@@ -43,22 +45,20 @@ _BASELINE_PLAN = _parse_baseline_agents()
 def _collect_known_features() -> List[str]:
     """Gather feature names from memory and project map."""
     feats: List[str] = []
-    if _MEMORY_PATH.exists():
-        try:
-            mem = json.loads(_MEMORY_PATH.read_text(encoding="utf-8"))
-        except Exception:
-            mem = {}
-
-        def _walk(value):
-            if isinstance(value, dict):
-                if isinstance(value.get("feature"), str):
-                    feats.append(value["feature"])
-                for v in value.values():
-                    _walk(v)
-            elif isinstance(value, list):
-                for item in value:
-                    _walk(item)
-        _walk(mem)
+
+    def _walk(value):
+        if isinstance(value, dict):
+            if isinstance(value.get("feature"), str):
+                feats.append(value["feature"])
+            for v in value.values():
+                _walk(v)
+        elif isinstance(value, list):
+            for item in value:
+                _walk(item)
+
+    # stored keys one at a time; learning log entries carry no feature dicts
+    for _, value in agent_memory.iter_items(_MEMORY_PATH, skip=("learning_log",)):
+        _walk(value)
     if _PROJECT_MAP_PATH.exists():
         try:
             data = json.loads(_PROJECT_MAP_PATH.read_text(encoding="utf-8"))
@@ -4,6 +4,7 @@ import argparse
 import json
 from importlib import import_module
 
+from utils import llm
 from utils.agent_journal import log_trace
 
 
@@ -35,7 +36,7 @@ def run_agent(name: str, payload: dict) -> dict:
     return result
 
 
-def repl() -> None:
+def repl(stream: bool = False) -> None:
     print("Agent Playground REPL. Type 'exit' to quit.")
     data: dict = {}
     while True:
@@ -55,6 +56,8 @@ def repl() -> None:
             name, payload = line, data
         try:
             data = run_agent(name, payload)
+            if stream:
+                print()
             print(json.dumps(data, indent=2, ensure_ascii=False))
         except Exception as e:  # noqa: PERF203
             print(f"Error: {e}")
@@ -65,16 +68,22 @@ def main() -> None:
     parser.add_argument("--agent", help="Agent name to run")
     parser.add_argument("--input", help="JSON payload")
     parser.add_argument("--repl", action="store_true", help="REPL mode")
+    parser.add_argument("--stream", action="store_true", help="Print LLM tokens as they arrive")
     args = parser.parse_args()
 
+    if args.stream:
+        llm.set_stream_handler(lambda token: print(token, end="", flush=True))
+
     if args.repl:
-        repl()
+        repl(args.stream)
         return
 
     if not args.agent:
         parser.error("--agent required unless --repl")
     payload = json.loads(args.input) if args.input else {}
     result = run_agent(args.agent, payload)
+    if args.stream:
+        print()
     print(json.dumps(result, indent=2, ensure_ascii=False))
 
 
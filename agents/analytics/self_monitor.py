@@ -9,6 +9,9 @@ from typing import Any, Dict, List
 
 from jinja2 import Environment, FileSystemLoader
 
+import agent_memory
+from utils import agent_journal
+
 ROOT_DIR = Path(__file__).resolve().parents[2]
 TEMPLATE_DIR = ROOT_DIR / "templates"
 TEMPLATE_NAME = "self_monitor_report.md.j2"
@@ -27,7 +30,8 @@ class SelfMonitorAgent:
         self.out_dir = Path(out_dir)
         self.journal_path = journal_path or Path("agent_journal.log")
         self.trace_path = trace_path or Path("agent_trace.log")
-        self.memory_path = memory_path or Path("agent_memory.json")
+        # None reads agent_memory.db (or agent_memory.json when there is no database)
+        self.memory_path = memory_path
 
     # parsing helpers
     def _parse_journal(self) -> tuple[Dict[str, int], Dict[str, int], Dict[str, Dict[str, int]]]:
@@ -56,21 +60,14 @@ class SelfMonitorAgent:
         success: Dict[str, int] = {}
         fail: Dict[str, int] = {}
         autofix: Dict[str, int] = {}
-        if not self.memory_path.exists():
-            return success, fail, autofix
-        try:
-            data = json.loads(self.memory_path.read_text(encoding="utf-8"))
-            log = data.get("learning_log", {})
-        except Exception:
-            return success, fail, autofix
-        for agent, entries in log.items():
+        for agent, e in agent_memory.iter_entries("learning_log", path=self.memory_path):
             if agent.startswith("AutoFix:"):
                 base = agent.split("AutoFix:", 1)[1]
-                autofix[base] = len(entries)
+                autofix[base] = autofix.get(base, 0) + 1
                 continue
-            succ = sum(1 for e in entries if e.get("result") == "success")
-            success[agent] = succ
-            fail[agent] = len(entries) - succ
+            ok = e.get("result") == "success"
+            success[agent] = success.get(agent, 0) + ok
+            fail[agent] = fail.get(agent, 0) + (not ok)
         return success, fail, autofix
 
     def _parse_trace(self) -> Dict[str, float]:
@@ -99,6 +96,7 @@ class SelfMonitorAgent:
         return {a: round(durations[a] / counts[a], 2) for a in durations}
 
     def _build_rows(self) -> List[Dict[str, Any]]:
+        agent_journal.flush()
         counts, reruns, fails_after = self._parse_journal()
         success, fail, autofix = self._parse_memory()
         avg_time = self._parse_trace()
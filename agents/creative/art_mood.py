@@ -1,16 +1,19 @@
 """Generate mood board descriptions for game ideas."""
 
+import asyncio
 from pathlib import Path
 
 from utils.agent_journal import log_trace
-from utils.llm import ask_mistral
+from utils.llm_async import ask_mistral_async
+from utils.llm_scheduler import call_context
 
 
-def run(data: dict) -> dict:
+async def run_async(data: dict) -> dict:
     """Generate a textual mood board description."""
     idea = data.get("text", "")
     prompt = "Create a one-paragraph mood board description for this game idea:\n" + idea
-    description = ask_mistral(prompt)
+    with call_context(agent="ArtMoodAgent"):
+        description = await ask_mistral_async(prompt)
     mood_dir = Path("moodboards")
     mood_dir.mkdir(exist_ok=True)
     path = mood_dir / "mood.txt"
@@ -18,3 +21,7 @@ def run(data: dict) -> dict:
     result = {"moodboard": str(path)}
     log_trace("ArtMoodAgent", "run", data, result)
     return result
+
+
+def run(data: dict) -> dict:
+    return asyncio.run(run_async(data))
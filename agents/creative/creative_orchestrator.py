@@ -1,5 +1,6 @@
 """Coordinate creative agents to build a full idea specification."""
 
+import asyncio
 import json
 from pathlib import Path
 
@@ -8,13 +9,26 @@ from utils.agent_journal import log_trace
 from . import art_mood, game_designer, lore_keeper, narrative_designer
 
 
-def run(data: dict) -> dict:
-    """Run the creative pipeline and store idea_spec.json."""
+async def _story_chain(idea_text: str) -> tuple:
+    """Run the dependent chain: core loop -> scene -> lore."""
+    gd = await game_designer.run_async({"text": idea_text})
+    scene = await narrative_designer.run_async(gd)
+    lore = await lore_keeper.run_async(scene)
+    return gd, scene, lore
+
+
+async def run_async(data: dict) -> dict:
+    """Run the creative pipeline with independent agents in parallel.
+
+    ArtMood only needs the raw idea, so it overlaps with the story chain.
+    The agents send their prompts through ``utils.llm_async``; the number of
+    simultaneous LLM requests is capped by ``utils.llm``.
+    """
     idea_text = data.get("text", "")
-    gd = game_designer.run({"text": idea_text})
-    scene = narrative_designer.run(gd)
-    lore = lore_keeper.run(scene)
-    mood = art_mood.run({"text": idea_text})
+    (gd, scene, lore), mood = await asyncio.gather(
+        _story_chain(idea_text),
+        art_mood.run_async({"text": idea_text}),
+    )
     spec = {
         "core_loop": gd.get("core_loop"),
         "scene": scene.get("scene"),
@@ -24,3 +38,8 @@ def run(data: dict) -> dict:
     Path("idea_spec.json").write_text(json.dumps(spec, indent=2, ensure_ascii=False), encoding="utf-8")
     log_trace("CreativeOrchestrator", "run", data, spec)
     return spec
+
+
+def run(data: dict) -> dict:
+    """Run the creative pipeline and store idea_spec.json."""
+    return asyncio.run(run_async(data))
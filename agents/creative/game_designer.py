@@ -1,12 +1,14 @@
 """Create concise core loop descriptions using a local LLM."""
 
+import asyncio
 from pathlib import Path
 
 from utils.agent_journal import log_trace
-from utils.llm import ask_mistral
+from utils.llm_async import ask_mistral_async
+from utils.llm_scheduler import call_context
 
 
-def run(data: dict) -> dict:
+async def run_async(data: dict) -> dict:
     """Generate a short core loop description using local LLM."""
     idea = data.get("text", "").strip()
     if not idea:
@@ -15,8 +17,13 @@ def run(data: dict) -> dict:
         "Design a concise core gameplay loop for the following idea. "
         "Respond with a paragraph under 100 words.\n" + idea
     )
-    core_loop = ask_mistral(prompt)
+    with call_context(agent="CreativeGameDesigner"):
+        core_loop = await ask_mistral_async(prompt)
     Path("core_loop.md").write_text(core_loop, encoding="utf-8")
     result = {"core_loop": core_loop, "file": "core_loop.md"}
     log_trace("CreativeGameDesigner", "run", data, result)
     return result
+
+
+def run(data: dict) -> dict:
+    return asyncio.run(run_async(data))
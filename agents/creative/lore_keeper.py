@@ -1,13 +1,15 @@
 """Maintain the lorebook based on generated narrative scenes."""
 
+import asyncio
 import json
 from pathlib import Path
 
 from utils.agent_journal import log_trace
-from utils.llm import ask_mistral
+from utils.llm_async import ask_mistral_async
+from utils.llm_scheduler import call_context
 
 
-def run(data: dict) -> dict:
+async def run_async(data: dict) -> dict:
     """Update lorebook with facts extracted from the narrative scene."""
     scene_file = data.get("scene")
     text = ""
@@ -17,7 +19,8 @@ def run(data: dict) -> dict:
         "Extract key lore facts from the following narrative scene and return "
         "them as a JSON object of named facts.\n" + text
     )
-    reply = ask_mistral(prompt)
+    with call_context(agent="LoreKeeperAgent"):
+        reply = await ask_mistral_async(prompt)
     lore_path = Path("lorebook.json")
     if lore_path.exists():
         lore = json.loads(lore_path.read_text(encoding="utf-8"))
@@ -35,3 +38,7 @@ def run(data: dict) -> dict:
     result = {"lorebook": str(lore_path)}
     log_trace("LoreKeeperAgent", "run", data, result)
     return result
+
+
+def run(data: dict) -> dict:
+    return asyncio.run(run_async(data))
@@ -1,20 +1,23 @@
 """Generate short narrative scenes from the core gameplay loop."""
 
+import asyncio
 import json
 from pathlib import Path
 
 from utils.agent_journal import log_trace
-from utils.llm import ask_mistral
+from utils.llm_async import ask_mistral_async
+from utils.llm_scheduler import call_context
 
 
-def run(data: dict) -> dict:
+async def run_async(data: dict) -> dict:
     """Create a simple narrative event JSON based on core loop."""
     core_loop = data.get("core_loop", "")
     prompt = (
         "Create a short intro scene for the following game core loop as JSON with "
         "fields 'scene' and 'dialogue' (list of lines).\n" + core_loop
     )
-    reply = ask_mistral(prompt)
+    with call_context(agent="NarrativeDesignerAgent"):
+        reply = await ask_mistral_async(prompt)
     scene_dir = Path("narrative_events")
     scene_dir.mkdir(parents=True, exist_ok=True)
     scene_path = scene_dir / "scene_1.json"
@@ -27,3 +30,7 @@ def run(data: dict) -> dict:
     result = {"scene": str(scene_path)}
     log_trace("NarrativeDesignerAgent", "run", data, result)
     return result
+
+
+def run(data: dict) -> dict:
+    return asyncio.run(run_async(data))
@@ -7,6 +7,7 @@ import subprocess
 from pathlib import Path
 
 import config
+from utils import unity_worker
 from utils.agent_journal import log_action, log_trace
 
 
@@ -15,18 +16,24 @@ def run(data: dict) -> dict:
     target = data.get("target", "WebGL")
     out_dir = Path("Build") / target
     log_action("BuildAgent", f"start {target}")
-    cmd = [
-        config.UNITY_CLI,
-        "-batchmode",
-        "-projectPath",
-        str(Path(config.PROJECT_PATH).parent),
-        "-buildTarget",
-        target,
-        "-quit",
-    ]
-    proc = subprocess.run(cmd, capture_output=True, text=True)
-
-    Path("build.log").write_text(proc.stdout + proc.stderr, encoding="utf-8")
+    project = str(Path(config.PROJECT_PATH).parent)
+    if unity_worker.WORKER_ENABLED:
+        job = unity_worker.submit(project, "build", target=target, output=str(out_dir.resolve()))
+        log = job.get("log", "")
+    else:
+        cmd = [
+            config.UNITY_CLI,
+            "-batchmode",
+            "-projectPath",
+            project,
+            "-buildTarget",
+            target,
+            "-quit",
+        ]
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        log = proc.stdout + proc.stderr
+
+    Path("build.log").write_text(log, encoding="utf-8")
 
     artifact = str(out_dir.with_suffix(".zip"))
     if out_dir.exists():
@@ -2,13 +2,53 @@ from __future__ import annotations
 
 """Utilities for generating C# code using a local LLM."""
 
+import os
 from pathlib import Path
 
 import agent_memory
-from utils.agent_journal import log_trace
-from utils.llm import ask_mistral
+from utils.agent_journal import log_action, log_trace
+from utils.llm import stream_mistral
+from utils.llm_scheduler import call_context
 from utils.test_generation import generate_test_files
 
+# Generations longer than this are treated as runaway and cut off.
+MAX_CODE_CHARS = int(os.getenv("CODER_MAX_CHARS", "20000"))
+_REFUSALS = ("i'm sorry", "i am sorry", "i cannot", "i can't", "as an ai")
+# stream_mistral reports a failed request as one last token, also mid-answer
+_LLM_ERROR = "⚠ LLM error"
+
+
+def _check_partial(text: str) -> str | None:
+    """Return a reason to abort generation early, or ``None`` to continue."""
+    head = text.lstrip()[:40].lower()
+    if head.startswith(_REFUSALS):
+        return "model refused"
+    if len(text) > MAX_CODE_CHARS:
+        return f"output exceeds {MAX_CODE_CHARS} chars"
+    return None
+
+
+def _generate_code(prompt: str) -> str:
+    """Stream the model answer, aborting as soon as it is clearly unusable."""
+    parts: list[str] = []
+    size = 0
+    head_checked = False
+    for token in stream_mistral(prompt):
+        if token.startswith(_LLM_ERROR):
+            log_action("CoderAgent", "generation aborted: llm error")
+            raise RuntimeError(f"CoderAgent generation aborted: {token}")
+        parts.append(token)
+        size += len(token)
+        # the head is inspected once, afterwards only the length matters
+        if head_checked and size <= MAX_CODE_CHARS:
+            continue
+        head_checked = size >= 40
+        reason = _check_partial("".join(parts))
+        if reason:
+            log_action("CoderAgent", f"generation aborted: {reason}")
+            raise RuntimeError(f"CoderAgent generation aborted: {reason}")
+    return "".join(parts).strip()
+
 
 def coder(task_spec):
     """Generate a C# script using local LLM."""
@@ -23,7 +63,8 @@ def coder(task_spec):
         f"Write a Unity C# script called {class_name} in namespace {namespace}. "
         f"The script should implement: {feature}. Provide only the code."
     )
-    code = ask_mistral(prompt)
+    with call_context(agent="CoderAgent"):
+        code = _generate_code(prompt)
 
     if "namespace" not in code:
         code = f"namespace {namespace} {{\n{code}\n}}"
@@ -6,6 +6,7 @@ import json
 from pathlib import Path
 from typing import Any, Dict, List
 
+from utils import run_registry
 from utils.agent_journal import log_action, log_trace
 from utils.feature_index import load_index, save_index
 
@@ -22,7 +23,10 @@ def _load_json(path: Path) -> Dict[str, Any]:
 
 def run(data: Dict[str, Any] | None = None) -> Dict[str, Any]:
     """Inspect generated feature and produce markdown report."""
-    data = data or {}
+    return run_registry.reuse("feature_inspector", _inspect, data or {}, paths=[PM_PATH, INDEX_PATH, CATALOG_PATH])
+
+
+def _inspect(data: Dict[str, Any]) -> Dict[str, Any]:
     feature = data.get("feature", "unknown")
     out_dir = Path(data.get("out_dir", "."))
 
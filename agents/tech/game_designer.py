@@ -6,6 +6,7 @@ import json
 import agent_memory
 from utils.agent_journal import log_trace
 from utils.llm import ask_mistral
+from utils.llm_scheduler import call_context
 
 
 def run(input: dict) -> dict:
@@ -25,7 +26,8 @@ def run(input: dict) -> dict:
     if not text:
         return {"feature": "stub feature"}
     prompt = "Summarise the following game feature idea in one short sentence:\n" + text
-    feature = ask_mistral(prompt)
+    with call_context(agent="GameDesignerAgent"):
+        feature = ask_mistral(prompt)
     result = {"feature": feature or text}
     log_trace("GameDesignerAgent", "run", input, result)
     agent_memory.write("feature_description", result)
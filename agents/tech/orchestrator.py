@@ -16,11 +16,12 @@ from agents.tech import (
     team_lead,
     tester,
 )
-from utils import apply_patch
+from utils import apply_patch, llm_metrics
 from utils.dotnet_tools import run_dotnet_build
+from utils.llm_scheduler import call_context
 
 
-def main(text: str):
+def _run(text: str):
     team_lead.log("🚀 Start AI pipeline")
 
     creative_spec = creative_orchestrator.run({"text": text})
@@ -56,8 +57,11 @@ def main(text: str):
     ref_info = refactor_agent.run({})
     team_lead.log("🧼 Refactor check completed")
 
+    llm_usage = llm_metrics.totals(feature=text)
     metrics = {
-        "tokens_used": 0,
+        "tokens_used": llm_usage["total"]["tokens_used"],
+        "llm_seconds": llm_usage["total"].get("eval_seconds", 0),
+        "llm_by_agent": llm_usage["by_agent"],
         "compile_seconds": build_stats.get("seconds", 0),
         "tests_passed": test_res.get("passed", 0),
         "dead_warnings": len(ref_info.get("dead_code", [])),
@@ -67,6 +71,11 @@ def main(text: str):
     team_lead.log("🎉 Pipeline completed")
 
 
+def main(text: str):
+    with call_context(feature=text):
+        _run(text)
+
+
 if __name__ == "__main__":
     text = sys.argv[1] if len(sys.argv) > 1 else "Hello world feature"
     main(text)
@@ -6,6 +6,7 @@ import json
 import agent_memory
 from utils.agent_journal import log_trace
 from utils.llm import ask_mistral
+from utils.llm_scheduler import call_context
 
 
 def run(feature: dict) -> dict:
@@ -22,7 +23,8 @@ def run(feature: dict) -> dict:
         "Create 3 short development tasks to implement the following Unity feature. "
         'Respond with JSON in the form {"tasks": [{"feature": str, "acceptance": [str]}]}\n' + desc
     )
-    reply = ask_mistral(prompt)
+    with call_context(agent="ProjectManagerAgent"):
+        reply = ask_mistral(prompt)
     try:
         data = json.loads(reply)
         tasks = data.get("tasks")
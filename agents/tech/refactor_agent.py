@@ -6,12 +6,20 @@ import subprocess
 from pathlib import Path
 
 import config
+from utils import run_registry
 from utils.agent_journal import log_action, log_trace
 
 
 def run(data: dict) -> dict:
-    """Run Roslyn analyzers and dotnet format, saving report to refactor_report.txt."""
+    """Run Roslyn analyzers and dotnet format, saving report to refactor_report.txt.
 
+    Repeated calls in one :func:`utils.run_registry.run_scope` reuse the
+    result while the project is unchanged.
+    """
+    return run_registry.reuse("refactor", _refactor, data, paths=run_registry.project_paths())
+
+
+def _refactor(data: dict) -> dict:
     log_action("RefactorAgent", "start")
 
     analyze_cmd = [
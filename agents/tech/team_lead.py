@@ -4,9 +4,13 @@ from __future__ import annotations
 """Persist metrics and logs for each pipeline execution."""
 
 import json
+import os
+import threading
 from datetime import datetime
 from pathlib import Path
 
+from utils import llm_metrics
+
 PM_PATH = Path("project_map.json")
 JOURNAL_PATH = Path("journal.json")
 METRICS_PATH = Path("metrics.json")
@@ -47,15 +51,29 @@ def update_project_map(feature_id: str, files: list, tested: bool):
         "deleted": False,
     }
 
-    with open("project_map.json", "w") as f:
+    # readers such as FeatureInspectorAgent run alongside the tests: never expose a half-written map
+    tmp = Path(f"project_map.json.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp, "w") as f:
         json.dump(data, f, indent=2)
+    os.replace(tmp, "project_map.json")
 
 
 def record_metrics(metrics: dict) -> None:
-    """Append metrics entry to metrics.json."""
+    """Append metrics entry to metrics.json.
+
+    When the entry names a feature, its per-agent LLM usage is attached under
+    ``llm_by_agent``: from the totals of this process, or from
+    ``llm_metrics.jsonl`` when the calls were made elsewhere.
+    """
     _ensure_files()
+    entry = {"time": datetime.utcnow().isoformat(), **metrics}
+    feature = metrics.get("feature")
+    if feature and "llm_by_agent" not in entry:
+        usage = llm_metrics.totals(feature=feature)["by_agent"] or llm_metrics.summary(feature=feature)["by_agent"]
+        if usage:
+            entry["llm_by_agent"] = usage
     data = json.loads(METRICS_PATH.read_text(encoding="utf-8"))
-    data.append({"time": datetime.utcnow().isoformat(), **metrics})
+    data.append(entry)
     METRICS_PATH.write_text(json.dumps(data, indent=2), encoding="utf-8")
 
 
@@ -2,68 +2,162 @@ from __future__ import annotations
 
 """Utilities to build and run Unity tests via the CLI."""
 
+import hashlib
 import json
+import os
+import shutil
 import subprocess
 import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import config
+from utils import nunit_results, run_registry, test_selection, unity_worker
 from utils.agent_journal import log_action, log_trace
 from utils.test_generation import generate_test_files
 
 from . import team_lead
 
+PLATFORMS = ["EditMode", "PlayMode"]
+# "parallel": PlayMode runs at the same time as EditMode in a project clone
+TEST_MODE = os.getenv("UNITY_TEST_MODE", "sequential")
+CLONES_DIR = Path(os.getenv("UNITY_CLONES_DIR", ".unity_clones"))
+# what a clone mirrors from the project; its Library stays warm between runs
+_CLONE_DIRS = ("Assets", "Packages", "ProjectSettings")
 
-def run_unity_tests(project_path: str) -> dict:
-    """Run Unity EditMode and PlayMode tests and write metrics.json."""
-    results: dict[str, dict[str, int]] = {}
-
-    for platform in ["EditMode", "PlayMode"]:
-        result_file = f"results_{platform}.xml"
-        proc = subprocess.run(
-            [
-                config.UNITY_CLI,
-                "-batchmode",
-                "-runTests",
-                "-projectPath",
-                project_path,
-                "-testResults",
-                result_file,
-                "-testPlatform",
-                platform,
-                "-quit",
-            ],
-            capture_output=True,
-            text=True,
-        )
-
-        if proc.returncode != 0:
-            raise RuntimeError(f"Unity CLI returned {proc.returncode} for {platform}: {proc.stderr.strip()}")
 
-        if not Path(result_file).exists():
-            raise RuntimeError(f"Result file not found: {result_file}")
+def run_unity_tests(project_path: str) -> dict:
+    """Run Unity EditMode and PlayMode tests and write metrics.json.
 
-        tree = ET.parse(result_file)
-        root = tree.getroot()
-        passed = int(root.attrib.get("passed", 0))
-        failed = int(root.attrib.get("failed", 0))
-        skipped = int(root.attrib.get("skipped", 0))
+    Within a :func:`utils.run_registry.run_scope` the results are reused
+    until the project files change.
+    """
+    return run_registry.reuse(
+        "unity_tests", _run_unity_tests, project_path, paths=run_registry.project_paths(project_path)
+    )
 
-        results[platform] = {
-            "passed": passed,
-            "failed": failed,
-            "skipped": skipped,
-        }
 
-        if failed > 0:
-            raise RuntimeError(f"{platform} tests failed: {failed} failed")
+def _run_unity_tests(project_path: str) -> dict:
+    selection = None
+    if test_selection.ENABLED:
+        selection = test_selection.select(project_path)
+        scope = "full suite" if selection.full else f"{len(selection.tests)} test class(es)"
+        log_action("TesterAgent", f"running {scope} (~{selection.seconds:.0f}s): {selection.reason}")
+    test_filter = selection.filter if selection else None
+
+    if TEST_MODE == "parallel":
+        # Unity locks an open project, so the second process needs its own copy
+        clone = sync_clone(project_path, "PlayMode")
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="unity-tests") as pool:
+            futures = {
+                "EditMode": pool.submit(_run_platform, project_path, "EditMode", test_filter),
+                "PlayMode": pool.submit(_run_platform, str(clone), "PlayMode", test_filter),
+            }
+            results = {platform: future.result() for platform, future in futures.items()}
+    else:
+        results = {platform: _run_platform(project_path, platform, test_filter) for platform in PLATFORMS}
 
     with open("metrics.json", "w", encoding="utf-8") as f:
         json.dump(results, f, indent=2)
 
+    if selection is not None:
+        # failures raise above, so only green runs become the new baseline
+        test_selection.record(selection)
+
     return results
 
 
+def _run_platform(project_path: str, platform: str, test_filter: str | None = None) -> dict[str, int]:
+    result_file = f"results_{platform}.xml"
+    # a stale file would be read as this run's results if Unity crashes
+    Path(result_file).unlink(missing_ok=True)
+    if unity_worker.WORKER_ENABLED:
+        job = unity_worker.submit(
+            project_path, "tests", platform=platform, results=str(Path(result_file).resolve()), filter=test_filter
+        )
+        returncode, stderr = job["returncode"], job.get("log", "")
+    else:
+        cmd = [
+            config.UNITY_CLI,
+            "-batchmode",
+            "-runTests",
+            "-projectPath",
+            project_path,
+            "-testResults",
+            result_file,
+            "-testPlatform",
+            platform,
+        ]
+        if test_filter:
+            cmd += ["-testFilter", test_filter]
+        proc = subprocess.run(cmd + ["-quit"], capture_output=True, text=True)
+        returncode, stderr = proc.returncode, proc.stderr
+
+    summary = None
+    if Path(result_file).exists():
+        try:
+            with nunit_results.recording() as record:
+                summary = nunit_results.parse(result_file, on_case=record)
+        except ET.ParseError:
+            # a crashed editor leaves the file truncated; its own error says more
+            if returncode == 0:
+                raise
+
+    if returncode != 0:
+        raise RuntimeError(f"Unity CLI returned {returncode} for {platform}: {stderr.strip()}{_failures(summary)}")
+
+    if summary is None:
+        raise RuntimeError(f"Result file not found: {result_file}")
+
+    if summary.failed > 0:
+        raise RuntimeError(f"{platform} tests failed: {summary.failed} failed{_failures(summary)}")
+
+    return summary.counts()
+
+
+def _failures(summary: nunit_results.Summary | None) -> str:
+    if summary is None or not summary.failures:
+        return ""
+    lines = [
+        f"{case.fullname}: {case.message.splitlines()[0] if case.message else case.result}" for case in summary.failures
+    ]
+    return "\n" + "\n".join(lines)
+
+
+def sync_clone(project_path: str, name: str) -> Path:
+    """Mirror the project sources into a persistent clone and return its path.
+
+    Only changed files are copied and removed ones deleted; the clone keeps
+    its own ``Library`` (seeded from the project on first use), so Unity does
+    not reimport everything on each run.
+    """
+    src = Path(project_path).resolve()
+    clone = CLONES_DIR / hashlib.sha1(str(src).encode("utf-8")).hexdigest()[:12] / name
+    if not (clone / "Library").exists() and (src / "Library").exists():
+        shutil.copytree(src / "Library", clone / "Library", dirs_exist_ok=True)
+    for sub in _CLONE_DIRS:
+        src_dir, dst_dir = src / sub, clone / sub
+        wanted = set()
+        for path in src_dir.rglob("*") if src_dir.exists() else []:
+            if not path.is_file():
+                continue
+            rel = path.relative_to(src_dir)
+            wanted.add(rel)
+            target = dst_dir / rel
+            st = path.stat()
+            try:
+                same = target.stat().st_size == st.st_size and target.stat().st_mtime_ns == st.st_mtime_ns
+            except OSError:
+                same = False
+            if not same:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(path, target)
+        for path in dst_dir.rglob("*") if dst_dir.exists() else []:
+            if path.is_file() and path.relative_to(dst_dir) not in wanted:
+                path.unlink()
+    return clone
+
+
 def _ensure_playmode_test(script_path: str | None, namespace: str) -> None:
     """Create simple EditMode/PlayMode tests if none exist."""
     if not script_path:
@@ -1,11 +1,11 @@
 from __future__ import annotations
 
-import json
 from pathlib import Path
 from typing import Any, Dict, List
 
 from jinja2 import Environment, FileSystemLoader
 
+import agent_memory
 from agents.tech import team_lead
 from utils.agent_journal import log_action
 
@@ -13,33 +13,28 @@ TEMPLATE_DIR = Path("templates")
 TEMPLATE_NAME = "autofailure_report.md.j2"
 
 
-def detect_repeated_failures(memory_path: Path = Path("agent_memory.json"), threshold: int = 3) -> List[Dict[str, Any]]:
-    """Return info about agents with repeated errors for the same input."""
-    if not memory_path.exists():
-        return []
-    try:
-        data = json.loads(memory_path.read_text(encoding="utf-8"))
-        log = data.get("learning_log", {})
-    except Exception:
-        return []
+def detect_repeated_failures(memory_path: Path | None = None, threshold: int = 3) -> List[Dict[str, Any]]:
+    """Return info about agents with repeated errors for the same input.
 
-    failures: List[Dict[str, Any]] = []
-    for agent, entries in log.items():
+    ``memory_path`` defaults to agent_memory.db, or agent_memory.json when
+    there is no database.
+    """
+    # per agent: (hash of the trailing error run, its length, its first exception)
+    streaks: Dict[str, tuple] = {}
+    for agent, item in agent_memory.iter_entries("learning_log", path=memory_path):
         if agent.startswith("AutoFix:"):
             continue
-        last_hash = None
-        count = 0
-        last_exc = ""
-        for item in reversed(entries):
-            if item.get("result") != "error":
-                break
-            h = item.get("hash")
-            if last_hash is None:
-                last_hash = h
-            if h != last_hash:
-                break
-            count += 1
-            last_exc = str(item.get("output", ""))
+        h = item.get("hash")
+        last_hash, count, exc = streaks.get(agent, (None, 0, ""))
+        if item.get("result") != "error":
+            streaks[agent] = (None, 0, "")
+        elif count and h == last_hash:
+            streaks[agent] = (h, count + 1, exc)
+        else:
+            streaks[agent] = (h, 1, str(item.get("output", "")))
+
+    failures: List[Dict[str, Any]] = []
+    for agent, (_, count, last_exc) in streaks.items():
         if count > threshold:
             failures.append(
                 {
@@ -0,0 +1,398 @@
+"""End-to-end pipeline benchmarks with regression gates.
+
+    python benchmarks/run_benchmarks.py                    # pipeline + 1/10/100 features
+    python benchmarks/run_benchmarks.py --sizes 1 10 --no-gate
+
+Every scenario runs in a subprocess inside a fresh copy of the repository
+(working tree without ignored files, re-initialised as a git repo). ``tools/fake_ollama.py``
+serves the LLM and the ``tools/fake_toolchain.py`` shims stand in for the
+Unity CLI, dotnet and flake8, so the numbers depend only on our own code.
+
+Recorded per scenario: wall time, inclusive time per agent (in-process
+runs only; ``--jobs`` workers are separate processes), peak RSS,
+files opened/written, bytes read/written and LLM calls. Results are
+appended to ``benchmarks/history.json``; the run exits with code 1 when a
+metric exceeds the median of the previous runs by more than its threshold
+from ``benchmarks/config.yaml``, or when a scenario failed a feature or
+ended with an error.
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import importlib
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import yaml
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+BENCH_DIR = ROOT_DIR / "benchmarks"
+CONFIG_PATH = BENCH_DIR / "config.yaml"
+HISTORY_PATH = BENCH_DIR / "history.json"
+
+DEFAULT_CONFIG: Dict[str, Any] = {
+    "sizes": [1, 10, 100],
+    "pipeline": True,
+    "prompts": ["Add a feature"],
+    "ollama": "fixtures/fake_ollama.yaml",
+    "ollama_overrides": {},
+    "toolchain": "benchmarks/toolchain.yaml",
+    "jobs": 1,
+    "window": 5,
+    "thresholds": {},
+}
+
+# (module, attribute, label) of the stages timed inside the worker
+AGENT_HOOKS = [
+    ("agents.tech.project_manager", "run", "ProjectManagerAgent"),
+    ("agents.tech.game_designer", "run", "GameDesignerAgent"),
+    ("agents.tech.architect_agent", "run", "ArchitectAgent"),
+    ("agents.tech.scene_builder_agent", "run", "SceneBuilderAgent"),
+    ("agents.tech.coder", "run", "CoderAgent"),
+    ("agents.tech.tester", "run", "TesterAgent"),
+    ("agents.tech.review_agent", "run", "ReviewAgent"),
+    ("agents.tech.build_agent", "run", "BuildAgent"),
+    ("agents.tech.refactor_agent", "run", "RefactorAgent"),
+    ("agents.tech.feature_inspector", "run", "FeatureInspectorAgent"),
+    ("agents.creative.lore_validator", "run", "LoreValidatorAgent"),
+    ("agents.analytics.user_feedback", "run", "UserFeedbackAgent"),
+    ("feature_review_panel", "run", "AIReviewPanel"),
+    ("ci_test", "main", "ci_test"),
+    ("ci_build", "main", "ci_build"),
+    ("ci_assets", "main", "ci_assets"),
+    ("ci_publish", "main", "ci_publish"),
+]
+
+_WRITE_FLAGS = os.O_WRONLY | os.O_RDWR | os.O_APPEND | os.O_CREAT
+
+
+def load_config(path: Path = CONFIG_PATH) -> Dict[str, Any]:
+    cfg = json.loads(json.dumps(DEFAULT_CONFIG))
+    if path.exists():
+        cfg.update(yaml.safe_load(path.read_text(encoding="utf-8")) or {})
+    return cfg
+
+
+# ---------------------------------------------------------------- worker
+
+
+def _instrument(timings: Dict[str, float]) -> None:
+    """Wrap agent entry points so their inclusive run time is accumulated."""
+    lock = threading.Lock()
+
+    def wrap(label: str, func: Callable) -> Callable:
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with lock:
+                    timings[label] = timings.get(label, 0.0) + time.perf_counter() - start
+
+        return timed
+
+    for module_name, attr, label in AGENT_HOOKS:
+        module = importlib.import_module(module_name)
+        setattr(module, attr, wrap(label, getattr(module, attr)))
+
+
+def _count_files(counters: Dict[str, int]) -> None:
+    def hook(event: str, args: tuple) -> None:
+        if event != "open" or not isinstance(args[0], (str, bytes, os.PathLike)):
+            return
+        _, mode, flags = args
+        counters["files_opened"] += 1
+        if (mode and any(c in mode for c in "wax+")) or (not mode and flags & _WRITE_FLAGS):
+            counters["files_written"] += 1
+
+    sys.addaudithook(hook)
+
+
+def _proc_io() -> Dict[str, int]:
+    try:
+        lines = Path("/proc/self/io").read_text().splitlines()
+    except OSError:
+        return {}
+    data = dict(line.split(": ") for line in lines if ": " in line)
+    return {"read_bytes": int(data.get("rchar", 0)), "write_bytes": int(data.get("wchar", 0))}
+
+
+def _peak_rss_mb() -> float | None:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def worker(kind: str, out: Path, multi: str | None = None, prompt: str = "", jobs: int = 1) -> None:
+    """Run one scenario in the current workspace and write its metrics."""
+    sys.path.insert(0, str(Path.cwd()))
+    timings: Dict[str, float] = {}
+    counters = {"files_opened": 0, "files_written": 0}
+    _instrument(timings)
+    import run_all
+    import run_pipeline
+    from utils import llm_metrics
+
+    io_before = _proc_io()
+    _count_files(counters)
+    start = time.perf_counter()
+    error = ""
+    try:
+        if kind == "pipeline":
+            # same request shape run_all passes for a single feature
+            run_pipeline.ask_multiline = lambda: {"feature": prompt}
+            run_pipeline.main()
+        else:
+            run_all.main(multi=multi, jobs=jobs)
+    except (Exception, SystemExit) as e:  # failed tests end with SystemExit
+        error = repr(e)
+    wall = time.perf_counter() - start
+    io_after = _proc_io()
+
+    statuses = [f.get("status") for f in run_all._load_pipeline().get("features", {}).values()]
+    # read back from the store so calls made by --jobs workers count too
+    llm = llm_metrics.summary()["total"]
+    metrics = {
+        "wall_seconds": round(wall, 3),
+        "peak_rss_mb": _peak_rss_mb(),
+        **counters,
+        **{k: v - io_before.get(k, 0) for k, v in io_after.items()},
+        "llm_calls": llm.get("calls", 0),
+        "llm_tokens": llm.get("tokens_used", 0),
+        "features_passed": statuses.count("passed"),
+        "features_failed": statuses.count("failed"),
+        "agent_seconds": {k: round(v, 3) for k, v in sorted(timings.items())},
+        "error": error,
+    }
+    out.write_text(json.dumps(metrics, indent=2), encoding="utf-8")
+
+
+# ---------------------------------------------------------------- driver
+
+
+def make_workspace(dest: Path) -> Path:
+    """Copy the working tree (minus ignored files) into ``dest`` as a new git repo."""
+    files = (
+        subprocess.run(
+            ["git", "ls-files", "-z", "--cached", "--others", "--exclude-standard"],
+            cwd=ROOT_DIR,
+            capture_output=True,
+            check=True,
+        )
+        .stdout.decode()
+        .split("\0")
+    )
+    for name in filter(None, files):
+        src = ROOT_DIR / name
+        if src.is_file():
+            (dest / name).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(src, dest / name)
+    git = ["git", "-c", "user.name=bench", "-c", "user.email=bench@localhost"]
+    subprocess.run(["git", "init", "-q"], cwd=dest, check=True)
+    subprocess.run(["git", "add", "-A"], cwd=dest, check=True)
+    subprocess.run([*git, "commit", "-q", "-m", "benchmark workspace"], cwd=dest, check=True)
+    return dest
+
+
+def batch(size: int, prompts: List[str]) -> Dict[str, Any]:
+    """Return a ``features_batch`` mapping with ``size`` distinct features."""
+    return {"features": {f"feat_{i:03d}": f"{prompts[i % len(prompts)]} #{i}" for i in range(size)}}
+
+
+def _fake_ollama_stats(url: str) -> Dict[str, int]:
+    import requests
+
+    return requests.get(f"{url}/stats", timeout=5).json()
+
+
+def run_scenario(name: str, size: int | None, cfg: Dict[str, Any], url: str, keep: bool = False) -> Dict[str, Any]:
+    from tools import fake_toolchain
+
+    tmp = Path(tempfile.mkdtemp(prefix=f"bench_{name}_"))
+    try:
+        ws = make_workspace(tmp)
+        env = dict(os.environ)
+        env.update(fake_toolchain.install(ws / ".fake_toolchain" / "bin"))
+        env.update(
+            {
+                "PROJECT_PATH": str(ws),
+                "UNITY_SCRIPTS_PATH": "Assets/Scripts",
+                "OLLAMA_URL": url,
+                "FAKE_TOOLCHAIN_CONFIG": str(ROOT_DIR / cfg["toolchain"]),
+                "FAKE_TOOLCHAIN_STATE": str(ws / ".fake_toolchain"),
+                "LLM_CACHE": "0",
+                "LLM_METRICS_PATH": str(ws / "llm_metrics.jsonl"),
+                "OPENAI_API_KEY": env.get("OPENAI_API_KEY", "benchmark"),
+            }
+        )
+        cmd = [sys.executable, str(Path(__file__).resolve()), "--out", "bench.json"]
+        if size is None:
+            cmd += ["--worker", "pipeline", "--prompt", cfg["prompts"][0]]
+        else:
+            (ws / "bench_batch.yaml").write_text(yaml.safe_dump(batch(size, cfg["prompts"])), encoding="utf-8")
+            cmd += ["--worker", "batch", "--multi", "bench_batch.yaml", "--jobs", str(cfg.get("jobs", 1))]
+        before = _fake_ollama_stats(url)
+        proc = subprocess.run(cmd, cwd=ws, env=env, capture_output=True, text=True)
+        after = _fake_ollama_stats(url)
+        out = ws / "bench.json"
+        if not out.exists():
+            raise RuntimeError(f"benchmark {name} crashed:\n{proc.stdout[-2000:]}\n{proc.stderr[-2000:]}")
+        metrics = json.loads(out.read_text(encoding="utf-8"))
+        metrics["llm_requests"] = after["requests"] - before["requests"]
+        return metrics
+    finally:
+        if keep:
+            print(f"workspace kept: {tmp}")
+        else:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+def load_history(path: Path = HISTORY_PATH) -> List[Dict[str, Any]]:
+    if path.exists():
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except Exception:
+            return []
+    return []
+
+
+def compare(
+    current: Dict[str, Dict[str, Any]],
+    history: List[Dict[str, Any]],
+    thresholds: Dict[str, float],
+    window: int = 5,
+) -> List[str]:
+    """Return the regressions of ``current`` against the last ``window`` runs.
+
+    A metric regresses when it exceeds the median of its previous values by
+    more than ``thresholds[metric]`` (a fraction, ``0`` means any increase).
+    """
+    regressions = []
+    for scenario, metrics in current.items():
+        for metric, limit in thresholds.items():
+            value = metrics.get(metric)
+            previous = [
+                run["scenarios"][scenario][metric]
+                for run in history[-window:]
+                if run.get("scenarios", {}).get(scenario, {}).get(metric) is not None
+            ]
+            if value is None or not previous:
+                continue
+            baseline = statistics.median(previous)
+            if value > baseline * (1 + limit) and value > baseline:
+                regressions.append(f"{scenario}.{metric}: {value} > {baseline} (+{limit:.0%})")
+    return regressions
+
+
+def failures(current: Dict[str, Dict[str, Any]]) -> List[str]:
+    """Return the scenarios of ``current`` that failed a feature or raised."""
+    failed = []
+    for scenario, metrics in current.items():
+        if metrics.get("features_failed"):
+            failed.append(f"{scenario}: {metrics['features_failed']} features failed")
+        if metrics.get("error"):
+            failed.append(f"{scenario}: {metrics['error']}")
+    return failed
+
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True, text=True)
+        return out.stdout.strip()
+    except OSError:
+        return ""
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Run pipeline benchmarks")
+    parser.add_argument("--config", type=Path, default=CONFIG_PATH)
+    parser.add_argument("--history", type=Path, default=HISTORY_PATH)
+    parser.add_argument("--sizes", type=int, nargs="*", help="Batch sizes (default from config)")
+    parser.add_argument("--no-pipeline", action="store_true", help="Skip the run_pipeline scenario")
+    parser.add_argument("--no-gate", action="store_true", help="Record results without failing on regressions")
+    parser.add_argument("--no-record", action="store_true", help="Do not append to the history")
+    parser.add_argument("--keep", action="store_true", help="Keep scenario workspaces")
+    parser.add_argument("--worker", choices=["pipeline", "batch"], help=argparse.SUPPRESS)
+    parser.add_argument("--multi", help=argparse.SUPPRESS)
+    parser.add_argument("--out", type=Path, help=argparse.SUPPRESS)
+    parser.add_argument("--jobs", type=int, help="run_all --jobs for batch scenarios (default from config)")
+    parser.add_argument("--prompt", default="", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        worker(args.worker, args.out, args.multi, args.prompt, args.jobs or 1)
+        return 0
+
+    sys.path.insert(0, str(ROOT_DIR))
+    from tools.fake_ollama import FakeOllama
+    from tools.fake_ollama import load_config as load_ollama_config
+
+    cfg = load_config(args.config)
+    if args.jobs:
+        cfg["jobs"] = args.jobs
+    ollama_cfg = {**load_ollama_config(ROOT_DIR / cfg["ollama"]), **(cfg.get("ollama_overrides") or {})}
+    fake = FakeOllama(ollama_cfg)
+    url = fake.start()
+
+    scenarios: List[tuple[str, int | None]] = []
+    if cfg.get("pipeline", True) and not args.no_pipeline:
+        scenarios.append(("pipeline", None))
+    sizes = args.sizes if args.sizes is not None else cfg["sizes"]
+    scenarios += [(f"batch_{n}", n) for n in sizes]
+
+    results: Dict[str, Dict[str, Any]] = {}
+    try:
+        for name, size in scenarios:
+            print(f"▶ {name}", flush=True)
+            results[name] = run_scenario(name, size, cfg, url, keep=args.keep)
+            m = results[name]
+            error = f" error={m['error']}" if m["error"] else ""
+            print(
+                f"  wall={m['wall_seconds']}s rss={m['peak_rss_mb']}MB "
+                f"files={m['files_opened']}/{m['files_written']}w llm={m['llm_calls']} "
+                f"passed={m['features_passed']} failed={m['features_failed']}{error}",
+                flush=True,
+            )
+    finally:
+        fake.stop()
+
+    history = load_history(args.history)
+    regressions = compare(results, history, cfg.get("thresholds") or {}, int(cfg.get("window", 5)))
+    if not args.no_record:
+        history.append({"date": datetime.utcnow().isoformat(), "commit": _git_commit(), "scenarios": results})
+        args.history.parent.mkdir(parents=True, exist_ok=True)
+        args.history.write_text(json.dumps(history, indent=2), encoding="utf-8")
+
+    for line in regressions:
+        print(f"❌ regression {line}")
+    failed = failures(results)
+    for line in failed:
+        print(f"❌ failed {line}")
+    if (regressions or failed) and not args.no_gate:
+        return 1
+    print("✅ no regressions" if not (regressions or failed) else "⚠️ regressions ignored (--no-gate)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,6 +10,7 @@ import yaml
 from utils.agent_journal import (
     LOG_PATH as JOURNAL_PATH_DEFAULT,
     TRACE_PATH as TRACE_PATH_DEFAULT,
+    flush,
     log_action,
 )
 
@@ -60,6 +61,7 @@ def _analyze_agent(agent: str, memory: dict) -> str:
 
 
 def _collect_info() -> Tuple[List[str], List[str], List[str]]:
+    flush()
     last_errors = _load_last_errors()
     memory = _load_memory()
     agents = []
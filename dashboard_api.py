@@ -5,6 +5,7 @@ from http.server import BaseHTTPRequestHandler, HTTPServer
 from pathlib import Path
 from datetime import datetime
 
+import agent_memory
 from utils.agent_journal import read_entries
 from utils.feature_index import load_index
 
@@ -60,34 +61,21 @@ def _load_trace_stats() -> dict:
 
 
 def _load_learning_stats() -> dict:
-    path = Path("agent_memory.json")
-    if not path.exists():
-        return {}
-    try:
-        data = json.loads(path.read_text(encoding="utf-8"))
-        log = data.get("learning_log", {})
-    except Exception:
-        return {}
-
     stats: dict[str, dict] = {}
-    for agent, entries in log.items():
+    auto_patterns: dict[str, set] = {}
+    for agent, e in agent_memory.iter_entries("learning_log"):
         if agent.startswith("AutoFix:"):
+            if e.get("result") == "success" and e.get("output"):
+                auto_patterns.setdefault(agent.split("AutoFix:", 1)[1], set()).add(e.get("output"))
             continue
-        total = len(entries)
-        successful = sum(1 for e in entries if e.get("result") == "success")
-        examples = [e.get("input", "") for e in entries[:3]]
-        auto_entries = log.get(f"AutoFix:{agent}", [])
-        auto_patterns = {
-            e.get("output")
-            for e in auto_entries
-            if e.get("result") == "success" and e.get("output")
-        }
-        stats[agent] = {
-            "total_calls": total,
-            "successful": successful,
-            "auto_fixes": len(auto_patterns),
-            "examples": examples,
-        }
+        item = stats.setdefault(agent, {"total_calls": 0, "successful": 0, "auto_fixes": 0, "examples": []})
+        item["total_calls"] += 1
+        if e.get("result") == "success":
+            item["successful"] += 1
+        if len(item["examples"]) < 3:
+            item["examples"].append(e.get("input", ""))
+    for agent, item in stats.items():
+        item["auto_fixes"] = len(auto_patterns.get(agent, ()))
     return stats
 
 
@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
 from datetime import datetime
 from pathlib import Path
 import subprocess
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, List, Tuple
 
 from agents.tech import feature_inspector, refactor_agent, tester
 from agents.creative import lore_validator
@@ -11,6 +16,12 @@ from agents.creative import lore_validator
 
 Vote = Tuple[str, str]
 
+# seconds a single vote may take before it counts as needs_revision
+VOTE_TIMEOUT = float(os.getenv("REVIEW_VOTE_TIMEOUT", "900"))
+
+# dotnet format rewrites the sources Unity compiles, so those votes take turns
+_project_lock = threading.Lock()
+
 
 def _vote_inspector(feature: str, out_dir: str) -> Tuple[str, str, str]:
     res = feature_inspector.run({"feature": feature, "out_dir": out_dir})
@@ -44,18 +55,94 @@ def _vote_tests() -> Tuple[str, str, str]:
     return "TesterAgent", "accept", ""
 
 
+def _start(func: Callable, args: tuple, stop: threading.Event, exclusive: bool) -> Future:
+    """Run one vote in a daemon thread, so a hung tool never blocks exit."""
+    future: Future = Future()
+    ctx = contextvars.copy_context()
+
+    def vote():
+        result = ctx.run(func, *args)
+        if result[1] == "block":
+            stop.set()
+        return result
+
+    def target() -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            if exclusive:
+                with _project_lock:
+                    future.set_result(None if stop.is_set() else vote())
+            else:
+                future.set_result(vote())
+        except BaseException as e:  # noqa: BLE001 - re-raised by the panel
+            stop.set()
+            future.set_exception(e)
+
+    threading.Thread(target=target, name=f"vote-{func.__name__}", daemon=True).start()
+    return future
+
+
+def _collect_votes(calls: List[Tuple[str, Callable, tuple, bool]], timeout: float) -> List[Tuple[str, str, str]]:
+    """Run the votes concurrently; a block cancels the votes still running.
+
+    Votes that write the project are waited for before returning, so a
+    cancelled or timed out one never changes the sources after the verdict.
+    """
+    stop = threading.Event()
+    deadline = time.monotonic() + timeout
+    futures = {}
+    writers = []
+    for agent, func, args, exclusive in calls:
+        future = _start(func, args, stop, exclusive)
+        futures[future] = agent
+        if exclusive:
+            writers.append(future)
+    votes: Dict[str, Tuple[str, str, str]] = {}
+    pending = set(futures)
+    while pending and not any(v[1] == "block" for v in votes.values()):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is not None:
+                stop.set()
+                wait(writers)
+                raise future.exception()
+            # None: an exclusive vote that gave way to a block
+            if future.result() is not None:
+                votes[futures[future]] = future.result()
+    stop.set()
+    # a running Unity/dotnet vote finishes; the queued ones see stop and return
+    wait(writers)
+    blocked = any(v[1] == "block" for v in votes.values())
+    for agent in futures.values():
+        if agent in votes:
+            continue
+        if blocked:
+            votes[agent] = (agent, "skipped", "cancelled after block")
+        else:
+            votes[agent] = (agent, "needs_revision", f"timeout after {timeout:g}s")
+    return [votes[agent] for agent, *_ in calls]
+
+
 def run(data: Dict | None = None) -> Dict:
     data = data or {}
     feature = data.get("feature", "unknown")
     out_dir = Path(data.get("out_dir", "ci_reports"))
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    votes: List[Tuple[str, str, str]] = [
-        _vote_inspector(feature, str(out_dir)),
-        _vote_lore(feature, str(out_dir)),
-        _vote_refactor(),
-        _vote_tests(),
-    ]
+    votes = _collect_votes(
+        [
+            ("FeatureInspectorAgent", _vote_inspector, (feature, str(out_dir)), False),
+            ("LoreValidatorAgent", _vote_lore, (feature, str(out_dir)), False),
+            # tests first: their block makes the refactor vote moot
+            ("TesterAgent", _vote_tests, (), True),
+            ("RefactorAgent", _vote_refactor, (), True),
+        ],
+        float(data.get("timeout", VOTE_TIMEOUT)),
+    )
 
     final = "accept"
     if any(v[1] == "block" for v in votes):
@@ -9,6 +9,9 @@ from typing import Any, Dict, List
 
 from jinja2 import Environment, FileSystemLoader
 
+import agent_memory
+from utils import agent_journal
+
 ROOT_DIR = Path(__file__).resolve().parent
 TEMPLATE_DIR = ROOT_DIR / "templates"
 TEMPLATE_NAME = "meta_insights.md.j2"
@@ -26,7 +29,8 @@ class MetaAgent:
         feedback_path: Path | None = None,
     ) -> None:
         self.out_dir = Path(out_dir)
-        self.memory_path = memory_path or Path("agent_memory.json")
+        # None reads agent_memory.db (or agent_memory.json when there is no database)
+        self.memory_path = memory_path
         self.journal_path = journal_path or Path("agent_journal.log")
         # prefer jsonl/log if exists, else html
         self.trace_path = trace_path or Path("trace_report.jsonl")
@@ -35,14 +39,22 @@ class MetaAgent:
         self.feedback_path = feedback_path or Path("user_feedback_report.md")
 
     # internal helpers
-    def _load_memory(self) -> Dict[str, List[dict]]:
-        if not self.memory_path.exists():
-            return {}
-        try:
-            data = json.loads(self.memory_path.read_text(encoding="utf-8"))
-            return data.get("learning_log", {})
-        except Exception:
-            return {}
+    def _load_memory(self) -> tuple[Dict[str, Dict[str, int]], Dict[str, Dict[str, int]]]:
+        """Return ``(calls, autofix)``: call/fail counts per agent and AutoFix output counts."""
+        calls: Dict[str, Dict[str, int]] = {}
+        autofix: Dict[str, Dict[str, int]] = {}
+        for agent, e in agent_memory.iter_entries("learning_log", path=self.memory_path):
+            if agent.startswith("AutoFix:"):
+                patterns = autofix.setdefault(agent.split("AutoFix:", 1)[1], {})
+                out = e.get("output")
+                if out:
+                    patterns[out] = patterns.get(out, 0) + 1
+                continue
+            counts = calls.setdefault(agent, {"total": 0, "fails": 0})
+            counts["total"] += 1
+            if e.get("result") != "success":
+                counts["fails"] += 1
+        return calls, autofix
 
     def _parse_journal(self) -> Dict[str, int]:
         counts: Dict[str, int] = {}
@@ -102,7 +114,8 @@ class MetaAgent:
         return {"avg_rating": round(avg, 2)}
 
     def _build_context(self) -> Dict[str, Any]:
-        log = self._load_memory()
+        calls, autofix_patterns = self._load_memory()
+        agent_journal.flush()
         # Journal parsing currently unused but kept for future enhancements
         self._parse_journal()
         trace = self._parse_trace()
@@ -111,29 +124,21 @@ class MetaAgent:
         failures: List[Dict[str, Any]] = []
         autofix: List[Dict[str, Any]] = []
 
-        for agent, entries in log.items():
-            if agent.startswith("AutoFix:"):
-                base = agent.split("AutoFix:", 1)[1]
-                patterns: Dict[str, int] = {}
-                for e in entries:
-                    out = e.get("output")
-                    if out:
-                        patterns[out] = patterns.get(out, 0) + 1
-                repeated = sum(1 for c in patterns.values() if c > 1)
-                if repeated:
-                    autofix.append({"agent": base, "count": repeated})
-            else:
-                total = len(entries)
-                fail = sum(1 for e in entries if e.get("result") != "success")
-                if fail:
-                    failures.append(
-                        {
-                            "agent": agent,
-                            "fails": fail,
-                            "total": total,
-                            "rate": fail / total if total else 0.0,
-                        }
-                    )
+        for agent, patterns in autofix_patterns.items():
+            repeated = sum(1 for c in patterns.values() if c > 1)
+            if repeated:
+                autofix.append({"agent": agent, "count": repeated})
+        for agent, counts in calls.items():
+            total, fail = counts["total"], counts["fails"]
+            if fail:
+                failures.append(
+                    {
+                        "agent": agent,
+                        "fails": fail,
+                        "total": total,
+                        "rate": fail / total if total else 0.0,
+                    }
+                )
 
         failures.sort(key=lambda x: x["rate"], reverse=True)
 
@@ -4,8 +4,11 @@ import argparse
 import json
 import os
 import shutil
+import subprocess
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -32,11 +35,36 @@ from tools.gen_agent_stats import generate_agent_stats
 from tools.gen_changelog import main as gen_changelog
 from tools.gen_multifeature_summary import generate_multifeature_summary
 from tools.gen_summary import generate_summary
+from utils import llm_cache, llm_metrics, run_registry, stage_cache
 from utils.agent_journal import read_entries
 from utils.backup_manager import restore_backup, save_backup
+from utils.checkpoint import Checkpoint
+from utils.llm_scheduler import call_context
 from pipeline_config import get_config
 
 STATUS_PATH = Path("pipeline_status.json")
+WORKSPACES_DIR = Path(".workspaces")
+# never copied into feature workspaces (Unity's Library is kept: reimport costs more)
+_WORKSPACE_IGNORE = shutil.ignore_patterns(
+    ".git",
+    ".workspaces",
+    "_backups",
+    "ci_reports",
+    "Temp",
+    "Logs",
+    "obj",
+    "Build",
+    "__pycache__",
+    ".llm_cache",
+    ".llm_locks",
+    ".stage_cache",
+    ".unity_clones",
+    ".unity_worker",
+    ".test_selection.json",
+    "venv",
+    ".venv",
+)
+_status_lock = threading.Lock()
 
 ALL_AGENTS = [
     "GameDesignerAgent",
@@ -81,10 +109,23 @@ def _init_features(names: list[str], multi: bool) -> None:
 
 
 def _update_feature(name: str, info: dict) -> None:
-    data = _load_pipeline()
-    feature = data.setdefault("features", {}).setdefault(name, {})
-    feature.update(info)
-    _save_pipeline(data)
+    with _status_lock:
+        data = _load_pipeline()
+        feature = data.setdefault("features", {}).setdefault(name, {})
+        feature.update(info)
+        _save_pipeline(data)
+
+
+def _update_stage(name: str, stage: str, status: str) -> None:
+    with _status_lock:
+        data = _load_pipeline()
+        feature = data.setdefault("features", {}).setdefault(name, {})
+        feature.setdefault("stages", {})[stage] = status
+        _save_pipeline(data)
+
+
+def _resuming() -> bool:
+    return os.getenv("PIPELINE_RESUME") == "1"
 
 
 def _apply_skip(base: list[str], flags: list[str]) -> list[str]:
@@ -102,17 +143,30 @@ def run_once(optimize: bool = False, feature_name: str = "single") -> tuple[Path
         opt = suggest_optimizations("agent_trace.log", "agent_learning.json")
         agents = _apply_skip(agents, opt["skip_flags"])
 
+    # stage outputs and files go to ci_reports/<feature>/checkpoint so --resume
+    # can skip whatever finished before an interruption
+    reports = Path(os.getenv("CI_REPORTS_DIR", "ci_reports"))
+    ckpt_dir = (reports if reports.name == feature_name else reports / feature_name) / "checkpoint"
+    checkpoint = Checkpoint(ckpt_dir, _resuming(), lambda stage, status: _update_stage(feature_name, stage, status))
+
+    def step_inputs(**extra) -> dict:
+        # a step re-runs on resume when an earlier stage produced something else
+        return {"feature": feature_name, "upstream": checkpoint.upstream(), **extra}
+
     if os.getenv("SKIP_PIPELINE") != "1":
-        run_pipeline.main(agents)
+        run_pipeline.main(agents, checkpoint=checkpoint)
 
-    reports = Path(os.getenv("CI_REPORTS_DIR", "ci_reports"))
     reports.mkdir(exist_ok=True)
     for name in ["review_report.md", "review_report.json"]:
         if Path(name).exists():
             shutil.copy(Path(name), reports / name)
 
-    ci_test.main()
-    insp_result = feature_inspector.run({"feature": feature_name, "out_dir": str(reports)})
+    checkpoint.step("ci_test", ci_test.main, step_inputs())
+    insp_result = checkpoint.step(
+        "FeatureInspectorAgent",
+        lambda: feature_inspector.run({"feature": feature_name, "out_dir": str(reports)}),
+        step_inputs(),
+    )
     desc = Path("core_loop.md").read_text(encoding="utf-8") if Path("core_loop.md").exists() else ""
     catalog = {}
     if Path("asset_catalog.json").exists():
@@ -124,24 +178,32 @@ def run_once(optimize: bool = False, feature_name: str = "single") -> tuple[Path
     for p in Path("narrative_events").glob("*.json") if Path("narrative_events").exists() else []:
         dialogues += p.read_text(encoding="utf-8") + "\n"
 
-    lore_result = lore_validator.run(
-        {
-            "feature": feature_name,
-            "description": desc,
-            "assets": catalog.get("assets", []),
-            "dialogues": dialogues,
-            "out_dir": str(reports),
-        }
+    lore_result = checkpoint.step(
+        "LoreValidatorAgent",
+        lambda: lore_validator.run(
+            {
+                "feature": feature_name,
+                "description": desc,
+                "assets": catalog.get("assets", []),
+                "dialogues": dialogues,
+                "out_dir": str(reports),
+            }
+        ),
+        step_inputs(description=desc, assets=catalog.get("assets", []), dialogues=dialogues),
     )
 
     if cfg["steps"].get("build", True):
-        ci_build.main()
+        checkpoint.step("ci_build", ci_build.main, step_inputs())
 
     run_escalation(out_dir=str(reports))
     if (reports / "teamlead_patch.json").exists():
         apply_emergency_patch(feature_name, str(reports / "teamlead_patch.json"))
 
-    review_result = feature_review_panel.run({"feature": feature_name, "out_dir": str(reports)})
+    review_result = checkpoint.step(
+        "AIReviewPanel",
+        lambda: feature_review_panel.run({"feature": feature_name, "out_dir": str(reports)}),
+        step_inputs(),
+    )
     ab_tracker.run({"out_dir": str(reports)})
     feedback_result = user_feedback.run({"out_dir": str(reports)})
 
@@ -157,11 +219,13 @@ def run_once(optimize: bool = False, feature_name: str = "single") -> tuple[Path
         except Exception as e:
             print(f"Asset pipeline failed: {e}")
 
+    # read_entries also flushes the buffered journal for the reports below
+    journal = read_entries()
     gen_changelog()
     generate_agent_stats(out_dir=str(reports))
     scores_path = generate_agent_scores(out_dir=str(reports))
 
-    summary_lines = ["# Final Summary", "", "## Agent log", *[f"- {entry}" for entry in read_entries()[-20:]]]
+    summary_lines = ["# Final Summary", "", "## Agent log", *[f"- {entry}" for entry in journal[-20:]]]
     agent_results = {
         "FeatureInspectorAgent": "success" if insp_result.get("verdict") == "Pass" else "error",
         "LoreValidatorAgent": "success" if lore_result.get("status") == "LorePass" else "error",
@@ -209,9 +273,11 @@ def run_once(optimize: bool = False, feature_name: str = "single") -> tuple[Path
         self_monitor=monitor_path,
         agent_scores=scores_path.as_posix(),
         out_dir=str(reports),
+        llm_usage=llm_metrics.totals(feature=feature_name)["by_agent"],
     )
 
     notify_all(str(summary_path), "CHANGELOG.md", urls)
+    checkpoint.finish()
     return summary_path, agent_results
 
 
@@ -232,7 +298,8 @@ def _run_feature(name: str, prompt: str | dict, optimize: bool) -> dict:
     status = "success"
     _update_feature(name, {"status": "running", "started": start})
     try:
-        summary, results = run_once(optimize, name)
+        with call_context(feature=name), run_registry.run_scope():
+            summary, results = run_once(optimize, name)
     except Exception as e:
         print(f"Feature {name} failed: {e}")
         status = "error"
@@ -265,14 +332,114 @@ def _run_feature(name: str, prompt: str | dict, optimize: bool) -> dict:
     return {"name": name, "status": status, "time": duration, "summary": rel_summary.as_posix()}
 
 
-def main(optimize: bool = False, multi: str | None = None) -> None:
+def _prepare_workspace(name: str) -> tuple[Path, Path, dict]:
+    """Copy the studio dir (and the Unity project if it lives elsewhere) for one worker.
+
+    When resuming, the workspace a failed worker left behind is reused as is.
+    Returns the workspace, its Unity project and the env overrides for the worker.
+    """
+    root = Path.cwd().resolve()
+    ws = (WORKSPACES_DIR / name).resolve()
+    project = Path(os.getenv("PROJECT_PATH", ".")).resolve()
+    ws_project = ws / project.relative_to(root) if project.is_relative_to(root) else ws / "unity_project"
+    if not (_resuming() and ws.exists()):
+        if ws.exists():
+            shutil.rmtree(ws)
+        shutil.copytree(root, ws, ignore=_WORKSPACE_IGNORE, symlinks=True)
+        if not project.is_relative_to(root):
+            shutil.copytree(project, ws_project, ignore=_WORKSPACE_IGNORE, symlinks=True)
+        reports = Path("ci_reports") / name
+        if _resuming() and reports.exists():
+            shutil.copytree(reports, ws / "ci_reports" / name)
+    env = {
+        "PROJECT_PATH": str(ws_project),
+        # shared between workers: answers, accounting and the LLM slot limit
+        "LLM_CACHE_DIR": str(llm_cache.CACHE_DIR.resolve()),
+        "LLM_METRICS_PATH": str(llm_metrics.METRICS_PATH.resolve()),
+        "LLM_SCHEDULER_LOCK_DIR": os.getenv("LLM_SCHEDULER_LOCK_DIR") or str(root / ".llm_locks"),
+        "STAGE_CACHE_DIR": str(stage_cache.CACHE_DIR.resolve()),
+        # the success state must outlive the workspace, which is removed after a pass
+        "BACKUP_ROOT": str(root / os.getenv("BACKUP_ROOT", "_backups")),
+    }
+    return ws, ws_project, env
+
+
+def _merge_assets(ws_project: Path, since: float) -> None:
+    """Copy Assets files a worker created or changed back into the Unity project."""
+    src = ws_project / "Assets"
+    dest = Path(os.getenv("PROJECT_PATH", ".")) / "Assets"
+    for path in src.rglob("*") if src.exists() else []:
+        if path.is_file() and path.stat().st_mtime >= since:
+            target = dest / path.relative_to(src)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(path, target)
+
+
+def _run_feature_isolated(name: str, prompt: str | dict, optimize: bool) -> dict:
+    """Run one feature in a worker process inside its own workspace."""
+    ws, ws_project, env = _prepare_workspace(name)
+    (ws / "feature_prompt.json").write_text(json.dumps(prompt, ensure_ascii=False), encoding="utf-8")
+    start = time.time()
+    _update_feature(name, {"status": "running", "started": start})
+    cmd = [sys.executable, str(Path(__file__).resolve()), "--worker", name]
+    if optimize:
+        cmd.append("--optimize")
+    with (ws / "worker.log").open("w", encoding="utf-8") as log:
+        subprocess.run(cmd, cwd=ws, env={**os.environ, **env}, stdout=log, stderr=subprocess.STDOUT)
+
+    result_path = ws / "feature_result.json"
+    if result_path.exists():
+        result = json.loads(result_path.read_text(encoding="utf-8"))
+        info = json.loads((ws / STATUS_PATH.name).read_text(encoding="utf-8"))["features"][name]
+    else:
+        print(f"Feature {name} worker crashed, see {ws / 'worker.log'}")
+        duration = round(time.time() - start, 2)
+        result = {"name": name, "status": "error", "time": duration, "summary": f"{name}/summary.html"}
+        info = {"status": "failed", "ended": time.time(), "duration": duration, "summary_path": result["summary"]}
+
+    reports = ws / "ci_reports" / name
+    if reports.exists():
+        shutil.copytree(reports, Path("ci_reports") / name, dirs_exist_ok=True)
+    if result["status"] == "success":
+        _merge_assets(ws_project, start)
+        shutil.rmtree(ws, ignore_errors=True)
+    _update_feature(name, info)
+    print(f"=== {name}: {result['status']} ({result['time']}s)")
+    return result
+
+
+def _worker_main(name: str, optimize: bool) -> None:
+    """Entry point of a ``--jobs`` worker; runs inside the feature workspace."""
+    prompt = json.loads(Path("feature_prompt.json").read_text(encoding="utf-8"))
+    if not (_resuming() and name in _load_pipeline()["features"]):
+        _init_features([name], True)
+    result = _run_feature(name, prompt, optimize)
+    Path("feature_result.json").write_text(json.dumps(result, ensure_ascii=False), encoding="utf-8")
+
+
+def _previous_result(name: str) -> dict | None:
+    """Return the result of ``name`` from the last run if it passed."""
+    info = _load_pipeline()["features"].get(name) or {}
+    if info.get("status") != "passed":
+        return None
+    return {"name": name, "status": "success", "time": info.get("duration"), "summary": info.get("summary_path", "")}
+
+
+def main(optimize: bool = False, multi: str | None = None, jobs: int = 1, resume: bool = False) -> None:
+    if resume:
+        os.environ["PIPELINE_RESUME"] = "1"
     if not multi:
         name = "single"
-        _init_features([name], False)
+        if resume and _previous_result(name):
+            print("Nothing to resume: the last run passed")
+            return
+        if not (resume and name in _load_pipeline()["features"]):
+            _init_features([name], False)
         start = time.time()
         _update_feature(name, {"status": "running", "started": start})
         try:
-            summary, results = run_once(optimize, name)
+            with call_context(feature=name), run_registry.run_scope():
+                summary, results = run_once(optimize, name)
             status = "passed"
         except Exception:
             status = "failed"
@@ -301,13 +468,35 @@ def main(optimize: bool = False, multi: str | None = None) -> None:
         print("Invalid YAML format: expected 'features' mapping")
         sys.exit(1)
     features = data["features"]
-    _init_features(list(features.keys()), True)
+    done = {}
+    if resume:
+        done = {f: r for f in features if (r := _previous_result(f))}
+        previous = _load_pipeline()["features"]
+        _init_features([f for f in features if f not in previous], True)
+        with _status_lock:
+            status = _load_pipeline()
+            status["features"].update({f: previous[f] for f in features if f in previous})
+            status["multi"] = True
+            _save_pipeline(status)
+        for fname in done:
+            print(f"=== {fname}: passed earlier, skipped")
+    else:
+        _init_features(list(features.keys()), True)
+    todo = {f: p for f, p in features.items() if f not in done}
 
     results = []
     start_all = datetime.now(timezone.utc)
-    for fname, prompt in features.items():
-        print(f"\n=== {fname} ===")
-        results.append(_run_feature(fname, prompt, optimize))
+    if jobs > 1:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            futures = {f: pool.submit(_run_feature_isolated, f, p, optimize) for f, p in todo.items()}
+            results = [done[f] if f in done else futures[f].result() for f in features]
+    else:
+        for fname, prompt in features.items():
+            if fname in done:
+                results.append(done[fname])
+                continue
+            print(f"\n=== {fname} ===")
+            results.append(_run_feature(fname, prompt, optimize))
     total_time = round((datetime.now(timezone.utc) - start_all).total_seconds(), 2)
     summary = generate_multifeature_summary("ci_reports", results, total_time)
     print(f"Multi summary: {summary}")
@@ -317,5 +506,11 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Run full pipeline")
     parser.add_argument("--optimize", action="store_true", help="Use pipeline optimizer")
     parser.add_argument("--multi", help="Path to YAML with multiple features")
+    parser.add_argument("--jobs", type=int, default=1, help="Run --multi features in N worker processes")
+    parser.add_argument("--resume", action="store_true", help="Continue interrupted features from their checkpoints")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
     args = parser.parse_args()
-    main(optimize=args.optimize, multi=args.multi)
+    if args.worker:
+        _worker_main(args.worker, args.optimize)
+    else:
+        main(optimize=args.optimize, multi=args.multi, jobs=args.jobs, resume=args.resume)
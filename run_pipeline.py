@@ -5,6 +5,7 @@ from pathlib import Path
 
 import agent_learning
 import agent_memory
+import config
 from agents.tech import (
     architect_agent,
     build_agent,
@@ -16,12 +17,12 @@ from agents.tech import (
     tester,
 )
 from agents.tech.project_manager import run as task_manager
-from agents.tech.tester import run as run_tests
 from auto_fix import auto_fix
 from dashboard import main as show_dashboard
 from utils.agent_journal import log_action
-from utils.apply_patch import apply_patch
+from utils.apply_patch import apply_patch, unity_target
 from utils.feature_index import update_feature
+from utils.stage_graph import Stage, run_stages
 
 
 def ask_multiline() -> str:
@@ -35,65 +36,48 @@ def ask_multiline() -> str:
     return "\n".join(lines).strip()
 
 
-def main(agents: list[str] | None = None, use_memory: bool = False):
+def _hint(use_memory: bool, agent: str, data) -> None:
     if use_memory:
-        agent_memory.enable()
-    user_prompt = ask_multiline()
-    if not user_prompt:
-        print("❌ Пустой запрос — завершаю.")
-        return
-
-    if use_memory:
-        hint = agent_learning.get_agent_hint("ProjectManagerAgent", user_prompt)
+        hint = agent_learning.get_agent_hint(agent, data)
         if hint:
-            print(f"💡 Hint for ProjectManagerAgent: {hint}")
+            print(f"💡 Hint for {agent}: {hint}")
+
 
-    # 1. Разбивка запроса
-    if not agents or "ProjectManagerAgent" in agents:
+def build_stages(
+    user_prompt, agents: list[str] | None = None, use_memory: bool = False
+) -> tuple[list[Stage], list[str]]:
+    """Return the pipeline stages and the values the run must produce.
+
+    Agents missing from ``agents`` are replaced by stages yielding their
+    previous fallback values; those only run if an enabled agent needs them.
+    """
+
+    def plan_tasks(prompt):
+        _hint(use_memory, "ProjectManagerAgent", prompt)
         try:
-            task_spec = task_manager(user_prompt)
-            agent_learning.record_interaction("ProjectManagerAgent", user_prompt, task_spec, "success")
+            task_spec = task_manager(prompt)
+            agent_learning.record_interaction("ProjectManagerAgent", prompt, task_spec, "success")
         except Exception as e:  # noqa: PERF203
-            agent_learning.record_interaction("ProjectManagerAgent", user_prompt, str(e), "error")
+            agent_learning.record_interaction("ProjectManagerAgent", prompt, str(e), "error")
             raise
-    else:
-        task_spec = {}
-    print("📋 Task-spec:")
-    print(json.dumps(task_spec, indent=2, ensure_ascii=False))
-    log_action("TeamLead", "pipeline start")
+        print("📋 Task-spec:")
+        print(json.dumps(task_spec, indent=2, ensure_ascii=False))
+        return {"task_spec": task_spec}
 
-    # 2. Генерация патча
-    if use_memory:
-        hint = agent_learning.get_agent_hint("CoderAgent", task_spec)
-        if hint:
-            print(f"💡 Hint for CoderAgent: {hint}")
-    patch = coder.run(task_spec)
-    agent_learning.record_interaction("CoderAgent", task_spec, patch, "success")
-    print("🛠️ Patch:")
-    print(json.dumps(patch, indent=2, ensure_ascii=False))
-    # 1. Идея фичи
-    if not agents or "GameDesignerAgent" in agents:
-        if use_memory:
-            hint = agent_learning.get_agent_hint("GameDesignerAgent", user_prompt)
-            if hint:
-                print(f"💡 Hint for GameDesignerAgent: {hint}")
+    def design(prompt):
+        _hint(use_memory, "GameDesignerAgent", prompt)
         try:
-            gd_text = user_prompt if isinstance(user_prompt, str) else json.dumps(user_prompt, ensure_ascii=False)
+            gd_text = prompt if isinstance(prompt, str) else json.dumps(prompt, ensure_ascii=False)
             feature = game_designer.run({"text": gd_text})
             log_action("GameDesignerAgent", feature.get("feature", ""))
-            agent_learning.record_interaction("GameDesignerAgent", user_prompt, feature, "success")
+            agent_learning.record_interaction("GameDesignerAgent", prompt, feature, "success")
         except Exception as e:  # noqa: PERF203
-            agent_learning.record_interaction("GameDesignerAgent", user_prompt, str(e), "error")
+            agent_learning.record_interaction("GameDesignerAgent", prompt, str(e), "error")
             raise
-    else:
-        feature = {"feature": user_prompt}
-
-    # 2. Архитектура
-    if not agents or "ArchitectAgent" in agents:
-        if use_memory:
-            hint = agent_learning.get_agent_hint("ArchitectAgent", feature)
-            if hint:
-                print(f"💡 Hint for ArchitectAgent: {hint}")
+        return {"feature": feature}
+
+    def architect(feature):
+        _hint(use_memory, "ArchitectAgent", feature)
         try:
             arch = architect_agent.run(feature)
             log_action("ArchitectAgent", arch.get("path", ""))
@@ -101,20 +85,17 @@ def main(agents: list[str] | None = None, use_memory: bool = False):
         except Exception as e:  # noqa: PERF203
             agent_learning.record_interaction("ArchitectAgent", feature, str(e), "error")
             raise
-    else:
-        arch = feature
-
-    task_list = task_spec.get("tasks") or []
-    for task in task_list:
-        if task.get("attach_to_scene") is True:
-            scene_builder_agent.run({"path": arch.get("path"), **task})
-
-    # 3. Код
-    if not agents or "CoderAgent" in agents:
-        if use_memory:
-            hint = agent_learning.get_agent_hint("CoderAgent", arch)
-            if hint:
-                print(f"💡 Hint for CoderAgent: {hint}")
+        return {"arch": arch}
+
+    def build_scenes(task_spec, arch):
+        scenes = []
+        for task in task_spec.get("tasks") or []:
+            if task.get("attach_to_scene") is True:
+                scenes.append(scene_builder_agent.run({"path": arch.get("path"), **task}))
+        return {"scene": scenes}
+
+    def code(arch, feature):
+        _hint(use_memory, "CoderAgent", arch)
         try:
             patch = coder.run(arch)
             log_action("CoderAgent", "patch generated")
@@ -127,32 +108,18 @@ def main(agents: list[str] | None = None, use_memory: bool = False):
             log_action("CoderAgent", "patch generated")
             apply_patch(patch)
             agent_learning.record_interaction("CoderAgent", arch, patch, "error")
+        print("🛠️ Patch:")
+        print(json.dumps(patch, indent=2, ensure_ascii=False))
+        return {"patch": patch}
 
-    # 3. Тесты Unity CLI
-    if not agents or "TesterAgent" in agents:
-        if use_memory:
-            hint = agent_learning.get_agent_hint("TesterAgent", task_spec)
-            if hint:
-                print(f"💡 Hint for TesterAgent: {hint}")
-        report = run_tests(task_spec)
-        print("✅ Tester report:")
-        print(json.dumps(report, indent=2, ensure_ascii=False))
-        agent_learning.record_interaction("TesterAgent", task_spec, report, "success")
-    # 4. Review
-    if not agents or "ReviewAgent" in agents:
-        if use_memory:
-            hint = agent_learning.get_agent_hint("ReviewAgent", {})
-            if hint:
-                print(f"💡 Hint for ReviewAgent: {hint}")
+    def review(patch):
+        _hint(use_memory, "ReviewAgent", {})
         result = review_agent.run({})
         agent_learning.record_interaction("ReviewAgent", {}, result, "success")
+        return {"review": result}
 
-    # 5. Тесты
-    if not agents or "TesterAgent" in agents:
-        if use_memory:
-            hint = agent_learning.get_agent_hint("TesterAgent", arch)
-            if hint:
-                print(f"💡 Hint for TesterAgent: {hint}")
+    def test(arch, patch, feature, scene):
+        _hint(use_memory, "TesterAgent", arch)
         try:
             report = tester.run(arch)
             if report["failed"]:
@@ -163,18 +130,17 @@ def main(agents: list[str] | None = None, use_memory: bool = False):
             agent_learning.record_interaction("AutoFix", str(e), fix_result, "success" if fix_result else "error")
             report = tester.run(arch)
             agent_learning.record_interaction("TesterAgent", arch, report, "error")
+        print("✅ Tester report:")
+        print(json.dumps(report, indent=2, ensure_ascii=False))
         log_action("TesterAgent", f"passed={report['passed']} failed={report['failed']}")
         if report["failed"]:
             update_feature("FT-unknown", feature.get("feature", ""), "failed")
             log_action("TeamLead", "tests failed")
             raise SystemExit("❌ Тесты упали")
+        return {"report": report}
 
-    # 6. Сборка
-    if not agents or "BuildAgent" in agents:
-        if use_memory:
-            hint = agent_learning.get_agent_hint("BuildAgent", {"target": "WebGL"})
-            if hint:
-                print(f"💡 Hint for BuildAgent: {hint}")
+    def build(report, feature):
+        _hint(use_memory, "BuildAgent", {"target": "WebGL"})
         try:
             build_info = build_agent.run({"target": "WebGL"})
             agent_learning.record_interaction("BuildAgent", {"target": "WebGL"}, build_info, "success")
@@ -184,16 +150,136 @@ def main(agents: list[str] | None = None, use_memory: bool = False):
             build_info = build_agent.run({"target": "WebGL"})
             agent_learning.record_interaction("BuildAgent", {"target": "WebGL"}, build_info, "error")
         log_action("BuildAgent", build_info.get("status", ""))
+        return {"build": build_info}
 
-    # 7. Refactor
-    if not agents or "RefactorAgent" in agents:
-        if use_memory:
-            hint = agent_learning.get_agent_hint("RefactorAgent", {})
-            if hint:
-                print(f"💡 Hint for RefactorAgent: {hint}")
+    def refactor(patch, build):
+        _hint(use_memory, "RefactorAgent", {})
         result = refactor_agent.run({})
         agent_learning.record_interaction("RefactorAgent", {}, result, "success")
+        return {"refactor": result}
+
+    # Unity and dotnet both rewrite/compile the same project tree, so the
+    # stages touching it hold the "project" resource one at a time.
+    project = ("project",)
+    # deterministic stages are memoized on their inputs plus these sources
+    unity_project = Path(config.PROJECT_PATH)
+    unity_sources = tuple(str(unity_project / d) for d in ("Assets", "Packages", "ProjectSettings"))
+    spec = [
+        (Stage("ProjectManagerAgent", plan_tasks, ("prompt",), ("task_spec",)), {"task_spec": {}}),
+        (Stage("GameDesignerAgent", design, ("prompt",), ("feature",)), {"feature": {"feature": user_prompt}}),
+        (
+            Stage(
+                "ArchitectAgent",
+                architect,
+                ("feature",),
+                ("arch",),
+                cache=True,
+                sources=(architect_agent.__file__,),
+                artifacts=lambda out: [
+                    Path(config.UNITY_SCRIPTS_PATH) / "Generated" / f"{out['arch']['asmdef']}.asmdef"
+                ],
+            ),
+            None,
+        ),
+        (
+            Stage(
+                "SceneBuilderAgent",
+                build_scenes,
+                ("task_spec", "arch"),
+                ("scene",),
+                cache=True,
+                sources=(scene_builder_agent.__file__,),
+                artifacts=lambda out: [s["scene_path"] for s in out["scene"]],
+            ),
+            {"scene": []},
+        ),
+        (
+            Stage(
+                "CoderAgent",
+                code,
+                ("arch", "feature"),
+                ("patch",),
+                artifacts=lambda out: [unity_target(m["path"]) for m in out["patch"].get("modifications", [])],
+            ),
+            {"patch": None},
+        ),
+        (
+            Stage(
+                "ReviewAgent",
+                review,
+                ("patch",),
+                ("review",),
+                project,
+                artifacts=lambda out: ["review_report.json", "review_report.md"],
+            ),
+            {"review": None},
+        ),
+        (
+            Stage(
+                "TesterAgent",
+                test,
+                ("arch", "patch", "feature", "scene"),
+                ("report",),
+                project,
+                cache=True,
+                sources=(tester.__file__, *unity_sources),
+                artifacts=lambda out: [*out["report"]["report_paths"], "metrics.json", "Assets/Tests/Generated"],
+                cacheable=lambda out: not out["report"].get("failed"),
+            ),
+            {"report": None},
+        ),
+        (
+            Stage(
+                "BuildAgent",
+                build,
+                ("report", "feature"),
+                ("build",),
+                project,
+                cache=True,
+                sources=(build_agent.__file__, *unity_sources),
+                artifacts=lambda out: ["build.log", out["build"]["artifact"], f"Build/{out['build']['target']}"],
+                cacheable=lambda out: out["build"].get("status") == "success",
+            ),
+            {"build": None},
+        ),
+        (
+            Stage(
+                "RefactorAgent",
+                refactor,
+                ("patch", "build"),
+                ("refactor",),
+                project,
+                artifacts=lambda out: [out["refactor"]["report"]],
+            ),
+            {"refactor": None},
+        ),
+    ]
+    stages, targets = [], []
+    for stage, fallback in spec:
+        if not agents or stage.name in agents:
+            stages.append(stage)
+            targets.extend(stage.outputs)
+        elif fallback is None:
+            # without ArchitectAgent the feature itself is the architecture
+            stages.append(Stage(f"{stage.name}:skipped", lambda feature: {"arch": feature}, ("feature",), ("arch",)))
+        else:
+            stages.append(Stage(f"{stage.name}:skipped", lambda value=fallback: value, (), stage.outputs))
+    return stages, targets
+
+
+def main(agents: list[str] | None = None, use_memory: bool = False, checkpoint=None):
+    if use_memory:
+        agent_memory.enable()
+    user_prompt = ask_multiline()
+    if not user_prompt:
+        print("❌ Пустой запрос — завершаю.")
+        return
+
+    log_action("TeamLead", "pipeline start")
+    stages, targets = build_stages(user_prompt, agents, use_memory)
+    values = run_stages(stages, {"prompt": user_prompt}, targets, checkpoint=checkpoint)
 
+    feature = values.get("feature") or {"feature": user_prompt}
     update_feature("FT-unknown", feature.get("feature", ""), "done")
 
     config_path = Path("config.json")
@@ -0,0 +1,233 @@
+"""Deterministic stand-in for the Ollama ``/api/generate`` endpoint.
+
+Used to benchmark the pipeline without a GPU. Responses, latency and
+token rate come from a YAML config (see ``fixtures/fake_ollama.yaml``)::
+
+    seed: 42
+    latency: {dist: normal, mean: 0.2, stddev: 0.05}   # time to first token
+    tokens_per_sec: 200
+    rules:
+      - pattern: "called (?P<cls>\\w+)"
+        response: "public class $cls {}"
+    default: "OK"
+
+Rules are regular expressions searched in the prompt; named groups and
+``$prompt`` are substituted with ``string.Template``. The same prompt and
+seed always produce the same latency.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from string import Template
+from typing import Any, Dict, List
+
+import yaml
+
+DEFAULT_CONFIG: Dict[str, Any] = {
+    "seed": 0,
+    "latency": {"dist": "fixed", "mean": 0.0},
+    "tokens_per_sec": 0,
+    "load_seconds": 0.0,
+    "rules": [],
+    "default": "OK",
+}
+
+
+def load_config(path: str | Path | None) -> Dict[str, Any]:
+    cfg = dict(DEFAULT_CONFIG)
+    if path:
+        data = yaml.safe_load(Path(path).read_text(encoding="utf-8")) or {}
+        cfg.update(data)
+    return cfg
+
+
+def _tokens(text: str) -> List[str]:
+    return re.findall(r"\s*\S+", text) or [text]
+
+
+class FakeOllama:
+    """Threaded HTTP server emulating Ollama generation."""
+
+    def __init__(self, config: Dict[str, Any] | None = None) -> None:
+        self.config = {**DEFAULT_CONFIG, **(config or {})}
+        self._rules = [(re.compile(r["pattern"], re.S), r["response"]) for r in self.config.get("rules", [])]
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "streamed": 0, "inflight": 0, "peak_inflight": 0}
+        self._server: ThreadingHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+
+    # behaviour
+    def respond(self, prompt: str) -> str:
+        for pattern, template in self._rules:
+            match = pattern.search(prompt)
+            if match:
+                values = {k: v or "" for k, v in match.groupdict().items()}
+                return Template(template).safe_substitute(prompt=prompt, **values)
+        return Template(str(self.config.get("default", ""))).safe_substitute(prompt=prompt)
+
+    def latency(self, prompt: str) -> float:
+        spec = self.config.get("latency") or {}
+        rng = random.Random(f"{self.config.get('seed', 0)}:{prompt}")
+        dist = spec.get("dist", "fixed")
+        mean = float(spec.get("mean", 0.0))
+        if dist == "uniform":
+            value = rng.uniform(float(spec.get("low", 0.0)), float(spec.get("high", mean)))
+        elif dist == "normal":
+            value = rng.gauss(mean, float(spec.get("stddev", 0.0)))
+        else:
+            value = mean
+        return max(value, 0.0)
+
+    def token_delay(self) -> float:
+        rate = float(self.config.get("tokens_per_sec") or 0)
+        return 1.0 / rate if rate > 0 else 0.0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+    def _enter(self, stream: bool) -> None:
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["streamed"] += int(stream)
+            self._stats["inflight"] += 1
+            self._stats["peak_inflight"] = max(self._stats["peak_inflight"], self._stats["inflight"])
+
+    def _leave(self) -> None:
+        with self._lock:
+            self._stats["inflight"] -= 1
+
+    # server lifecycle
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Serve in a background thread and return the base URL."""
+        self._server = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return f"http://{host}:{self._server.server_address[1]}"
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def serve_forever(self, host: str = "127.0.0.1", port: int = 11434) -> None:
+        self._server = ThreadingHTTPServer((host, port), _make_handler(self))
+        print(f"🤖 Fake Ollama running on http://{host}:{port}/api/generate")
+        self._server.serve_forever()
+
+
+def _make_handler(fake: FakeOllama):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args) -> None:  # noqa: D401
+            pass
+
+        def do_GET(self) -> None:  # noqa: D401
+            if self.path == "/api/tags":
+                self._send_json({"models": [{"name": "mistral"}]})
+            elif self.path == "/stats":
+                self._send_json(fake.stats())
+            else:
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+        def do_POST(self) -> None:  # noqa: D401
+            if self.path != "/api/generate":
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                body = json.loads(self.rfile.read(length) or b"{}")
+            except json.JSONDecodeError:
+                self._send_json({"error": "invalid json"}, 400)
+                return
+            prompt = body.get("prompt", "")
+            stream = body.get("stream", True)
+            fake._enter(bool(stream))
+            try:
+                self._generate(body.get("model", "mistral"), prompt, bool(stream))
+            finally:
+                fake._leave()
+
+        def _generate(self, model: str, prompt: str, stream: bool) -> None:
+            start = time.monotonic()
+            text = fake.respond(prompt)
+            tokens = _tokens(text)
+            delay = fake.token_delay()
+            load = float(fake.config.get("load_seconds") or 0.0)
+            time.sleep(fake.latency(prompt) + load)
+            eval_start = time.monotonic()
+            final = {
+                "model": model,
+                "response": "",
+                "done": True,
+                "prompt_eval_count": len(_tokens(prompt)),
+                "eval_count": len(tokens),
+                "load_duration": int(load * 1e9),
+            }
+            if not stream:
+                time.sleep(delay * len(tokens))
+                final["response"] = text
+                final["eval_duration"] = int((time.monotonic() - eval_start) * 1e9)
+                final["total_duration"] = int((time.monotonic() - start) * 1e9)
+                self._send_json(final)
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            try:
+                for token in tokens:
+                    if delay:
+                        time.sleep(delay)
+                    self._chunk({"model": model, "response": token, "done": False})
+                final["eval_duration"] = int((time.monotonic() - eval_start) * 1e9)
+                final["total_duration"] = int((time.monotonic() - start) * 1e9)
+                self._chunk(final)
+                self.wfile.write(b"0\r\n\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                # client aborted the generation
+                self.close_connection = True
+
+        def _chunk(self, data: dict) -> None:
+            line = (json.dumps(data, ensure_ascii=False) + "\n").encode("utf-8")
+            self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+            self.wfile.flush()
+
+        def _send_json(self, data: dict, code: int = 200) -> None:
+            body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a fake Ollama server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--config", help="YAML with rules, latency and token rate")
+    args = parser.parse_args()
+    FakeOllama(load_config(args.config)).serve_forever(args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
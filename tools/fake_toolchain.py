@@ -0,0 +1,393 @@
+"""Stand-in Unity CLI and dotnet executables for pipeline benchmarks.
+
+``python tools/fake_toolchain.py install <dir>`` writes ``unity``, ``dotnet``
+and ``flake8`` shims (plus ``.cmd`` variants for Windows) into ``<dir>`` and
+prints the environment needed to use them::
+
+    UNITY_CLI=<dir>/unity  PATH=<dir>:$PATH
+
+The shims call back into this module, which emulates the subset of the CLIs
+used by the agents: Unity ``-runTests`` (NUnit 3 XML results), Unity
+``-buildTarget`` (``Build/<target>`` folder) and ``dotnet build`` /
+``dotnet format`` (analyzer output); ``flake8`` reports a clean tree. Like
+the editor, a Unity process refuses a project another one has open.
+``-executeMethod AIUnityStudio.Editor.AIStudioWorker.Run`` emulates the warm
+editor of ``utils/unity_worker.py``: it pays the startup once and then serves
+the job files in ``-workerDir``.
+Timings and failure rates come from the YAML file in
+``FAKE_TOOLCHAIN_CONFIG``; outcomes are derived from the seed
+and a per-tool invocation counter, so repeated runs behave identically.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import random
+import re
+import sys
+import time
+from contextlib import redirect_stderr, redirect_stdout
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+from xml.sax.saxutils import escape, quoteattr
+
+import yaml
+
+try:
+    import fcntl
+except ImportError:  # Windows: no project lock emulation
+    fcntl = None
+
+DEFAULT_CONFIG: Dict[str, Any] = {
+    "seed": 1,
+    "unity": {
+        "startup_seconds": 0.5,
+        "heartbeat_seconds": 0.2,
+        "tests": {"EditMode": 20, "PlayMode": 10},
+        "test_seconds": 0.01,
+        "fail_rate": 0.0,
+        "build_seconds": 1.0,
+        "build_fail_rate": 0.0,
+    },
+    "dotnet": {
+        "build_seconds": 0.3,
+        "format_seconds": 0.1,
+        "warnings": 2,
+        "fail_rate": 0.0,
+    },
+    "flake8": {"seconds": 0.1},
+}
+
+STATE_DIR = Path(os.getenv("FAKE_TOOLCHAIN_STATE", ".fake_toolchain"))
+
+
+def load_config() -> Dict[str, Any]:
+    cfg = json.loads(json.dumps(DEFAULT_CONFIG))
+    path = os.getenv("FAKE_TOOLCHAIN_CONFIG")
+    if path and Path(path).exists():
+        data = yaml.safe_load(Path(path).read_text(encoding="utf-8")) or {}
+        for key, value in data.items():
+            if isinstance(value, dict) and isinstance(cfg.get(key), dict):
+                cfg[key].update(value)
+            else:
+                cfg[key] = value
+    return cfg
+
+
+def _next_invocation(tool: str, argv: List[str]) -> int:
+    """Bump and return the invocation counter of ``tool``; log the call."""
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    counter = STATE_DIR / f"{tool}.count"
+    try:
+        count = int(counter.read_text(encoding="utf-8")) + 1
+    except (OSError, ValueError):
+        count = 1
+    counter.write_text(str(count), encoding="utf-8")
+    with (STATE_DIR / "invocations.jsonl").open("a", encoding="utf-8") as f:
+        f.write(json.dumps({"tool": tool, "args": argv, "time": time.time()}) + "\n")
+    return count
+
+
+def _arg(argv: List[str], name: str, default: str | None = None) -> str | None:
+    if name in argv:
+        idx = argv.index(name)
+        if idx + 1 < len(argv):
+            return argv[idx + 1]
+    return default
+
+
+def _test_classes(project: Path) -> List[tuple[str, str]]:
+    """Return ``(namespace, class)`` of generated test fixtures in the project."""
+    found = []
+    for root in {project, Path.cwd()}:
+        test_dir = root / "Assets" / "Tests"
+        if not test_dir.exists():
+            continue
+        for path in sorted(test_dir.rglob("Test_*.cs")):
+            text = path.read_text(encoding="utf-8", errors="ignore")
+            ns = re.search(r"namespace\s+([\w.]+)", text)
+            found.append((ns.group(1) if ns else "Tests", path.stem))
+    return found or [("AIUnityStudio.Generated.Tests", "Test_Sample")]
+
+
+def _matches(fullname: str, test_filter: str | None) -> bool:
+    if not test_filter:
+        return True
+    for part in test_filter.split(";"):
+        try:
+            if re.search(part, fullname):
+                return True
+        except re.error:
+            if part in fullname:
+                return True
+    return False
+
+
+def render_results(platform: str, cases: List[Dict[str, Any]], started: datetime) -> str:
+    """Render a Unity-style NUnit 3 ``test-run`` document."""
+    passed = sum(1 for c in cases if c["result"] == "Passed")
+    failed = sum(1 for c in cases if c["result"] == "Failed")
+    skipped = sum(1 for c in cases if c["result"] == "Skipped")
+    duration = sum(c["duration"] for c in cases)
+    result = "Failed" if failed else "Passed"
+    stamp = started.strftime("%Y-%m-%d %H:%M:%SZ")
+    lines = [
+        '<?xml version="1.0" encoding="utf-8"?>',
+        f'<test-run id="2" testcasecount="{len(cases)}" result="{result}" total="{len(cases)}" '
+        f'passed="{passed}" failed="{failed}" inconclusive="0" skipped="{skipped}" asserts="0" '
+        f'engine-version="3.5.0.0" clr-version="4.0.30319.42000" start-time="{stamp}" '
+        f'end-time="{stamp}" duration="{duration:.6f}">',
+        f'  <test-suite type="TestSuite" id="1000" name="{platform}" fullname="{platform}" '
+        f'runstate="Runnable" testcasecount="{len(cases)}" result="{result}" total="{len(cases)}" '
+        f'passed="{passed}" failed="{failed}" skipped="{skipped}" duration="{duration:.6f}">',
+    ]
+    by_fixture: Dict[str, List[Dict[str, Any]]] = {}
+    for case in cases:
+        by_fixture.setdefault(case["classname"], []).append(case)
+    for idx, (fixture, items) in enumerate(by_fixture.items(), start=1001):
+        name = fixture.rsplit(".", 1)[-1]
+        lines.append(
+            f'    <test-suite type="TestFixture" id="{idx}" name="{name}" fullname="{fixture}" '
+            f'classname="{fixture}" runstate="Runnable" testcasecount="{len(items)}">'
+        )
+        for n, case in enumerate(items):
+            attrs = (
+                f'id="{idx}{n:03d}" name={quoteattr(case["name"])} fullname={quoteattr(case["fullname"])} '
+                f'methodname={quoteattr(case["name"])} classname={quoteattr(fixture)} runstate="Runnable" '
+                f'result="{case["result"]}" start-time="{stamp}" end-time="{stamp}" '
+                f'duration="{case["duration"]:.6f}" asserts="0"'
+            )
+            if case["result"] == "Failed":
+                lines += [
+                    f"      <test-case {attrs}>",
+                    "        <failure>",
+                    f"          <message>{escape(case['message'])}</message>",
+                    f"          <stack-trace>at {escape(case['fullname'])} () [0x00000]</stack-trace>",
+                    "        </failure>",
+                    "      </test-case>",
+                ]
+            else:
+                lines.append(f"      <test-case {attrs} />")
+        lines.append("    </test-suite>")
+    lines += ["  </test-suite>", "</test-run>"]
+    return "\n".join(lines) + "\n"
+
+
+def _run_tests(argv: List[str], cfg: Dict[str, Any], rng: random.Random) -> int:
+    unity = cfg["unity"]
+    platform = _arg(argv, "-testPlatform", "EditMode") or "EditMode"
+    result_file = Path(_arg(argv, "-testResults", "results.xml") or "results.xml")
+    project = Path(_arg(argv, "-projectPath", ".") or ".")
+    test_filter = _arg(argv, "-testFilter")
+    per_class = max(int((unity.get("tests") or {}).get(platform, 10)), 1)
+    classes = _test_classes(project)
+    started = datetime.utcnow()
+    cases = []
+    for i in range(per_class):
+        ns, cls = classes[i % len(classes)]
+        name = f"{platform}_Case{i:03d}"
+        fullname = f"{ns}.{cls}.{name}"
+        if not _matches(fullname, test_filter):
+            continue
+        failed = rng.random() < float(unity.get("fail_rate", 0.0))
+        duration = float(unity.get("test_seconds", 0.0)) * (0.5 + rng.random())
+        cases.append(
+            {
+                "name": name,
+                "fullname": fullname,
+                "classname": f"{ns}.{cls}",
+                "result": "Failed" if failed else "Passed",
+                "duration": duration,
+                "message": f"Expected: True\n  But was:  False ({name})",
+            }
+        )
+    time.sleep(sum(c["duration"] for c in cases))
+    result_file.parent.mkdir(parents=True, exist_ok=True)
+    result_file.write_text(render_results(platform, cases, started), encoding="utf-8")
+    failed = sum(1 for c in cases if c["result"] == "Failed")
+    print(f"[fake-unity] {platform}: {len(cases) - failed} passed, {failed} failed -> {result_file}")
+    # Unity returns 2 when tests fail but the run itself completed
+    return 2 if failed else 0
+
+
+def _build(argv: List[str], cfg: Dict[str, Any], rng: random.Random, out_dir: Path | None = None) -> int:
+    unity = cfg["unity"]
+    target = _arg(argv, "-buildTarget", "WebGL") or "WebGL"
+    time.sleep(float(unity.get("build_seconds", 0.0)))
+    if rng.random() < float(unity.get("build_fail_rate", 0.0)):
+        print(f"[fake-unity] Build {target} failed", file=sys.stderr)
+        print("error CS0246: The type or namespace name 'Missing' could not be found", file=sys.stderr)
+        return 1
+    out_dir = out_dir or Path("Build") / target
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / "index.html").write_text(f"<html><body>{target} build</body></html>", encoding="utf-8")
+    (out_dir / "Build.data").write_bytes(rng.randbytes(4096))
+    print(f"[fake-unity] Build {target} succeeded -> {out_dir}")
+    return 0
+
+
+def _lock_project(argv: List[str]):
+    """Hold ``Temp/UnityLockfile`` of the project; ``None`` if another process does."""
+    lock = Path(_arg(argv, "-projectPath", ".") or ".") / "Temp" / "UnityLockfile"
+    lock.parent.mkdir(parents=True, exist_ok=True)
+    handle = lock.open("a")
+    if fcntl is not None:
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return None
+    return handle
+
+
+def _run_job(job: Dict[str, Any], project: str, cfg: Dict[str, Any]) -> int:
+    count = _next_invocation("unity-job", [job.get("kind", "")])
+    rng = random.Random(f"{cfg.get('seed')}:unity-job:{count}")
+    if job.get("kind") == "tests":
+        argv = ["-projectPath", project, "-testResults", job["results"], "-testPlatform", job["platform"]]
+        if job.get("filter"):
+            argv += ["-testFilter", job["filter"]]
+        return _run_tests(argv, cfg, rng)
+    if job.get("kind") == "build":
+        return _build(["-buildTarget", job["target"]], cfg, rng, Path(job["output"]))
+    print(f"unknown job kind '{job.get('kind')}'", file=sys.stderr)
+    return 1
+
+
+def _serve_jobs(argv: List[str], cfg: Dict[str, Any]) -> int:
+    """Worker loop: beat while idle, run job files in name order."""
+    directory = Path(_arg(argv, "-workerDir", "Temp/AIStudioWorker") or "Temp/AIStudioWorker")
+    project = _arg(argv, "-projectPath", ".") or "."
+    jobs, done = directory / "jobs", directory / "done"
+    jobs.mkdir(parents=True, exist_ok=True)
+    done.mkdir(parents=True, exist_ok=True)
+    interval = float(cfg["unity"].get("heartbeat_seconds", 0.2))
+    last_beat = 0.0
+    while True:
+        if time.time() - last_beat >= interval:
+            last_beat = time.time()
+            (directory / "heartbeat").write_text(str(last_beat), encoding="utf-8")
+        pending = sorted(jobs.glob("*.json"))
+        if not pending:
+            time.sleep(0.02)
+            continue
+        job = json.loads(pending[0].read_text(encoding="utf-8"))
+        pending[0].unlink()
+        log = io.StringIO()
+        if job.get("kind") == "shutdown":
+            code = 0
+        else:
+            with redirect_stdout(log), redirect_stderr(log):
+                code = _run_job(job, project, load_config())
+        tmp = done / f"{job['id']}.json.tmp"
+        tmp.write_text(json.dumps({"id": job["id"], "returncode": code, "log": log.getvalue()}), encoding="utf-8")
+        tmp.replace(done / f"{job['id']}.json")
+        if job.get("kind") == "shutdown":
+            return 0
+
+
+def unity_main(argv: List[str]) -> int:
+    cfg = load_config()
+    count = _next_invocation("unity", argv)
+    rng = random.Random(f"{cfg.get('seed')}:unity:{count}")
+    lock = _lock_project(argv)
+    if lock is None:
+        print(
+            "[fake-unity] It looks like another Unity instance is running with this project open.",
+            file=sys.stderr,
+        )
+        return 1
+    time.sleep(float(cfg["unity"].get("startup_seconds", 0.0)))
+    if _arg(argv, "-executeMethod") == "AIUnityStudio.Editor.AIStudioWorker.Run":
+        return _serve_jobs(argv, cfg)
+    if "-runTests" in argv:
+        return _run_tests(argv, cfg, rng)
+    if "-buildTarget" in argv:
+        return _build(argv, cfg, rng)
+    print("[fake-unity] nothing to do")
+    return 0
+
+
+def dotnet_main(argv: List[str]) -> int:
+    cfg = load_config()
+    dotnet = cfg["dotnet"]
+    count = _next_invocation("dotnet", argv)
+    rng = random.Random(f"{cfg.get('seed')}:dotnet:{count}")
+    command = argv[0] if argv else ""
+    if command == "format":
+        time.sleep(float(dotnet.get("format_seconds", 0.0)))
+        print("Formatted 0 of 12 files.")
+        return 0
+    if command != "build":
+        print(f"[fake-dotnet] unsupported command: {command}", file=sys.stderr)
+        return 1
+    time.sleep(float(dotnet.get("build_seconds", 0.0)))
+    project = argv[1] if len(argv) > 1 and not argv[1].startswith("/") else "Project.csproj"
+    warnings = [
+        f"Assets/Scripts/Generated/Feature{i}.cs({10 + i},17): warning CS0169: "
+        f"The field 'Feature{i}._unused{i}' is never used [{project}]"
+        for i in range(int(dotnet.get("warnings", 0)))
+    ]
+    print("  Determining projects to restore...")
+    for line in warnings:
+        print(line)
+    if rng.random() < float(dotnet.get("fail_rate", 0.0)):
+        print(f"Assets/Scripts/Generated/Feature.cs(3,1): error CS1002: ; expected [{project}]")
+        print("Build FAILED.")
+        return 1
+    print("Build succeeded.")
+    print(f"    {len(warnings)} Warning(s)")
+    print("    0 Error(s)")
+    return 0
+
+
+def flake8_main(argv: List[str]) -> int:
+    cfg = load_config()
+    _next_invocation("flake8", argv)
+    time.sleep(float((cfg.get("flake8") or {}).get("seconds", 0.0)))
+    return 0
+
+
+def install(dest: str | Path) -> Dict[str, str]:
+    """Write ``unity``/``dotnet``/``flake8`` shims into ``dest``; return env overrides."""
+    dest = Path(dest).resolve()
+    dest.mkdir(parents=True, exist_ok=True)
+    script = Path(__file__).resolve()
+    for tool in ("unity", "dotnet", "flake8"):
+        shim = dest / tool
+        shim.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{script}" {tool} "$@"\n', encoding="utf-8")
+        shim.chmod(0o755)
+        (dest / f"{tool}.cmd").write_text(f'@"{sys.executable}" "{script}" {tool} %*\r\n', encoding="utf-8")
+    unity = dest / ("unity.cmd" if os.name == "nt" else "unity")
+    return {
+        "UNITY_CLI": str(unity),
+        "PATH": f"{dest}{os.pathsep}{os.environ.get('PATH', '')}",
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv:
+        print("usage: fake_toolchain.py {unity|dotnet|flake8|install} ...", file=sys.stderr)
+        return 1
+    tool, rest = argv[0], argv[1:]
+    if tool == "unity":
+        return unity_main(rest)
+    if tool == "dotnet":
+        return dotnet_main(rest)
+    if tool == "flake8":
+        return flake8_main(rest)
+    if tool == "install":
+        env = install(rest[0] if rest else ".fake_toolchain/bin")
+        for key, value in env.items():
+            print(f"{key}={value}")
+        return 0
+    print(f"unknown tool: {tool}", file=sys.stderr)
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
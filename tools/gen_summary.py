@@ -26,6 +26,7 @@ def _render(
     self_improvement: str = "",
     self_monitor: str = "",
     agent_scores: str = "",
+    llm_usage: dict | None = None,
 ) -> str:
     env = Environment(loader=FileSystemLoader(str(TEMPLATE_DIR)))
     template = env.get_template(TEMPLATE_NAME)
@@ -39,6 +40,7 @@ def _render(
         self_improvement=self_improvement,
         self_monitor=self_monitor,
         agent_scores=agent_scores,
+        llm_usage=llm_usage or {},
     )
 
 
@@ -51,6 +53,7 @@ def generate_summary(
     self_monitor: str = "",
     agent_scores: str = "",
     out_dir: str = "ci_reports",
+    llm_usage: dict | None = None,
 ) -> Path:
     """Create summary.html from given data."""
     metadata = {
@@ -83,6 +86,7 @@ def generate_summary(
         self_improvement,
         self_monitor,
         agent_scores,
+        llm_usage,
     )
     out_directory = Path(out_dir)
     out_directory.mkdir(exist_ok=True)
@@ -0,0 +1,44 @@
+import sys
+from pathlib import Path
+
+import click
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # noqa: E402
+
+import agent_learning  # noqa: E402
+import agent_memory  # noqa: E402
+from utils import blob_store  # noqa: E402
+
+
+@click.group()
+def cli():
+    """memctl – обслуживание общей памяти агентов"""
+    agent_memory.enable()
+
+
+@cli.command()
+@click.option("--agent", default=None, help="Compact only this agent's learning log")
+@click.option("--vacuum", is_flag=True, help="Shrink agent_memory.db afterwards")
+def compact(agent, vacuum):
+    """Apply retention to the learning log and drop unused blobs."""
+    stats = agent_learning.compact(agent)
+    if vacuum:
+        agent_memory.vacuum()
+    click.echo(
+        f"kept {stats['kept']}, removed {stats['removed']}, "
+        f"moved {stats['blobs_moved']} outputs to blobs, deleted {stats['blobs_removed']} blobs"
+    )
+
+
+@cli.command()
+def stats():
+    """Show entries per agent and the storage size."""
+    for agent in sorted(agent_memory.log_buckets("learning_log")):
+        count = sum(1 for _ in agent_memory.iter_log("learning_log", agent, fields=("result",)))
+        click.echo(f"{agent}: {count}")
+    db = agent_memory.DB_PATH.stat().st_size if agent_memory.DB_PATH.exists() else 0
+    click.echo(f"db: {db} bytes, blobs: {blob_store.size()} bytes")
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,80 @@
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from utils import agent_journal
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture
+def journal(tmp_path, monkeypatch):
+    agent_journal.flush()
+    monkeypatch.setattr(agent_journal, "LOG_PATH", tmp_path / "agent_journal.log")
+    monkeypatch.setattr(agent_journal, "TRACE_PATH", tmp_path / "agent_trace.log")
+    monkeypatch.setattr(agent_journal, "BUFFER_LINES", 3)
+    monkeypatch.setattr(agent_journal, "FLUSH_SECONDS", 60)
+    monkeypatch.setattr(agent_journal, "WRITER_THREAD", False)
+    yield tmp_path
+    agent_journal.flush()
+
+
+def test_lines_are_written_in_batches(journal):
+    log = journal / "agent_journal.log"
+    agent_journal.log_action("CoderAgent", "start")
+    agent_journal.log_trace("CoderAgent", "code", {"feature": "Jump"}, "ok")
+    assert not log.exists() and not (journal / "agent_trace.log").exists()
+
+    agent_journal.log_action("CoderAgent", "done")
+    lines = log.read_text(encoding="utf-8").splitlines()
+    assert [line.split(" ", 1)[1] for line in lines] == ["[CoderAgent] start", "[CoderAgent] done"]
+    trace = json.loads((journal / "agent_trace.log").read_text(encoding="utf-8"))
+    assert trace["stage"] == "code" and trace["input"] == {"feature": "Jump"}
+
+    # readers of the journal see pending lines; auto-fix events are written at once
+    agent_journal.log_action("TesterAgent", "start")
+    assert agent_journal.read_entries()[-1].endswith("[TesterAgent] start")
+    agent_journal.log_auto_fix("CoderAgent", "success", "patch")
+    assert "| AUTO_FIX | CoderAgent | success | patch" in log.read_text(encoding="utf-8")
+
+
+def test_old_lines_are_flushed(journal, monkeypatch):
+    log = journal / "agent_journal.log"
+    monkeypatch.setattr(agent_journal, "FLUSH_SECONDS", 0.05)
+    agent_journal.log_action("CoderAgent", "start")
+    time.sleep(0.1)
+    agent_journal.log_action("CoderAgent", "done")
+    assert len(log.read_text(encoding="utf-8").splitlines()) == 2
+
+    monkeypatch.setattr(agent_journal, "WRITER_THREAD", True)
+    agent_journal.log_action("TesterAgent", "start")
+    deadline = time.monotonic() + 5
+    while len(log.read_text(encoding="utf-8").splitlines()) < 3 and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert log.read_text(encoding="utf-8").splitlines()[-1].endswith("[TesterAgent] start")
+
+
+def test_pending_lines_are_written_at_exit_and_on_error(tmp_path):
+    script = (
+        "from utils import agent_journal\n"
+        "agent_journal.log_action('CoderAgent', 'start')\n"
+        "agent_journal.log_trace('CoderAgent', 'code', 'in', 'out')\n"
+        "raise SystemExit(0) if __import__('sys').argv[1] == 'exit' else RuntimeError('boom')\n"
+    )
+    for mode in ("exit", "error"):
+        proc = subprocess.run(
+            [sys.executable, "-c", script, mode],
+            cwd=tmp_path,
+            env={**os.environ, "PYTHONPATH": str(ROOT), "JOURNAL_BUFFER_LINES": "100"},
+            capture_output=True,
+            text=True,
+        )
+        assert (proc.returncode != 0) == (mode == "error")
+    assert "RuntimeError: boom" in proc.stderr
+    assert len((tmp_path / "agent_journal.log").read_text(encoding="utf-8").splitlines()) == 2
+    assert len((tmp_path / "agent_trace.log").read_text(encoding="utf-8").splitlines()) == 2
@@ -0,0 +1,191 @@
+import difflib
+import random
+
+import pytest
+
+import agent_learning
+import agent_memory
+from utils import blob_store
+
+
+@pytest.fixture
+def memory(tmp_path, monkeypatch):
+    monkeypatch.setattr(agent_memory, "DB_PATH", tmp_path / "memory.db")
+    monkeypatch.setattr(agent_memory, "MEMORY_PATH", tmp_path / "agent_memory.json")
+    monkeypatch.setattr(agent_memory, "_enabled", False)
+    monkeypatch.setattr(agent_memory, "log_action", lambda *a: None)
+    monkeypatch.setattr(agent_learning, "log_action", lambda *a: None)
+    monkeypatch.setattr(agent_learning, "EXACT_SCAN_LIMIT", 50)
+    monkeypatch.setattr(agent_learning, "COMPACT_EVERY", 0)
+    monkeypatch.setattr(blob_store, "BLOB_DIR", tmp_path / "blobs")
+    agent_memory.enable()
+    return tmp_path
+
+
+@pytest.fixture
+def compared(monkeypatch):
+    calls = []
+
+    class Counting(difflib.SequenceMatcher):
+        def ratio(self):
+            calls.append(self.a)
+            return super().ratio()
+
+    monkeypatch.setattr(agent_learning.difflib, "SequenceMatcher", Counting)
+    return calls
+
+
+def _feature(rng):
+    words = ["door", "lamp", "enemy", "jump", "coin", "shield", "portal", "timer", "score", "wave"]
+    return {"feature": " ".join(rng.choice(words) for _ in range(6)), "id": rng.randrange(10**9)}
+
+
+def test_small_log_scans_every_entry(memory, compared):
+    agent_learning.record_interaction("CoderAgent", {"feature": "Double jump"}, "class DoubleJump {}", "success")
+    agent_learning.record_interaction("CoderAgent", {"feature": "Wall jump"}, "broken", "error")
+    assert agent_learning.get_agent_hint("CoderAgent", {"feature": "Double jumps"}) == "class DoubleJump {}"
+    assert len(compared) == 1
+    assert agent_learning.get_agent_hint("CoderAgent", {"feature": "Inventory"}) is None
+
+
+def test_index_finds_exact_and_similar_inputs(memory, compared):
+    rng = random.Random(5)
+    inputs = [_feature(rng) for _ in range(120)]
+    for i, data in enumerate(inputs):
+        agent_learning.record_interaction("CoderAgent", data, f"out{i}", "success" if i % 10 else "error")
+
+    assert agent_learning.get_agent_hint("CoderAgent", inputs[7]) == "out7"
+    assert compared == []
+
+    near = dict(inputs[33], id=inputs[33]["id"] + 1)
+    assert agent_learning.get_agent_hint("CoderAgent", near) == "out33"
+    assert 0 < len(compared) <= agent_learning._CANDIDATES
+    assert agent_learning.get_agent_hint("CoderAgent", {"feature": "Inventory"}) is None
+
+    # a rewritten log is indexed from scratch
+    agent_memory.write("learning_log", {})
+    assert agent_learning.get_agent_hint("CoderAgent", inputs[7]) is None
+    agent_learning.record_interaction("CoderAgent", inputs[7], "again", "success")
+    assert agent_learning.get_agent_hint("CoderAgent", inputs[7]) == "again"
+
+
+def test_compacting_one_agent_keeps_other_indexes(memory, monkeypatch):
+    monkeypatch.setattr(agent_learning, "MAX_ENTRIES", 2)
+    for i in range(5):
+        agent_learning.record_interaction("CoderAgent", f"code {i}", f"c{i}", "success")
+        agent_learning.record_interaction("TesterAgent", f"test {i}", f"t{i}", "success")
+    assert agent_learning.get_agent_hint("TesterAgent", "test 1") == "t1"
+    tester_index = agent_learning._index("TesterAgent")
+    tester_state = agent_memory.log_state("learning_log", "TesterAgent")
+    coder_state = agent_memory.log_state("learning_log", "CoderAgent")
+
+    assert agent_learning.compact("CoderAgent")["removed"] == 3
+    assert agent_memory.log_state("learning_log", "TesterAgent") == tester_state
+    assert agent_memory.log_state("learning_log", "CoderAgent")[0] != coder_state[0]
+    assert agent_learning._index("TesterAgent") is tester_index
+    assert agent_learning.get_agent_hint("CoderAgent", "code 4") == "c4"
+    assert agent_learning._index("CoderAgent").successes == 2
+
+    # rewriting the whole key invalidates every agent
+    agent_memory.write("learning_log", {})
+    assert agent_memory.log_state("learning_log", "TesterAgent")[0] != tester_state[0]
+
+
+def test_retention_keeps_latest_success_per_input(memory, monkeypatch):
+    monkeypatch.setattr(agent_learning, "MAX_ENTRIES", 4)
+    for i in range(3):
+        agent_learning.record_interaction("CoderAgent", "same input", f"v{i}", "success")
+    agent_learning.record_interaction("CoderAgent", "same input", "boom", "error")
+    for i in range(4):
+        agent_learning.record_interaction("CoderAgent", f"input {i}", f"o{i}", "success")
+    old = {"hash": "h", "input": "old", "output": "x", "result": "success", "ts": 0}
+    agent_memory.append("learning_log", "TesterAgent", old)
+    agent_learning.record_interaction("TesterAgent", "fresh", "ok", "success")
+
+    stats = agent_learning.compact()
+    assert stats["removed"] == 5 and stats["kept"] == 5
+    log = agent_memory.read("learning_log")
+    assert [e["output"] for e in log["CoderAgent"]] == ["o0", "o1", "o2", "o3"]
+    assert [e["input"] for e in log["TesterAgent"]] == ["fresh"]
+
+    monkeypatch.setattr(agent_learning, "MAX_ENTRIES", 10)
+    agent_learning.record_interaction("CoderAgent", "same input", "v3", "success")
+    agent_learning.compact("CoderAgent")
+    assert agent_learning.get_agent_hint("CoderAgent", "same input") == "v3"
+
+
+def test_large_outputs_live_in_blob_store(memory, monkeypatch):
+    monkeypatch.setattr(agent_learning, "BLOB_MIN_SIZE", 50)
+    monkeypatch.setattr(blob_store, "GC_GRACE_SECONDS", 0)
+    code = "public class Door { }\n" * 20
+    agent_learning.record_interaction("CoderAgent", "door", code, "success")
+    agent_learning.record_interaction("CoderAgent", "door again", code, "success")
+    entry = agent_memory.read("learning_log", "CoderAgent")[0]
+    assert entry["output"] == code[:200] and len(list((memory / "blobs").rglob("*"))) == 2
+    assert agent_learning.get_agent_hint("CoderAgent", "door") == code
+
+    # inline outputs of older entries move to blobs, unused blobs are deleted
+    agent_memory.append(
+        "learning_log", "BuildAgent", {"hash": "b", "input": "i", "output": "y" * 80, "result": "error"}
+    )
+    orphan = blob_store.put("nobody refers to this")
+    stats = agent_learning.compact()
+    assert stats["blobs_moved"] == 1 and stats["blobs_removed"] == 1
+    assert blob_store.get(orphan) is None
+    build = agent_memory.read("learning_log", "BuildAgent")[0]
+    assert blob_store.get_text(build["output_blob"]) == "y" * 80
+
+
+def test_disabled_memory_writes_no_blobs(tmp_path, monkeypatch):
+    monkeypatch.setattr(agent_memory, "_enabled", False)
+    monkeypatch.setattr(agent_learning, "BLOB_MIN_SIZE", 50)
+    monkeypatch.setattr(blob_store, "BLOB_DIR", tmp_path / "blobs")
+    agent_learning.record_interaction("CoderAgent", "door", "public class Door { }\n" * 20, "success")
+    assert not (tmp_path / "blobs").exists()
+    assert agent_learning.get_agent_hint("CoderAgent", "door") is None
+
+
+def test_log_is_compacted_while_recording(memory, monkeypatch):
+    monkeypatch.setattr(agent_learning, "COMPACT_EVERY", 5)
+    monkeypatch.setattr(agent_learning, "MAX_ENTRIES", 3)
+    for i in range(22):
+        agent_learning.record_interaction("CoderAgent", f"input {i}", "out", "success")
+    assert len(agent_memory.read("learning_log", "CoderAgent")) <= 3 + 4
+    assert agent_learning.get_agent_hint("CoderAgent", "input 21") == "out"
+
+
+def test_rare_agent_is_compacted_with_its_blobs(memory, monkeypatch):
+    monkeypatch.setattr(agent_learning, "COMPACT_EVERY", 3)
+    monkeypatch.setattr(agent_learning, "MAX_ENTRIES", 1)
+    monkeypatch.setattr(agent_learning, "BLOB_MIN_SIZE", 10)
+    monkeypatch.setattr(blob_store, "GC_GRACE_SECONDS", 0)
+    shared = "shared output " * 5
+    agent_learning.record_interaction("TesterAgent", "shared", shared, "success")
+    for i in range(3):
+        # the busy agent moves the global row ids past every multiple of 3
+        for j in range(4):
+            agent_learning.record_interaction("CoderAgent", f"code {i} {j}", "out", "success")
+        output = shared if i == 0 else f"large output {i} " * 5
+        agent_learning.record_interaction("BuildAgent", f"build {i}", output, "success")
+        if i < 2:
+            assert len(agent_memory.read("learning_log", "BuildAgent")) == i + 1
+
+    build = agent_memory.read("learning_log", "BuildAgent")
+    assert [e["input"] for e in build] == ["build 2"]
+    # the blob of "build 1" is gone, the one TesterAgent shares survives
+    blobs = {p.name for p in (memory / "blobs").rglob("*") if p.is_file()}
+    assert blobs == {build[0]["output_blob"], blob_store.put(shared)}
+
+
+def test_memctl_compact(memory, monkeypatch):
+    from click.testing import CliRunner
+
+    from tools import memctl
+
+    monkeypatch.setattr(agent_learning, "MAX_ENTRIES", 1)
+    for i in range(3):
+        agent_learning.record_interaction("CoderAgent", f"input {i}", "out", "success")
+    result = CliRunner().invoke(memctl.cli, ["compact", "--vacuum"])
+    assert result.exit_code == 0, result.output
+    assert "kept 1, removed 2" in result.output
+    assert "CoderAgent: 1" in CliRunner().invoke(memctl.cli, ["stats"]).output
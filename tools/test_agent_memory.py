@@ -0,0 +1,109 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import agent_learning
+import agent_memory
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture
+def memory(tmp_path, monkeypatch):
+    monkeypatch.setattr(agent_memory, "DB_PATH", tmp_path / "memory.db")
+    monkeypatch.setattr(agent_memory, "MEMORY_PATH", tmp_path / "agent_memory.json")
+    monkeypatch.setattr(agent_memory, "_enabled", False)
+    monkeypatch.setattr(agent_memory, "log_action", lambda *a: None)
+    monkeypatch.setattr(agent_learning, "log_action", lambda *a: None)
+    return tmp_path
+
+
+def test_imports_json_and_appends(memory):
+    legacy = {"tasks": ["a"], "learning_log": {"CoderAgent": [{"hash": "h", "result": "error"}]}}
+    (memory / "agent_memory.json").write_text(json.dumps(legacy), encoding="utf-8")
+    agent_memory.enable()
+    assert agent_memory.read("tasks") == ["a"]
+
+    agent_learning.record_interaction("CoderAgent", {"feature": "Jump"}, "class Jump {}", "success")
+    agent_learning.record_interaction("TesterAgent", "arch", "ok", "success")
+    log = agent_memory.read("learning_log")
+    assert [e["result"] for e in log["CoderAgent"]] == ["error", "success"]
+    assert agent_memory.read("learning_log", "TesterAgent")[0]["output"] == "ok"
+    assert agent_memory.read("learning_log", "Nobody") is None
+    assert agent_learning.get_agent_hint("CoderAgent", {"feature": "Jumps"}) == "class Jump {}"
+
+    # the file is imported once; later snapshots reflect the database
+    agent_memory.write("tasks", ["b"])
+    agent_memory.enable()
+    agent_memory.snapshot()
+    data = json.loads((memory / "agent_memory.json").read_text(encoding="utf-8"))
+    assert data["tasks"] == ["b"]
+    assert len(data["learning_log"]["CoderAgent"]) == 2
+
+
+def test_concurrent_processes_append(memory):
+    script = (
+        "import sys, agent_memory\n"
+        "agent_memory.DB_PATH = agent_memory.Path(sys.argv[1])\n"
+        "agent_memory.MEMORY_PATH = agent_memory.Path(sys.argv[2])\n"
+        "agent_memory.enable()\n"
+        "for i in range(50):\n"
+        "    agent_memory.append('learning_log', sys.argv[3], {'i': i})\n"
+    )
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-c", script, str(memory / "memory.db"), str(memory / "out.json"), name],
+            cwd=memory,
+            env={**os.environ, "PYTHONPATH": str(ROOT)},
+        )
+        for name in ("A", "B", "A")
+    ]
+    assert all(p.wait(60) == 0 for p in procs)
+    agent_memory.enable()
+    log = agent_memory.read("learning_log")
+    assert len(log["A"]) == 100 and [e["i"] for e in log["B"]] == list(range(50))
+
+
+def test_readers_stream_from_database(memory, monkeypatch):
+    import agent_planner
+    import dashboard_api
+    from agents.analytics.self_monitor import SelfMonitorAgent
+    from auto_escalation import detect_repeated_failures
+    from meta_agent import MetaAgent
+
+    agent_memory.enable()
+    agent_memory.write("feature_description", {"feature": "Double jump"})
+    for _ in range(4):
+        agent_learning.record_interaction("CoderAgent", "same", "NullReferenceException", "error")
+    agent_learning.record_interaction("TesterAgent", "arch", "ok", "success")
+    agent_learning.record_interaction("AutoFix:CoderAgent", "err", "fix1", "success")
+    agent_learning.record_interaction("AutoFix:CoderAgent", "err", "fix1", "success")
+
+    db = memory / "memory.db"
+    assert [b for b, _ in agent_memory.iter_entries(path=db)] == ["AutoFix:CoderAgent"] * 2 + ["CoderAgent"] * 4 + [
+        "TesterAgent"
+    ]
+    assert [e["output"] for _, e in agent_memory.iter_entries(bucket="TesterAgent", path=db)] == ["ok"]
+    assert dict(agent_memory.iter_items(db)) == {"feature_description": {"feature": "Double jump"}}
+    # nothing was written to the JSON file: the readers use the database
+    assert not (memory / "agent_memory.json").exists()
+
+    fails = detect_repeated_failures(db, threshold=3)
+    assert fails == [{"agent": "CoderAgent", "stage": "Coder", "count": 4, "exception": "NullReferenceException"}]
+    success, fail, autofix = SelfMonitorAgent(memory_path=db)._parse_memory()
+    assert (success, fail, autofix) == (
+        {"CoderAgent": 0, "TesterAgent": 1},
+        {"CoderAgent": 4, "TesterAgent": 0},
+        {"CoderAgent": 2},
+    )
+    calls, patterns = MetaAgent(memory_path=db)._load_memory()
+    assert calls["CoderAgent"] == {"total": 4, "fails": 4} and patterns == {"CoderAgent": {"fix1": 2}}
+
+    # the default source is the database when it exists
+    assert "Double jump" in agent_planner._collect_known_features()
+    stats = dashboard_api._load_learning_stats()
+    assert stats["CoderAgent"]["total_calls"] == 4 and stats["CoderAgent"]["auto_fixes"] == 1
@@ -20,3 +20,14 @@ def test_save_and_restore(tmp_path, monkeypatch):
 
     assert (src / 'file.txt').read_text(encoding='utf-8') == 'data'
     assert (src / 'sub' / 'inner.txt').read_text(encoding='utf-8') == '123'
+
+
+def test_save_backup_of_working_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    Path('a.txt').write_text('a', encoding='utf-8')
+
+    save_backup('feat', '.')
+    save_backup('feat', '.')
+
+    assert (Path('_backups') / 'feat' / 'a.txt').exists()
+    assert not (Path('_backups') / 'feat' / '_backups').exists()
@@ -0,0 +1,48 @@
+from benchmarks.run_benchmarks import batch, compare, failures, load_config
+
+
+def _run(**scenarios):
+    return {"scenarios": scenarios}
+
+
+def test_compare_flags_metric_above_threshold():
+    history = [
+        _run(batch_10={"wall_seconds": 10.0, "llm_calls": 40}),
+        _run(batch_10={"wall_seconds": 12.0, "llm_calls": 40}),
+        _run(batch_10={"wall_seconds": 11.0, "llm_calls": 40}),
+    ]
+    thresholds = {"wall_seconds": 0.25, "llm_calls": 0.0}
+
+    assert compare({"batch_10": {"wall_seconds": 13.5, "llm_calls": 40}}, history, thresholds) == []
+    regressions = compare({"batch_10": {"wall_seconds": 14.0, "llm_calls": 41}}, history, thresholds)
+    assert len(regressions) == 2
+    assert regressions[0].startswith("batch_10.wall_seconds: 14.0 > 11.0")
+
+
+def test_compare_uses_window_and_skips_new_scenarios():
+    history = [_run(pipeline={"wall_seconds": 100.0})] + [_run(pipeline={"wall_seconds": 1.0})] * 3
+    current = {"pipeline": {"wall_seconds": 1.1}, "batch_100": {"wall_seconds": 500.0}}
+
+    assert compare(current, history, {"wall_seconds": 0.2}, window=3) == []
+    assert compare(current, history, {"wall_seconds": 0.0}, window=3) == ["pipeline.wall_seconds: 1.1 > 1.0 (+0%)"]
+
+
+def test_failed_features_fail_the_gate():
+    current = {
+        "pipeline": {"features_failed": 0, "error": None},
+        "batch_10": {"features_failed": 2, "error": None},
+        "batch_1": {"features_failed": 0, "error": "SystemExit(1)"},
+    }
+    assert failures(current) == ["batch_10: 2 features failed", "batch_1: SystemExit(1)"]
+
+
+def test_batch_has_distinct_features():
+    data = batch(5, ["a", "b"])["features"]
+    assert list(data) == ["feat_000", "feat_001", "feat_002", "feat_003", "feat_004"]
+    assert len(set(data.values())) == 5
+
+
+def test_shipped_config():
+    cfg = load_config()
+    assert cfg["sizes"] == [1, 10, 100]
+    assert "wall_seconds" in cfg["thresholds"]
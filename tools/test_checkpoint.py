@@ -0,0 +1,139 @@
+import json
+import os
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+from utils.checkpoint import Checkpoint
+from utils.stage_graph import Stage, run_stages
+
+
+def test_resume_skips_completed_stages_and_restores_files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    calls = []
+    fail = {"build": True}
+
+    def code(arch):
+        calls.append("code")
+        Path("Feature.cs").write_text(f"// {arch}", encoding="utf-8")
+        return {"patch": "Feature.cs"}
+
+    def build(patch):
+        calls.append("build")
+        if fail["build"]:
+            raise RuntimeError("Unity crashed")
+        return {"build": "ok"}
+
+    stages = [
+        Stage("CoderAgent", code, ("arch",), ("patch",), artifacts=lambda out: [out["patch"]]),
+        Stage("BuildAgent", build, ("patch",), ("build",)),
+    ]
+    statuses = []
+    ckpt = Checkpoint("ckpt", on_status=lambda stage, status: statuses.append((stage, status)))
+    with pytest.raises(RuntimeError):
+        run_stages(stages, {"arch": "A"}, checkpoint=ckpt)
+    assert ckpt.completed() == ["CoderAgent"]
+    assert ("BuildAgent", "failed") in statuses
+
+    Path("Feature.cs").unlink()
+    fail["build"] = False
+    values = run_stages(stages, {"arch": "A"}, checkpoint=Checkpoint("ckpt", resume=True))
+    assert values["build"] == "ok"
+    assert calls == ["code", "build", "build"]
+    assert Path("Feature.cs").read_text(encoding="utf-8") == "// A"
+
+    # other inputs invalidate the checkpointed stage; its unchanged output
+    # still lets the build resume
+    run_stages(stages, {"arch": "B"}, checkpoint=Checkpoint("ckpt", resume=True))
+    assert calls[3:] == ["code"]
+
+    # a fresh run starts over
+    run_stages(stages, {"arch": "B"}, checkpoint=Checkpoint("ckpt"))
+    assert calls[-2:] == ["code", "build"]
+
+
+def test_step_runs_once_per_checkpoint(tmp_path):
+    ckpt = Checkpoint(tmp_path / "ckpt")
+    calls = []
+    assert ckpt.step("ci_build", lambda: calls.append(1) or {"status": "built"}) == {"status": "built"}
+    assert Checkpoint(tmp_path / "ckpt", resume=True).step("ci_build", lambda: calls.append(2)) == {"status": "built"}
+    assert calls == [1]
+
+
+def test_step_reruns_after_upstream_changed(tmp_path):
+    calls = []
+
+    def run(resume, code):
+        ckpt = Checkpoint(tmp_path / "ckpt", resume=resume)
+        ckpt.step("coder", lambda: calls.append("coder") or code, {"prompt": code})
+        return ckpt.step("ci_test", lambda: calls.append("ci_test") or f"tested {code}", {"upstream": ckpt.upstream()})
+
+    assert run(False, "v1") == "tested v1"
+    assert run(True, "v1") == "tested v1"
+    assert calls == ["coder", "ci_test"]
+    # the coder stage ran again with another result: its tests are stale
+    assert run(True, "v2") == "tested v2"
+    assert calls == ["coder", "ci_test", "coder", "ci_test"]
+
+
+def test_run_all_resume_skips_passed_features(tmp_path, monkeypatch):
+    dummy = types.SimpleNamespace(main=lambda *a, **k: None)
+    sys.modules["ci_assets"] = dummy
+    sys.modules["ci_build"] = dummy
+    sys.modules["ci_test"] = dummy
+    sys.modules["auto_escalation"] = types.SimpleNamespace(main=lambda *a, **k: None)
+    sys.modules["ci_publish"] = types.SimpleNamespace(_load_env=lambda: {}, main=lambda *a, **k: None)
+    sys.modules["notify"] = types.SimpleNamespace(notify_all=lambda *a, **k: None)
+    sys.modules["pipeline_optimizer"] = types.SimpleNamespace(
+        suggest_optimizations=lambda *a, **k: {"skip_flags": [], "warn_flags": [], "opt_notes": ""}
+    )
+    sys.modules["tools.gen_multifeature_summary"] = types.SimpleNamespace(
+        generate_multifeature_summary=lambda *a, **k: Path("multi")
+    )
+    sys.modules["run_pipeline"] = types.SimpleNamespace(ask_multiline=lambda: "", main=lambda *a, **k: None)
+
+    import importlib
+
+    run_all = importlib.import_module("run_all")
+
+    yaml_path = tmp_path / "batch.yaml"
+    yaml_path.write_text("features:\n  feat1: A\n  feat2: B\n", encoding="utf-8")
+    monkeypatch.setattr(run_all, "STATUS_PATH", tmp_path / "pipeline_status.json")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("PIPELINE_RESUME", "0")
+    monkeypatch.setenv("CI_REPORTS_DIR", "ci_reports")
+
+    ran = []
+
+    def fake_run_once(optimize=False, feature_name="single"):
+        ran.append(feature_name)
+        reports_dir = Path(os.getenv("CI_REPORTS_DIR", "ci_reports"))
+        reports_dir.mkdir(parents=True, exist_ok=True)
+        resume = os.getenv("PIPELINE_RESUME") == "1"
+        ckpt = Checkpoint(reports_dir / "checkpoint", resume, lambda s, st: run_all._update_stage(feature_name, s, st))
+        ckpt.step("ci_test", lambda: None)
+        if feature_name == "feat2" and not resume:
+            ckpt.step("ci_build", lambda: 1 / 0)
+        ckpt.step("ci_build", lambda: None)
+        summary = reports_dir / "summary.html"
+        summary.write_text(feature_name, encoding="utf-8")
+        return summary, {}
+
+    monkeypatch.setattr(run_all, "run_once", fake_run_once)
+    monkeypatch.setattr(run_all, "save_backup", lambda *a, **k: None)
+    monkeypatch.setattr(run_all, "restore_backup", lambda *a, **k: None)
+    monkeypatch.setattr(run_all, "save_success_state", lambda *a, **k: None)
+    monkeypatch.setattr(run_all, "generate_multifeature_summary", lambda *a, **k: Path("multi"))
+
+    run_all.main(multi=str(yaml_path))
+    data = json.loads((tmp_path / "pipeline_status.json").read_text(encoding="utf-8"))
+    assert data["features"]["feat2"]["status"] == "failed"
+    assert data["features"]["feat2"]["stages"] == {"ci_test": "done", "ci_build": "failed"}
+
+    run_all.main(multi=str(yaml_path), resume=True)
+    data = json.loads((tmp_path / "pipeline_status.json").read_text(encoding="utf-8"))
+    assert ran == ["feat1", "feat2", "feat2"]
+    assert data["features"]["feat2"]["status"] == "passed"
+    assert data["features"]["feat2"]["stages"] == {"ci_test": "resumed", "ci_build": "done"}
@@ -0,0 +1,79 @@
+import asyncio
+import json
+import threading
+import time
+
+from agents.creative import creative_orchestrator as co
+from utils import llm, llm_async, llm_cache, llm_metrics
+from utils.llm_scheduler import LLMScheduler
+
+
+def test_art_mood_overlaps_story_chain(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def slow(result):
+        async def _run(data):
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            await asyncio.sleep(0.05)
+            with lock:
+                active.pop()
+            return result
+
+        return _run
+
+    monkeypatch.setattr(co.game_designer, "run_async", slow({"core_loop": "loop"}))
+    monkeypatch.setattr(co.narrative_designer, "run_async", slow({"scene": "scene.json"}))
+    monkeypatch.setattr(co.lore_keeper, "run_async", slow({"lorebook": "lorebook.json"}))
+    monkeypatch.setattr(co.art_mood, "run_async", slow({"moodboard": "mood.txt"}))
+    monkeypatch.setattr(co, "log_trace", lambda *a: None)
+
+    spec = co.run({"text": "idea"})
+
+    assert spec == {"core_loop": "loop", "scene": "scene.json", "lorebook": "lorebook.json", "moodboard": "mood.txt"}
+    assert json.loads((tmp_path / "idea_spec.json").read_text(encoding="utf-8")) == spec
+    assert max(peak) == 2
+
+
+def test_creative_prompts_go_through_async_client_within_global_limit(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(llm_metrics, "METRICS_PATH", tmp_path / "llm_metrics.jsonl")
+    monkeypatch.setattr(llm, "_scheduler", LLMScheduler(1))
+    monkeypatch.setattr(llm_cache, "CACHE_ENABLED", False)
+    inflight = []
+    peak = []
+
+    class DummyResponse:
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"response": "ok"}
+
+    class DummySession:
+        def post(self, url, **kwargs):
+            inflight.append(1)
+            peak.append(len(inflight))
+            time.sleep(0.02)
+            inflight.pop()
+            return DummyResponse()
+
+    async_calls = []
+    real_async = llm_async.ask_mistral_async
+
+    async def counting(prompt, *args, **kwargs):
+        async_calls.append(prompt)
+        return await real_async(prompt, *args, **kwargs)
+
+    for agent in (co.game_designer, co.narrative_designer, co.lore_keeper, co.art_mood):
+        monkeypatch.setattr(agent, "ask_mistral_async", counting)
+    monkeypatch.setattr(co, "log_trace", lambda *a: None)
+    monkeypatch.setattr(llm, "get_session", lambda: DummySession())
+
+    spec = co.run({"text": "idea"})
+    assert len(async_calls) == 4 and spec["moodboard"].endswith("mood.txt")
+    assert max(peak) == 1
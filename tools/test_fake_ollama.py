@@ -0,0 +1,44 @@
+import json
+from pathlib import Path
+
+import pytest
+import requests
+
+from tools.fake_ollama import FakeOllama, load_config
+from utils import llm, llm_cache, llm_metrics
+
+FIXTURE = Path(__file__).resolve().parents[1] / "fixtures" / "fake_ollama.yaml"
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_cache, "CACHE_ENABLED", False)
+    monkeypatch.setattr(llm_metrics, "METRICS_PATH", tmp_path / "llm_metrics.jsonl")
+    fake = FakeOllama(load_config(FIXTURE))
+    url = fake.start()
+    monkeypatch.setattr(llm, "OLLAMA_URL", url)
+    llm.close_session()
+    yield fake, url
+    llm.close_session()
+    fake.stop()
+
+
+def test_templated_response_and_stream(server):
+    fake, url = server
+    prompt = "Write a Unity C# script called Jump in namespace Game.Moves. Provide only the code."
+    code = llm.ask_mistral(prompt)
+    assert "namespace Game.Moves" in code and "class Jump" in code
+    assert "".join(llm.stream_mistral(prompt)).strip() == code
+    assert fake.stats()["requests"] == 2
+    assert fake.stats()["streamed"] == 1
+
+
+def test_ollama_metadata_and_determinism(server):
+    fake, url = server
+    body = {"model": "mistral", "prompt": "Create a one-paragraph mood board description", "stream": False}
+    first = requests.post(f"{url}/api/generate", data=json.dumps(body), timeout=5).json()
+    assert first["response"].startswith("Muted greens")
+    assert first["eval_count"] == len(first["response"].split())
+    assert first["done"] is True
+    assert fake.latency("same prompt") == fake.latency("same prompt")
+    assert requests.get(f"{url}/api/tags", timeout=5).json()["models"]
@@ -0,0 +1,114 @@
+import json
+import subprocess
+import xml.etree.ElementTree as ET
+
+import pytest
+
+import config
+from agents.tech import build_agent, refactor_agent, tester
+from tools import fake_toolchain
+
+
+@pytest.fixture
+def toolchain(tmp_path, monkeypatch):
+    cfg = tmp_path / "toolchain.yaml"
+    cfg.write_text(
+        "unity: {startup_seconds: 0, build_seconds: 0, test_seconds: 0, tests: {EditMode: 4, PlayMode: 2}}\n"
+        "dotnet: {build_seconds: 0, format_seconds: 0, warnings: 1}\n",
+        encoding="utf-8",
+    )
+    env = fake_toolchain.install(tmp_path / "bin")
+    monkeypatch.setenv("PATH", env["PATH"])
+    monkeypatch.setenv("FAKE_TOOLCHAIN_CONFIG", str(cfg))
+    monkeypatch.setenv("FAKE_TOOLCHAIN_STATE", str(tmp_path / "state"))
+    monkeypatch.setattr(config, "UNITY_CLI", env["UNITY_CLI"])
+    monkeypatch.setattr(config, "PROJECT_PATH", str(tmp_path / "project"))
+    monkeypatch.setattr(tester, "log_action", lambda *a: None)
+    monkeypatch.setattr(build_agent, "log_action", lambda *a: None)
+    monkeypatch.setattr(build_agent, "log_trace", lambda *a: None)
+    monkeypatch.setattr(refactor_agent, "log_action", lambda *a: None)
+    monkeypatch.setattr(refactor_agent, "log_trace", lambda *a: None)
+    tests_dir = tmp_path / "project" / "Assets" / "Tests"
+    tests_dir.mkdir(parents=True)
+    (tests_dir / "Test_Door_Logic.cs").write_text("namespace Game.Tests { class Test_Door_Logic {} }", encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_unity_tests_produce_nunit_xml(toolchain):
+    results = tester.run_unity_tests(str(toolchain / "project"))
+    assert results == {
+        "EditMode": {"passed": 4, "failed": 0, "skipped": 0},
+        "PlayMode": {"passed": 2, "failed": 0, "skipped": 0},
+    }
+    root = ET.parse(toolchain / "results_EditMode.xml").getroot()
+    case = root.find(".//test-case")
+    assert case.get("classname") == "Game.Tests.Test_Door_Logic"
+    assert json.loads((toolchain / "metrics.json").read_text())["PlayMode"]["passed"] == 2
+    assert (toolchain / "state" / "unity.count").read_text() == "2"
+
+
+def test_failures_and_build_and_dotnet(toolchain, monkeypatch):
+    cfg = toolchain / "toolchain.yaml"
+    cfg.write_text(cfg.read_text() + "seed: 3\n", encoding="utf-8")
+    build = build_agent.run({"target": "WebGL"})
+    assert build["status"] == "success"
+    assert (toolchain / "Build" / "WebGL.zip").exists()
+
+    ref = refactor_agent.run({})
+    assert ref["returncode"] == 0
+    assert len(ref["dead_code"]) == 1 and "is never used" in ref["dead_code"][0]
+
+    cfg.write_text(
+        "unity: {startup_seconds: 0, test_seconds: 0, fail_rate: 1.0, tests: {EditMode: 3}}\n", encoding="utf-8"
+    )
+    with pytest.raises(RuntimeError, match="returned 2") as err:
+        tester.run_unity_tests(str(toolchain / "project"))
+    assert "Game.Tests.Test_Door_Logic.EditMode_Case000: Expected: True" in str(err.value)
+    assert json.loads((toolchain / "test_durations.json").read_text())["Game.Tests.Test_Door_Logic.EditMode_Case002"]
+    root = ET.parse(toolchain / "results_EditMode.xml").getroot()
+    assert root.get("failed") == "3"
+    assert root.find(".//failure/message") is not None
+
+
+def test_crashed_unity_reports_its_own_error(toolchain, monkeypatch):
+    def crash(cmd, **kwargs):
+        results = toolchain / cmd[cmd.index("-testResults") + 1]
+        results.write_text('<test-run><test-case fullname="A.b" result="Passed" duration="1"/><test-ca')
+        return subprocess.CompletedProcess(cmd, 3, "", "editor crashed\n")
+
+    monkeypatch.setattr(tester.subprocess, "run", crash)
+    with pytest.raises(RuntimeError, match="returned 3 for EditMode: editor crashed"):
+        tester.run_unity_tests(str(toolchain / "project"))
+
+
+def test_parallel_mode_runs_playmode_in_synced_clone(toolchain, monkeypatch):
+    monkeypatch.setattr(tester, "TEST_MODE", "parallel")
+    monkeypatch.setattr(tester, "CLONES_DIR", toolchain / "clones")
+    cfg = toolchain / "toolchain.yaml"
+    cfg.write_text(cfg.read_text().replace("startup_seconds: 0,", "startup_seconds: 0.5,"), encoding="utf-8")
+
+    results = tester.run_unity_tests(str(toolchain / "project"))
+    assert results["EditMode"]["passed"] == 4 and results["PlayMode"]["passed"] == 2
+    calls = [json.loads(line) for line in (toolchain / "state" / "invocations.jsonl").read_text().splitlines()]
+    projects = {
+        c["args"][c["args"].index("-testPlatform") + 1]: c["args"][c["args"].index("-projectPath") + 1] for c in calls
+    }
+    assert projects["EditMode"] == str(toolchain / "project")
+    clone = tester.CLONES_DIR / next(tester.CLONES_DIR.iterdir()).name / "PlayMode"
+    assert projects["PlayMode"] == str(clone)
+    # both editors were up at the same time
+    assert abs(calls[0]["time"] - calls[1]["time"]) < 0.5
+
+    (toolchain / "project" / "Assets" / "Tests" / "Test_Door_Logic.cs").unlink()
+    tester.sync_clone(str(toolchain / "project"), "PlayMode")
+    assert not (clone / "Assets" / "Tests" / "Test_Door_Logic.cs").exists()
+
+
+def test_fake_unity_refuses_open_project(toolchain):
+    handle = fake_toolchain._lock_project(["-projectPath", str(toolchain / "project")])
+    try:
+        code = fake_toolchain.main(["unity", "-runTests", "-projectPath", str(toolchain / "project")])
+        assert code == 1
+    finally:
+        handle.close()
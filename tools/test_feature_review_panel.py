@@ -1,4 +1,6 @@
 import sys
+import threading
+import time
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).resolve().parents[1]))  # noqa: E402
@@ -31,3 +33,114 @@ def test_review_panel_majority(tmp_path, monkeypatch):
     monkeypatch.setattr(feature_review_panel.tester, "run", lambda data: {"failed": 1})
     res = feature_review_panel.run({"feature": "feat", "out_dir": str(tmp_path)})
     assert res["verdict"] == "block"
+
+
+def test_review_panel_votes_run_concurrently(tmp_path, monkeypatch):
+    def slow(result):
+        def run(data):
+            time.sleep(0.3)
+            return result
+
+        return run
+
+    monkeypatch.setattr(feature_review_panel.feature_inspector, "run", slow({"verdict": "Pass"}))
+    monkeypatch.setattr(feature_review_panel.lore_validator, "run", slow({"status": "LorePass"}))
+    monkeypatch.setattr(feature_review_panel.refactor_agent, "run", slow({"returncode": 0, "dead_code": []}))
+    monkeypatch.setattr(feature_review_panel.tester, "run", slow({"failed": 0}))
+
+    start = time.monotonic()
+    res = feature_review_panel.run({"feature": "feat", "out_dir": str(tmp_path)})
+    # inspector and lore overlap the Unity/dotnet votes, which take turns
+    assert time.monotonic() - start < 0.9
+    assert res["verdict"] == "accept"
+
+
+def test_review_panel_block_cancels_and_timeout(tmp_path, monkeypatch):
+    refactor_calls = []
+    release = threading.Event()
+    monkeypatch.setattr(feature_review_panel.feature_inspector, "run", lambda data: release.wait(5) or {})
+    monkeypatch.setattr(feature_review_panel.lore_validator, "run", lambda data: {"status": "LorePass"})
+    monkeypatch.setattr(feature_review_panel.refactor_agent, "run", lambda data: refactor_calls.append(1) or {})
+    monkeypatch.setattr(feature_review_panel.tester, "run", lambda data: {"failed": 2})
+
+    res = feature_review_panel.run({"feature": "feat", "out_dir": str(tmp_path)})
+    assert res["verdict"] == "block"
+    content = (tmp_path / "review_verdict.md").read_text(encoding="utf-8")
+    assert "| FeatureInspectorAgent | skipped | cancelled after block |" in content
+    release.set()
+    time.sleep(0.05)
+    assert refactor_calls == []
+
+    release.clear()
+    monkeypatch.setattr(feature_review_panel.tester, "run", lambda data: {"failed": 0})
+    monkeypatch.setattr(feature_review_panel.refactor_agent, "run", lambda data: {"returncode": 0, "dead_code": []})
+    res = feature_review_panel.run({"feature": "feat", "out_dir": str(tmp_path), "timeout": 0.2})
+    assert res["verdict"] == "needs_revision"
+    assert "timeout after 0.2s" in (tmp_path / "review_verdict.md").read_text(encoding="utf-8")
+    release.set()
+
+
+def test_review_panel_waits_for_running_unity_vote(tmp_path, monkeypatch):
+    finished, testing = [], threading.Event()
+
+    def tests(data):
+        testing.set()
+        time.sleep(0.3)
+        finished.append("tests")
+        return {"failed": 0}
+
+    monkeypatch.setattr(feature_review_panel.feature_inspector, "run", lambda data: {"verdict": "Pass"})
+    monkeypatch.setattr(
+        feature_review_panel.lore_validator, "run", lambda data: testing.wait(5) and {"status": "LoreMismatch"}
+    )
+    monkeypatch.setattr(feature_review_panel.refactor_agent, "run", lambda data: finished.append("refactor") or {})
+    monkeypatch.setattr(feature_review_panel.tester, "run", tests)
+
+    # the lore block cancels the votes, but Unity is already writing the project
+    res = feature_review_panel.run({"feature": "feat", "out_dir": str(tmp_path)})
+    assert res["verdict"] == "block" and finished == ["tests"]
+    content = (tmp_path / "review_verdict.md").read_text(encoding="utf-8")
+    assert "| TesterAgent | skipped | cancelled after block |" in content
+
+    finished.clear()
+    monkeypatch.setattr(feature_review_panel.lore_validator, "run", lambda data: {"status": "LorePass"})
+    res = feature_review_panel.run({"feature": "feat", "out_dir": str(tmp_path), "timeout": 0.1})
+    assert res["verdict"] == "needs_revision" and finished == ["tests"]
+
+
+def test_inspector_vote_reads_project_map_while_tests_write_it(tmp_path, monkeypatch):
+    from agents.tech import team_lead
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(team_lead, "PM_PATH", tmp_path / "project_map.json")
+    monkeypatch.setattr(team_lead, "JOURNAL_PATH", tmp_path / "journal.json")
+    monkeypatch.setattr(team_lead, "METRICS_PATH", tmp_path / "metrics.json")
+    files = [f"Assets/Scripts/Feature{i}/Component{i}.cs" for i in range(200)]
+    team_lead.update_project_map("feat", files, True)
+    writing, inspected = threading.Event(), threading.Event()
+    real_inspect = feature_review_panel.feature_inspector.run
+
+    def inspect(data):
+        writing.wait(5)
+        try:
+            return [real_inspect(data) for _ in range(50)][-1]
+        finally:
+            inspected.set()
+
+    def tests(data):
+        # the tester records its run in project_map.json while the inspector reads it
+        writing.set()
+        i = 0
+        while not inspected.is_set():
+            team_lead.update_project_map(f"feat{i % 20}", files, True)
+            i += 1
+        return {"failed": 0}
+
+    monkeypatch.setattr(feature_review_panel.feature_inspector, "run", inspect)
+    monkeypatch.setattr(feature_review_panel.lore_validator, "run", lambda data: {"status": "LorePass"})
+    monkeypatch.setattr(feature_review_panel.refactor_agent, "run", lambda data: {"returncode": 0, "dead_code": []})
+    monkeypatch.setattr(feature_review_panel.tester, "run", tests)
+
+    res = feature_review_panel.run({"feature": "feat", "out_dir": str(tmp_path)})
+    assert res["verdict"] == "needs_revision"
+    assert not list(tmp_path.glob("*.tmp"))
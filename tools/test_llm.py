@@ -0,0 +1,230 @@
+import json
+import os
+
+import pytest
+import requests
+
+from utils import llm, llm_cache, llm_metrics
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_cache, "CACHE_DIR", tmp_path / "llm_cache")
+    monkeypatch.setattr(llm_cache, "_count", None)
+    monkeypatch.setattr(llm_metrics, "METRICS_PATH", tmp_path / "llm_metrics.jsonl")
+
+
+class DummyResponse:
+    def __init__(self, payload: dict) -> None:
+        self.payload = payload
+
+    def raise_for_status(self) -> None:
+        pass
+
+    def json(self) -> dict:
+        return self.payload
+
+
+def test_session_is_shared_and_pooled(monkeypatch):
+    monkeypatch.setattr(llm, "_session", None)
+    first = llm.get_session()
+    assert llm.get_session() is first
+    adapter = first.get_adapter("http://localhost:11434")
+    assert adapter._pool_maxsize == llm.LLM_POOL_MAXSIZE
+    assert adapter._pool_block is True
+    llm.close_session()
+    assert llm._session is None
+
+
+def test_ask_mistral_uses_session(monkeypatch):
+    calls = []
+
+    class DummySession:
+        def post(self, url, **kwargs):
+            calls.append((url, json.loads(kwargs["data"])))
+            return DummyResponse({"response": " hi "})
+
+    monkeypatch.setattr(llm, "get_session", lambda: DummySession())
+    assert llm.ask_mistral("ping") == "hi"
+    assert calls[0][0].endswith("/api/generate")
+    assert calls[0][1] == {"model": "mistral", "prompt": "ping", "stream": False}
+
+
+def test_ask_mistral_reports_errors(monkeypatch):
+    class FailingSession:
+        def post(self, url, **kwargs):
+            raise requests.exceptions.ConnectionError("down")
+
+    monkeypatch.setattr(llm, "get_session", lambda: FailingSession())
+    assert llm.ask_mistral("ping").startswith("⚠ LLM error")
+
+
+def test_cache_hits_and_bypass(monkeypatch):
+    calls = []
+
+    class DummySession:
+        def post(self, url, **kwargs):
+            calls.append(kwargs)
+            return DummyResponse({"response": "code"})
+
+    monkeypatch.setattr(llm, "get_session", lambda: DummySession())
+    before = llm_cache.stats()
+    assert llm.ask_mistral("same") == "code"
+    assert llm.ask_mistral("same") == "code"
+    assert len(calls) == 1
+    assert llm.ask_mistral("same", options={"temperature": 0}) == "code"
+    assert llm.ask_mistral("same", use_cache=False) == "code"
+    assert len(calls) == 3
+    after = llm_cache.stats()
+    assert after["hits"] - before["hits"] == 1
+    assert after["misses"] - before["misses"] == 2
+
+
+def test_cache_ttl_and_lru_eviction(monkeypatch):
+    monkeypatch.setattr(llm_cache, "CACHE_MAX_ENTRIES", 2)
+    keys = [llm_cache.make_key("m", f"p{i}") for i in range(3)]
+    llm_cache.put(keys[0], "m", "a")
+    llm_cache.put(keys[1], "m", "b")
+    old = llm_cache._entry_path(keys[1]).stat().st_mtime - 100
+    os.utime(llm_cache._entry_path(keys[1]), (old, old))
+    assert llm_cache.get(keys[0]) == "a"
+    llm_cache.put(keys[2], "m", "c")
+    assert llm_cache.get(keys[1]) is None
+    assert llm_cache.get(keys[0]) == "a"
+
+    monkeypatch.setattr(llm_cache, "CACHE_TTL", 1)
+    path = llm_cache._entry_path(keys[2])
+    entry = json.loads(path.read_text(encoding="utf-8"))
+    entry["created"] -= 10
+    path.write_text(json.dumps(entry), encoding="utf-8")
+    assert llm_cache.get(keys[2]) is None
+    assert not path.exists()
+
+
+def test_unwritable_cache_is_skipped(tmp_path, monkeypatch):
+    class DummySession:
+        def post(self, url, **kwargs):
+            return DummyResponse({"response": "code"})
+
+    monkeypatch.setattr(llm, "get_session", lambda: DummySession())
+    # a file where the cache directory should be
+    (tmp_path / "llm_cache").write_text("", encoding="utf-8")
+    assert llm.ask_mistral("ping") == "code"
+
+    monkeypatch.setattr(llm_cache, "CACHE_DIR", tmp_path / "full")
+
+    def disk_full(self, *args, **kwargs):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(llm_cache.Path, "write_text", disk_full)
+    assert llm.ask_mistral("pong") == "code"
+    assert llm_cache.get(llm_cache.make_key("mistral", "pong")) is None
+    assert not list((tmp_path / "full").rglob("*.tmp"))
+
+
+class StreamResponse(DummyResponse):
+    def __init__(self, chunks: list[dict]) -> None:
+        super().__init__({})
+        self.chunks = chunks
+        self.closed = False
+
+    def iter_lines(self):
+        for chunk in self.chunks:
+            yield json.dumps(chunk).encode()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.closed = True
+
+
+def test_stream_mistral_yields_tokens_and_caches(monkeypatch):
+    resp = StreamResponse([{"response": "a"}, {"response": "b"}, {"response": "", "done": True}])
+
+    class DummySession:
+        def post(self, url, **kwargs):
+            assert kwargs["stream"] is True
+            assert json.loads(kwargs["data"])["stream"] is True
+            return resp
+
+    monkeypatch.setattr(llm, "get_session", lambda: DummySession())
+    seen = []
+    llm.set_stream_handler(seen.append)
+    try:
+        assert llm.ask_mistral("s") == "ab"
+    finally:
+        llm.set_stream_handler(None)
+    assert seen == ["a", "b"]
+    assert resp.closed
+    assert list(llm.stream_mistral("s")) == ["ab"]
+
+
+def test_stream_mistral_early_close(monkeypatch):
+    resp = StreamResponse([{"response": "x"}] * 5)
+    monkeypatch.setattr(llm, "get_session", lambda: type("S", (), {"post": lambda self, url, **kw: resp})())
+    gen = llm.stream_mistral("abort me")
+    assert next(gen) == "x"
+    gen.close()
+    assert resp.closed
+    assert llm_cache.get(llm_cache.make_key("mistral", "abort me")) is None
+
+
+def test_coder_aborts_runaway_generation(monkeypatch):
+    from agents.tech import coder
+
+    monkeypatch.setattr(coder, "MAX_CODE_CHARS", 100)
+    monkeypatch.setattr(coder, "log_action", lambda *a: None)
+    produced = []
+
+    def fake_stream(prompt):
+        for _ in range(1000):
+            produced.append(1)
+            yield "public int x; "
+
+    monkeypatch.setattr(coder, "stream_mistral", fake_stream)
+    with pytest.raises(RuntimeError, match="exceeds"):
+        coder._generate_code("p")
+    assert len(produced) < 20
+
+    monkeypatch.setattr(coder, "stream_mistral", lambda p: iter(["I'm sorry, ", "but I cannot help with that."]))
+    with pytest.raises(RuntimeError, match="refused"):
+        coder._generate_code("p")
+
+    # a request failing after the head was checked still aborts
+    tokens = ["public class Door : MonoBehaviour ", "{ ", "void Open() { }", "⚠ LLM error: connection reset"]
+    monkeypatch.setattr(coder, "stream_mistral", lambda p: iter(tokens))
+    with pytest.raises(RuntimeError, match="LLM error: connection reset"):
+        coder._generate_code("p")
+
+
+def test_identical_concurrent_prompts_share_one_request(monkeypatch):
+    import threading
+    import time
+
+    from utils.single_flight import SingleFlight
+
+    monkeypatch.setattr(llm, "_inflight", SingleFlight())
+    monkeypatch.setattr(llm_cache, "CACHE_ENABLED", False)
+    calls = []
+    release = threading.Event()
+
+    class SlowSession:
+        def post(self, url, **kwargs):
+            calls.append(1)
+            release.wait(1)
+            return DummyResponse({"response": "shared"})
+
+    monkeypatch.setattr(llm, "get_session", lambda: SlowSession())
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(llm.ask_mistral("dup"))) for _ in range(4)]
+    for t in threads:
+        t.start()
+    while llm._inflight.stats()["calls"] < 4:
+        time.sleep(0.001)
+    release.set()
+    for t in threads:
+        t.join()
+    assert results == ["shared"] * 4
+    assert len(calls) == 1
+    assert llm._inflight.stats()["shared"] == 3
@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+from agents.tech import team_lead
+from utils import llm, llm_cache, llm_metrics
+from utils.llm_scheduler import call_context
+
+
+@pytest.fixture(autouse=True)
+def _isolated(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_cache, "CACHE_DIR", tmp_path / "llm_cache")
+    monkeypatch.setattr(llm_cache, "_count", None)
+    monkeypatch.setattr(llm_metrics, "METRICS_PATH", tmp_path / "llm_metrics.jsonl")
+
+
+class DummyResponse:
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {
+            "response": "ok",
+            "prompt_eval_count": 12,
+            "eval_count": 30,
+            "load_duration": 500_000_000,
+            "eval_duration": 1_500_000_000,
+        }
+
+
+def test_calls_are_accounted_per_agent_and_feature(monkeypatch):
+    monkeypatch.setattr(llm, "get_session", lambda: type("S", (), {"post": lambda self, url, **k: DummyResponse()})())
+    with call_context(agent="CoderAgent", feature="feat_acc"):
+        llm.ask_mistral("count me")
+        llm.ask_mistral("count me")
+
+    entries = llm_metrics.load(feature="feat_acc")
+    assert len(entries) == 2
+    first, second = entries
+    assert first["agent"] == "CoderAgent"
+    assert first["prompt_tokens"] == 12 and first["completion_tokens"] == 30
+    assert first["load_seconds"] == 0.5 and first["eval_seconds"] == 1.5
+    assert first["tokens_per_sec"] == 20.0
+    assert "queue_wait_seconds" in first
+    assert second["cached"] is True
+
+    usage = llm_metrics.summary(feature="feat_acc")
+    coder = usage["by_agent"]["CoderAgent"]
+    assert coder["calls"] == 2 and coder["cached"] == 1
+    assert coder["tokens_used"] == 42
+    assert llm_metrics.totals(feature="feat_acc")["total"]["tokens_used"] == 42
+
+
+def test_record_metrics_attaches_llm_usage(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(team_lead, "METRICS_PATH", tmp_path / "metrics.json")
+    monkeypatch.setattr(team_lead, "PM_PATH", tmp_path / "project_map.json")
+    monkeypatch.setattr(team_lead, "JOURNAL_PATH", tmp_path / "journal.json")
+    llm_metrics.record({"agent": "ArtMoodAgent", "feature": "moody", "completion_tokens": 5})
+
+    team_lead.record_metrics({"feature": "moody", "tests_passed": 1})
+
+    data = json.loads((tmp_path / "metrics.json").read_text(encoding="utf-8"))
+    assert data[-1]["llm_by_agent"]["ArtMoodAgent"]["completion_tokens"] == 5
+
+    # the usage comes from this process' totals, not from re-reading the store
+    (tmp_path / "llm_metrics.jsonl").unlink()
+    team_lead.record_metrics({"feature": "moody", "tests_passed": 1})
+    data = json.loads((tmp_path / "metrics.json").read_text(encoding="utf-8"))
+    assert data[-1]["llm_by_agent"]["ArtMoodAgent"]["completion_tokens"] == 5
+
+
+def test_store_is_streamed_and_rotated(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_metrics, "MAX_BYTES", 1000)
+    for i in range(40):
+        llm_metrics.record({"agent": "CoderAgent", "feature": f"f{i % 4}", "prompt_tokens": 1})
+    path = tmp_path / "llm_metrics.jsonl"
+    assert path.stat().st_size <= 1000 + 200
+    rotated = tmp_path / "llm_metrics.jsonl.1"
+    assert rotated.exists()
+    kept = llm_metrics.load() + llm_metrics.load(rotated)
+    assert len(kept) < 40 and all(e["feature"] == "f1" for e in llm_metrics.iter_entries(feature="f1"))
+    assert llm_metrics.summary(feature="f1")["total"]["calls"] == len(llm_metrics.load(feature="f1"))
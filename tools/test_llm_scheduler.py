@@ -0,0 +1,102 @@
+import threading
+import time
+
+import pytest
+
+from utils.llm_scheduler import LLMScheduler, call_context, current_context, priority_for
+
+
+def _run_queued(sched, requests):
+    """Hold the only slot, queue ``requests`` and return the grant order."""
+    order = []
+    handle, _ = sched.acquire("CoderAgent", "busy")
+    threads = []
+    for agent, feature, label in requests:
+
+        def worker(a=agent, f=feature, lbl=label):
+            with sched.slot(a, f):
+                order.append(lbl)
+
+        t = threading.Thread(target=worker)
+        t.start()
+        threads.append(t)
+        while sched.stats()["queued"] < len(threads):
+            time.sleep(0.001)
+    sched.release(handle)
+    for t in threads:
+        t.join()
+    return order
+
+
+def test_priority_then_feature_round_robin():
+    sched = LLMScheduler(1)
+    order = _run_queued(
+        sched,
+        [
+            ("ArtMoodAgent", "c", "mood"),
+            ("GameDesignerAgent", "a", "a1"),
+            ("GameDesignerAgent", "a", "a2"),
+            ("GameDesignerAgent", "b", "b1"),
+            ("CoderAgent", "b", "coder"),
+        ],
+    )
+    assert order == ["coder", "a1", "b1", "a2", "mood"]
+    stats = sched.stats()
+    assert stats["inflight"] == 0 and stats["queued"] == 0
+    assert stats["by_priority"][priority_for("ArtMoodAgent")]["wait_max"] > 0
+
+
+def test_interrupted_wait_leaves_the_queue():
+    sched = LLMScheduler(1)
+    handle, _ = sched.acquire("CoderAgent", "busy")
+
+    def interrupted(timeout=None):
+        raise KeyboardInterrupt
+
+    sched._cond.wait = interrupted
+    with pytest.raises(KeyboardInterrupt):
+        sched.acquire("ArtMoodAgent", "a")
+    del sched._cond.wait
+    assert sched.stats()["queued"] == 0
+
+    # a later request is not stuck behind the abandoned ticket
+    got = []
+    t = threading.Thread(target=lambda: got.append(sched.acquire("ArtMoodAgent", "b")))
+    t.start()
+    sched.release(handle)
+    t.join(1)
+    assert got
+    sched.release(got[0][0])
+
+
+def test_feature_rounds_are_pruned():
+    sched = LLMScheduler(1)
+    for i in range(100):
+        with sched.slot("GameDesignerAgent", f"feature{i}"):
+            pass
+    assert sched._rounds == {}
+    order = _run_queued(sched, [("GameDesignerAgent", "a", "a1"), ("GameDesignerAgent", "a", "a2")])
+    assert order == ["a1", "a2"] and sched._rounds == {}
+
+
+def test_cross_process_slots(tmp_path):
+    sched = LLMScheduler(1, lock_dir=tmp_path, poll=0.01)
+    other = LLMScheduler(1, lock_dir=tmp_path, poll=0.01)
+    handle, _ = sched.acquire()
+    got = []
+    t = threading.Thread(target=lambda: got.append(other.acquire()))
+    t.start()
+    time.sleep(0.05)
+    assert not got
+    sched.release(handle)
+    t.join(1)
+    assert got
+    other.release(got[0][0])
+
+
+def test_call_context_nesting():
+    with call_context(feature="f1"):
+        with call_context(agent="CoderAgent"):
+            assert current_context() == {"feature": "f1", "agent": "CoderAgent"}
+        assert current_context() == {"feature": "f1"}
+    assert current_context() == {}
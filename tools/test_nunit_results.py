@@ -0,0 +1,73 @@
+import xml.etree.ElementTree as ET
+from datetime import datetime
+
+import pytest
+
+from tools import fake_toolchain
+from utils import nunit_results
+
+
+def _write(path, count, failed=()):
+    cases = [
+        {
+            "name": f"Case{i}",
+            "fullname": f"Game.Tests.Test_{i % 3}.Case{i}",
+            "classname": f"Game.Tests.Test_{i % 3}",
+            "result": "Failed" if i in failed else "Passed",
+            "duration": i / 100,
+            "message": f"Expected: True\n  But was:  False (Case{i})",
+        }
+        for i in range(count)
+    ]
+    path.write_text(fake_toolchain.render_results("PlayMode", cases, datetime(2025, 1, 1)), encoding="utf-8")
+
+
+def test_streams_counts_and_failures(tmp_path, monkeypatch):
+    monkeypatch.setattr(nunit_results, "MAX_FAILURES", 2)
+    path = tmp_path / "results.xml"
+    _write(path, 300, failed={5, 7, 9})
+    assert nunit_results.read_counts(path) == {"total": 300, "passed": 297, "failed": 3, "skipped": 0}
+
+    seen = []
+    summary = nunit_results.parse(path, on_case=seen.append)
+    assert summary.counts() == {"passed": 297, "failed": 3, "skipped": 0}
+    assert len(seen) == 300 and seen[0].classname == "Game.Tests.Test_0"
+    assert [c.fullname for c in summary.failures] == ["Game.Tests.Test_0.Case9", "Game.Tests.Test_1.Case7"]
+    assert summary.failures[0].message.startswith("Expected: True")
+    assert round(summary.duration, 2) == round(sum(i / 100 for i in range(300)), 2)
+
+    # totals are counted from the cases when the run element has none
+    bare = tmp_path / "bare.xml"
+    bare.write_text('<test-run><test-case fullname="A.b" result="Skipped" duration="1"/></test-run>', encoding="utf-8")
+    assert nunit_results.parse(bare).counts() == {"passed": 0, "failed": 0, "skipped": 1}
+
+
+def test_records_durations(tmp_path, monkeypatch):
+    monkeypatch.setattr(nunit_results, "DURATIONS_PATH", tmp_path / "durations.json")
+    path = tmp_path / "results.xml"
+    _write(path, 6)
+    cases = list(nunit_results.iter_cases(path))
+    nunit_results.record_durations(cases)
+    # recorded while the file is streamed
+    with nunit_results.recording() as record:
+        summary = nunit_results.parse(path, on_case=record)
+    assert summary.total == 6
+    nunit_results.record_durations(
+        [nunit_results.TestCase("Game.Tests.Test_2.Case5", "Game.Tests.Test_2", "Passed", 1.05)]
+    )
+
+    data = nunit_results.load_durations()
+    assert data["Game.Tests.Test_2.Case5"]["runs"] == 3
+    assert data["Game.Tests.Test_2.Case5"]["last"] == 1.05
+    assert nunit_results.slowest(1) == [("Game.Tests.Test_2.Case5", data["Game.Tests.Test_2.Case5"]["mean"])]
+    assert round(nunit_results.class_durations()["Game.Tests.Test_0"], 2) == 0.03
+
+
+def test_truncated_file_keeps_streamed_durations(tmp_path, monkeypatch):
+    monkeypatch.setattr(nunit_results, "DURATIONS_PATH", tmp_path / "durations.json")
+    path = tmp_path / "results.xml"
+    path.write_text('<test-run><test-case fullname="A.b" classname="A" result="Passed" duration="1"/><test-ca')
+    with pytest.raises(ET.ParseError):
+        with nunit_results.recording() as record:
+            nunit_results.parse(path, on_case=record)
+    assert nunit_results.load_durations()["A.b"]["runs"] == 1
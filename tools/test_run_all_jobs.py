@@ -0,0 +1,101 @@
+import json
+import os
+import sys
+import threading
+import types
+from pathlib import Path
+
+
+def _stub_modules():
+    dummy = types.SimpleNamespace(main=lambda *a, **k: None)
+    sys.modules["ci_assets"] = dummy
+    sys.modules["ci_build"] = dummy
+    sys.modules["ci_test"] = dummy
+    sys.modules["auto_escalation"] = types.SimpleNamespace(main=lambda *a, **k: None)
+    sys.modules["ci_publish"] = types.SimpleNamespace(_load_env=lambda: {}, main=lambda *a, **k: None)
+    sys.modules["notify"] = types.SimpleNamespace(notify_all=lambda *a, **k: None)
+    sys.modules["pipeline_optimizer"] = types.SimpleNamespace(
+        suggest_optimizations=lambda *a, **k: {"skip_flags": [], "warn_flags": [], "opt_notes": ""}
+    )
+    sys.modules["tools.gen_agent_stats"] = types.SimpleNamespace(generate_agent_stats=lambda *a, **k: None)
+    sys.modules["tools.gen_changelog"] = types.SimpleNamespace(main=lambda *a, **k: None)
+    sys.modules["tools.gen_summary"] = types.SimpleNamespace(generate_summary=lambda *a, **k: Path("s"))
+    sys.modules["utils.backup_manager"] = types.SimpleNamespace(
+        save_backup=lambda *a, **k: None, restore_backup=lambda *a, **k: None
+    )
+    sys.modules["ci_revert"] = types.SimpleNamespace(
+        apply_emergency_patch=lambda *a, **k: None, save_success_state=lambda *a, **k: None
+    )
+    sys.modules["utils.pipeline_config"] = types.SimpleNamespace(load_config=lambda: {"steps": {}, "agents": []})
+    sys.modules["run_pipeline"] = types.SimpleNamespace(ask_multiline=lambda: "", main=lambda *a, **k: None)
+
+
+def test_run_all_jobs_isolates_features(tmp_path, monkeypatch):
+    _stub_modules()
+    import importlib
+
+    run_all = importlib.import_module("run_all")
+
+    project = tmp_path / "studio"
+    (project / "Assets" / "Scripts").mkdir(parents=True)
+    (project / "batch.yaml").write_text("features:\n  feat1: A\n  feat2: B\n", encoding="utf-8")
+    monkeypatch.chdir(project)
+    monkeypatch.setenv("PROJECT_PATH", str(project))
+    monkeypatch.setattr(run_all, "STATUS_PATH", Path("pipeline_status.json"))
+    monkeypatch.setattr(run_all, "save_backup", lambda *a, **k: None)
+    saved = []
+    monkeypatch.setattr(
+        run_all, "save_success_state", lambda name, src: saved.append((name, os.environ["BACKUP_ROOT"]))
+    )
+    monkeypatch.setattr(run_all, "get_config", lambda: {"scripts_path": Path("Assets/Scripts")})
+    monkeypatch.setattr(
+        run_all, "generate_multifeature_summary", lambda out_dir, results, total: Path(out_dir) / "multi.html"
+    )
+    seen = []
+
+    def fake_run_once(optimize=False, feature_name="single"):
+        seen.append((feature_name, Path.cwd().name, os.environ["PROJECT_PATH"]))
+        Path("final_summary.md").write_text(feature_name, encoding="utf-8")
+        Path(f"Assets/Scripts/{feature_name}.cs").write_text("class X {}", encoding="utf-8")
+        summary = Path(os.environ["CI_REPORTS_DIR"]) / "summary.html"
+        summary.write_text(feature_name, encoding="utf-8")
+        return summary, {"CoderAgent": "success"}
+
+    monkeypatch.setattr(run_all, "run_once", fake_run_once)
+
+    def fake_worker(cmd, cwd, env, **kwargs):
+        # run the worker in-process inside its workspace
+        old_cwd, old_env = Path.cwd(), dict(os.environ)
+        os.chdir(cwd)
+        os.environ.update(env)
+        try:
+            run_all._worker_main(cmd[cmd.index("--worker") + 1], False)
+        finally:
+            os.chdir(old_cwd)
+            os.environ.clear()
+            os.environ.update(old_env)
+
+    # cwd and environ are process-wide, so the emulated workers take turns
+    lock = threading.Lock()
+    isolated = run_all._run_feature_isolated
+
+    def one_at_a_time(*args):
+        with lock:
+            return isolated(*args)
+
+    monkeypatch.setattr(run_all, "_run_feature_isolated", one_at_a_time)
+    monkeypatch.setattr(run_all.subprocess, "run", fake_worker)
+
+    run_all.main(multi="batch.yaml", jobs=2)
+
+    assert sorted((n, ws) for n, ws, _ in seen) == [("feat1", "feat1"), ("feat2", "feat2")]
+    assert all(p.endswith(os.path.join(".workspaces", n)) for n, _, p in seen)
+    data = json.loads(Path("pipeline_status.json").read_text(encoding="utf-8"))
+    assert {k: v["status"] for k, v in data["features"].items()} == {"feat1": "passed", "feat2": "passed"}
+    assert data["features"]["feat1"]["agent_results"] == {"CoderAgent": "success"}
+    assert Path("ci_reports/feat1/summary.html").read_text(encoding="utf-8") == "feat1"
+    assert Path("Assets/Scripts/feat2.cs").exists()
+    assert not Path("final_summary.md").exists()
+    assert not Path(".workspaces/feat1").exists()
+    # success states are saved in the studio, not in the removed workspace
+    assert sorted(saved) == [("feat1", str(project / "_backups")), ("feat2", str(project / "_backups"))]
@@ -0,0 +1,58 @@
+import subprocess
+import types
+from pathlib import Path
+
+from agents.tech import refactor_agent
+from utils import run_registry
+
+
+def test_reuse_only_inside_scope_and_until_files_change(tmp_path):
+    src = tmp_path / "Assets"
+    src.mkdir()
+    (src / "A.cs").write_text("class A {}", encoding="utf-8")
+    calls = []
+
+    def run_tests(project):
+        calls.append(project)
+        return {"failed": 0}
+
+    run_registry.reuse("unity_tests", run_tests, "p", paths=[src])
+    run_registry.reuse("unity_tests", run_tests, "p", paths=[src])
+    assert len(calls) == 2
+
+    with run_registry.run_scope():
+        assert run_registry.reuse("unity_tests", run_tests, "p", paths=[src]) == {"failed": 0}
+        run_registry.reuse("unity_tests", run_tests, "p", paths=[src])
+        assert len(calls) == 3
+        run_registry.reuse("unity_tests", run_tests, "other", paths=[src])
+        assert len(calls) == 4
+        (src / "A.cs").write_text("class A { int x; }", encoding="utf-8")
+        run_registry.reuse("unity_tests", run_tests, "p", paths=[src])
+        assert len(calls) == 5
+
+    with run_registry.run_scope():
+        run_registry.reuse("unity_tests", run_tests, "p", paths=[src])
+        assert len(calls) == 6
+
+
+def test_refactor_reused_after_its_own_format_changes(tmp_path, monkeypatch):
+    project = tmp_path / "project"
+    (project / "Assets").mkdir(parents=True)
+    script = project / "Assets" / "A.cs"
+    script.write_text("class A{}", encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(refactor_agent.config, "PROJECT_PATH", str(project))
+    commands = []
+
+    def fake_run(cmd, **kwargs):
+        commands.append(cmd[:2])
+        if cmd[:2] == ["dotnet", "format"]:
+            script.write_text("class A { }", encoding="utf-8")
+        return types.SimpleNamespace(returncode=0, stdout="", stderr="")
+
+    monkeypatch.setattr(subprocess, "run", fake_run)
+    with run_registry.run_scope():
+        first = refactor_agent.run({})
+        assert refactor_agent.run({}) == first
+    assert commands == [["dotnet", "build"], ["dotnet", "format"]]
+    assert Path(first["report"]).exists()
@@ -0,0 +1,74 @@
+from pathlib import Path
+
+from utils import stage_cache
+from utils.stage_graph import Stage, run_stages
+
+
+def test_hit_restores_artifacts_and_source_change_misses(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(stage_cache, "CACHE_DIR", tmp_path / "cache")
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "a.cs").write_text("class A {}", encoding="utf-8")
+    Path("out").mkdir()
+    Path("out/report.xml").write_text("<ok/>", encoding="utf-8")
+
+    key = stage_cache.make_key("Tester", {"arch": {"path": "A.cs"}}, [src])
+    assert stage_cache.get(key) is None
+    stage_cache.put(key, "Tester", {"report": {"failed": 0}}, ["out", "missing.log"])
+
+    Path("out/report.xml").unlink()
+    assert stage_cache.get(key) == {"report": {"failed": 0}}
+    assert Path("out/report.xml").read_text(encoding="utf-8") == "<ok/>"
+
+    # same content in another copy of the tree keeps the key
+    copy = tmp_path / "copy" / "src"
+    copy.mkdir(parents=True)
+    (copy / "a.cs").write_text("class A {}", encoding="utf-8")
+    assert stage_cache.make_key("Tester", {"arch": {"path": "A.cs"}}, [copy]) == key
+
+    (src / "a.cs").write_text("class A { int x; }", encoding="utf-8")
+    assert stage_cache.make_key("Tester", {"arch": {"path": "A.cs"}}, [src]) != key
+
+
+def test_eviction_keeps_most_recent_entries(tmp_path, monkeypatch):
+    monkeypatch.setattr(stage_cache, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(stage_cache, "CACHE_MAX_ENTRIES", 2)
+    keys = [stage_cache.make_key("s", {"i": i}) for i in range(3)]
+    for key in keys:
+        stage_cache.put(key, "s", {"v": key})
+    assert len(stage_cache._entries()) == 2
+    assert stage_cache.get(keys[-1]) == {"v": keys[-1]}
+
+
+def test_cached_stage_is_not_rerun(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(stage_cache, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(stage_cache, "CACHE_ENABLED", True)
+    calls = []
+
+    def build(report):
+        calls.append(report)
+        Path("build.log").write_text(f"built {report}", encoding="utf-8")
+        return {"build": {"status": "success" if report else "failed"}}
+
+    stages = [
+        Stage(
+            "BuildAgent",
+            build,
+            ("report",),
+            ("build",),
+            cache=True,
+            artifacts=lambda out: ["build.log"],
+            cacheable=lambda out: out["build"]["status"] == "success",
+        )
+    ]
+    assert run_stages(stages, {"report": "ok"})["build"] == {"status": "success"}
+    Path("build.log").unlink()
+    assert run_stages(stages, {"report": "ok"})["build"] == {"status": "success"}
+    assert calls == ["ok"]
+    assert Path("build.log").read_text(encoding="utf-8") == "built ok"
+
+    run_stages(stages, {"report": ""})
+    run_stages(stages, {"report": ""})
+    assert calls == ["ok", "", ""]
@@ -0,0 +1,78 @@
+import threading
+import time
+
+import pytest
+
+from utils.llm_scheduler import call_context, current_context
+from utils.stage_graph import Stage, plan, run_stages
+
+
+def test_plan_prunes_unconsumed_stages():
+    stages = [
+        Stage("a", lambda x: {"a": x}, ("x",), ("a",)),
+        Stage("unused", lambda a: {"u": a}, ("a",), ("u",)),
+        Stage("b", lambda a: {"b": a}, ("a",), ("b",)),
+    ]
+    assert [s.name for s in plan(stages, ["b"], {"x"})] == ["a", "b"]
+    assert [s.name for s in plan(stages, None, {"x"})] == ["a", "unused", "b"]
+    with pytest.raises(ValueError, match="nothing produces"):
+        plan(stages, ["b"])
+
+
+def test_plan_rejects_cycles_and_duplicate_producers():
+    with pytest.raises(ValueError, match="cycle"):
+        plan([Stage("a", None, ("b",), ("a",)), Stage("b", None, ("a",), ("b",))])
+    with pytest.raises(ValueError, match="produced by both"):
+        plan([Stage("a", None, (), ("v",)), Stage("b", None, (), ("v",))])
+
+
+def test_independent_stages_run_in_parallel_with_context():
+    barrier = threading.Barrier(2, timeout=5)
+    seen = []
+
+    def branch(name):
+        def run(x):
+            barrier.wait()
+            seen.append(current_context().get("feature"))
+            return {name: x + name}
+
+        return run
+
+    stages = [
+        Stage("left", branch("lhs"), ("x",), ("lhs",)),
+        Stage("right", branch("rhs"), ("x",), ("rhs",)),
+        Stage("join", lambda lhs, rhs: {"out": lhs + rhs}, ("lhs", "rhs"), ("out",)),
+    ]
+    with call_context(feature="feat"):
+        values = run_stages(stages, {"x": "-"}, ["out"], max_workers=2)
+    assert values["out"] == "-lhs-rhs"
+    assert seen == ["feat", "feat"]
+
+
+def test_shared_resource_serialises_and_errors_stop_the_run():
+    active = []
+    peak = []
+    calls = []
+
+    def work(name):
+        def run():
+            active.append(name)
+            peak.append(len(active))
+            time.sleep(0.02)
+            active.remove(name)
+            calls.append(name)
+            if name == "b":
+                raise SystemExit("boom")
+            return {name: True}
+
+        return run
+
+    stages = [
+        Stage("a", work("a"), (), ("a",), ("unity",)),
+        Stage("b", work("b"), (), ("b",), ("unity",)),
+        Stage("c", lambda a, b: calls.append("c") or {"c": True}, ("a", "b"), ("c",)),
+    ]
+    with pytest.raises(SystemExit, match="boom"):
+        run_stages(stages, max_workers=4)
+    assert max(peak) == 1
+    assert calls == ["a", "b"]
@@ -0,0 +1,97 @@
+import json
+
+import pytest
+
+import config
+from agents.tech import tester
+from tools import fake_toolchain
+from utils import test_selection
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    cfg = tmp_path / "toolchain.yaml"
+    cfg.write_text(
+        "unity: {startup_seconds: 0, test_seconds: 0, tests: {EditMode: 4, PlayMode: 2}}\n", encoding="utf-8"
+    )
+    env = fake_toolchain.install(tmp_path / "bin")
+    monkeypatch.setenv("FAKE_TOOLCHAIN_CONFIG", str(cfg))
+    monkeypatch.setenv("FAKE_TOOLCHAIN_STATE", str(tmp_path / "state"))
+    monkeypatch.setattr(config, "UNITY_CLI", env["UNITY_CLI"])
+    monkeypatch.setattr(tester, "log_action", lambda *a: None)
+    monkeypatch.setattr(test_selection, "ENABLED", True)
+    monkeypatch.setattr(test_selection, "STATE_PATH", tmp_path / "selection.json")
+    monkeypatch.setattr(test_selection, "FULL_RUN_EVERY", 10)
+
+    root = tmp_path / "project"
+    scripts, tests = root / "Assets" / "Scripts", root / "Assets" / "Tests"
+    scripts.mkdir(parents=True)
+    tests.mkdir()
+    (scripts / "Game.asmdef").write_text(json.dumps({"name": "Game"}), encoding="utf-8")
+    (tests / "Game.Tests.asmdef").write_text(
+        json.dumps({"name": "Game.Tests", "references": ["Game", "UnityEngine.TestRunner"]}), encoding="utf-8"
+    )
+    for name in ("Door", "Lamp", "Helper"):
+        (scripts / f"{name}.cs").write_text(f"namespace Game {{ class {name} {{}} }}", encoding="utf-8")
+    for name in ("Door", "Lamp"):
+        (tests / f"Test_{name}_Logic.cs").write_text(
+            f"namespace Game.Tests {{ class Test_{name}_Logic {{}} }}", encoding="utf-8"
+        )
+    (root / "ProjectSettings").mkdir()
+    (root / "ProjectSettings" / "ProjectSettings.asset").write_text("a", encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+    return root
+
+
+def _touch(path, text):
+    path.write_text(path.read_text(encoding="utf-8") + text, encoding="utf-8")
+
+
+def test_dependency_map(project):
+    deps = test_selection.build_map(project)
+    assert deps["Assets/Scripts/Door.cs"] == {"Game.Tests.Test_Door_Logic"}
+    # no test named after Helper, so every test assembly referencing Game
+    assert deps["Assets/Scripts/Helper.cs"] == {"Game.Tests.Test_Door_Logic", "Game.Tests.Test_Lamp_Logic"}
+    assert deps["Assets/Tests/Test_Lamp_Logic.cs"] == {"Game.Tests.Test_Lamp_Logic"}
+
+
+def test_tester_runs_only_affected_tests(project):
+    assert tester.run_unity_tests(str(project))["EditMode"]["passed"] == 4
+
+    _touch(project / "Assets" / "Scripts" / "Door.cs", "// changed")
+    selection = test_selection.select(project)
+    assert not selection.full and selection.filter == "Game.Tests.Test_Door_Logic"
+    assert tester.run_unity_tests(str(project))["EditMode"]["passed"] == 2
+
+    _touch(project / "Assets" / "Scripts" / "Helper.cs", "// changed")
+    assert test_selection.select(project).tests == ["Game.Tests.Test_Door_Logic", "Game.Tests.Test_Lamp_Logic"]
+
+
+@pytest.mark.parametrize(
+    "change, reason",
+    [
+        (lambda root: _touch(root / "ProjectSettings" / "ProjectSettings.asset", "b"), "not a script"),
+        (lambda root: (root / "Assets" / "Scripts" / "Lamp.cs").unlink(), "was deleted"),
+        (lambda root: (root / "Assets" / "Loose.cs").write_text("class Loose {}"), "no tests mapped"),
+    ],
+)
+def test_unmapped_changes_run_full_suite(project, change, reason):
+    test_selection.record(test_selection.select(project))
+    change(project)
+    selection = test_selection.select(project)
+    assert selection.full and selection.filter is None
+    assert reason in selection.reason
+
+
+def test_scheduled_full_run(project, monkeypatch):
+    monkeypatch.setattr(test_selection, "FULL_RUN_EVERY", 2)
+    assert test_selection.select(project).reason == "no baseline"
+    test_selection.record(test_selection.select(project))
+    _touch(project / "Assets" / "Scripts" / "Door.cs", "// 1")
+    test_selection.record(test_selection.select(project))
+    _touch(project / "Assets" / "Scripts" / "Door.cs", "// 2")
+    assert test_selection.select(project).reason == "scheduled: every 2 runs"
+
+    monkeypatch.setattr(test_selection, "FULL_RUN_EVERY", 10)
+    monkeypatch.setattr(test_selection, "FULL_RUN_HOURS", 0)
+    assert test_selection.select(project).reason.startswith("scheduled: older than")
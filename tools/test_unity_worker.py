@@ -0,0 +1,85 @@
+import pytest
+
+import config
+from agents.tech import build_agent, tester
+from tools import fake_toolchain
+from utils import unity_worker
+
+
+@pytest.fixture
+def worker_env(tmp_path, monkeypatch):
+    cfg = tmp_path / "toolchain.yaml"
+    cfg.write_text(
+        "unity: {startup_seconds: 0.3, heartbeat_seconds: 0.05, build_seconds: 0, test_seconds: 0,"
+        " tests: {EditMode: 3, PlayMode: 2}}\n",
+        encoding="utf-8",
+    )
+    env = fake_toolchain.install(tmp_path / "bin")
+    monkeypatch.setenv("FAKE_TOOLCHAIN_CONFIG", str(cfg))
+    monkeypatch.setenv("FAKE_TOOLCHAIN_STATE", str(tmp_path / "state"))
+    monkeypatch.setattr(config, "UNITY_CLI", env["UNITY_CLI"])
+    monkeypatch.setattr(config, "PROJECT_PATH", str(tmp_path / "project"))
+    monkeypatch.setattr(unity_worker, "WORKER_ENABLED", True)
+    monkeypatch.setattr(unity_worker, "WORKER_DIR", tmp_path / "workers")
+    monkeypatch.setattr(unity_worker, "log_action", lambda *a: None)
+    monkeypatch.setattr(tester, "log_action", lambda *a: None)
+    monkeypatch.setattr(build_agent, "log_action", lambda *a: None)
+    monkeypatch.setattr(build_agent, "log_trace", lambda *a: None)
+    (tmp_path / "project" / "Assets").mkdir(parents=True)
+    monkeypatch.chdir(tmp_path)
+    yield tmp_path
+    unity_worker.shutdown()
+
+
+def _count(root, tool):
+    path = root / "state" / f"{tool}.count"
+    return int(path.read_text()) if path.exists() else 0
+
+
+def test_tests_and_builds_share_one_editor(worker_env):
+    project = str(worker_env / "project")
+    for _ in range(2):
+        assert tester.run_unity_tests(project)["PlayMode"]["passed"] == 2
+    assert (worker_env / "results_EditMode.xml").exists()
+    assert (worker_env / "project" / "Assets" / "Editor" / "AIStudio" / "AIStudioWorker.cs").exists()
+    assert _count(worker_env, "unity") == 1
+    assert _count(worker_env, "unity-job") == 4
+
+    worker_env.joinpath("toolchain.yaml").write_text(
+        "unity: {startup_seconds: 0.3, heartbeat_seconds: 0.05, test_seconds: 0, fail_rate: 1.0, tests: {EditMode: 2}}\n",
+        encoding="utf-8",
+    )
+    with pytest.raises(RuntimeError, match="returned 2 for EditMode"):
+        tester.run_unity_tests(project)
+    assert _count(worker_env, "unity") == 1
+
+
+def test_build_through_worker(worker_env):
+    result = build_agent.run({"target": "WebGL"})
+    assert result["status"] == "success"
+    assert (worker_env / "Build" / "WebGL.zip").exists()
+    assert "Build WebGL succeeded" in (worker_env / "build.log").read_text(encoding="utf-8")
+
+
+def test_recycle_and_restart_unhealthy_editor(worker_env, monkeypatch):
+    monkeypatch.setattr(unity_worker, "MAX_JOBS", 2)
+    worker = unity_worker.UnityWorker(worker_env / "project", worker_env / "w")
+    results = str(worker_env / "r.xml")
+    try:
+        for _ in range(3):
+            assert worker.submit("tests", platform="EditMode", results=results)["returncode"] == 0
+        assert _count(worker_env, "unity") == 2
+
+        worker.proc.kill()
+        worker.proc.wait()
+        assert not worker.healthy()
+        worker.submit("tests", platform="EditMode", results=results)
+        assert _count(worker_env, "unity") == 3
+
+        # an editor that stops beating is replaced as well
+        monkeypatch.setattr(unity_worker, "HEARTBEAT_TIMEOUT", 0.0)
+        worker.submit("tests", platform="EditMode", results=results)
+        assert _count(worker_env, "unity") == 4
+    finally:
+        worker.stop()
+    assert worker.proc is None
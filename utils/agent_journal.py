@@ -1,21 +1,137 @@
+"""Agent journal (``agent_journal.log``) and trace (``agent_trace.log``).
+
+Lines are buffered per process and appended in batches: a file is written
+once ``JOURNAL_BUFFER_LINES`` lines are pending or the oldest pending line
+is ``JOURNAL_FLUSH_SECONDS`` old (checked on the next write, or by a
+background thread with ``JOURNAL_WRITER_THREAD=1``). Pending lines are also
+written at exit, after an auto-fix event, before an uncaught exception is
+reported, before a fork and by :func:`read_entries`. Code that reads the
+files directly in the same process calls :func:`flush` first.
+``JOURNAL_BUFFER_LINES=1`` writes every line immediately.
+"""
+
 from __future__ import annotations
 
+import atexit
 import json
+import os
+import sys
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Any, List
+from typing import Any, Dict, List
 
 LOG_PATH = Path("agent_journal.log")
 TRACE_PATH = Path("agent_trace.log")
+BUFFER_LINES = int(os.getenv("JOURNAL_BUFFER_LINES", "64"))
+FLUSH_SECONDS = float(os.getenv("JOURNAL_FLUSH_SECONDS", "1"))
+WRITER_THREAD = os.getenv("JOURNAL_WRITER_THREAD", "0") == "1"
+
+# pending lines per file, in write order
+_pending: Dict[Path, List[str]] = {}
+_count = 0
+_oldest = 0.0
+_lock = threading.Lock()
+_writer: threading.Thread | None = None
+_wake = threading.Event()
+
+
+def _write(path: Path, line: str) -> None:
+    global _count, _oldest
+    with _lock:
+        if not _count:
+            _oldest = time.monotonic()
+        _pending.setdefault(path, []).append(line)
+        _count += 1
+        due = _count >= BUFFER_LINES or time.monotonic() - _oldest >= FLUSH_SECONDS
+        if due and not WRITER_THREAD:
+            _flush_locked()
+    if WRITER_THREAD:
+        _start_writer()
+        if due:
+            _wake.set()
+
+
+def _flush_locked() -> None:
+    global _count
+    error = None
+    for path in list(_pending):
+        try:
+            # one write per file keeps the batch contiguous next to other processes' appends
+            with path.open("a", encoding="utf-8") as f:
+                f.write("".join(_pending[path]))
+        except OSError as exc:
+            # keep the lines for the next flush and still write the other files
+            error = error or exc
+            continue
+        del _pending[path]
+    _count = sum(len(lines) for lines in _pending.values())
+    if error:
+        raise error
+
+
+def flush() -> None:
+    """Write all pending journal and trace lines."""
+    with _lock:
+        _flush_locked()
+
+
+def _start_writer() -> None:
+    global _writer
+    if _writer is not None:
+        return
+    with _lock:
+        if _writer is None:
+            _writer = threading.Thread(target=_run_writer, name="agent-journal", daemon=True)
+            _writer.start()
+
+
+def _run_writer() -> None:
+    while True:
+        _wake.wait(FLUSH_SECONDS)
+        _wake.clear()
+        try:
+            flush()
+        except OSError as exc:
+            # the lines stay pending and are retried on the next flush
+            print(f"agent_journal: {exc}", file=sys.stderr)
+
+
+def _after_fork() -> None:
+    global _lock, _writer, _count
+    # the parent writes its own pending lines; the writer thread is not copied
+    _lock = threading.Lock()
+    _pending.clear()
+    _count = 0
+    _writer = None
+
+
+def _flush_before(hook):
+    def handler(*args):
+        try:
+            flush()
+        except Exception:
+            pass
+        hook(*args)
+
+    return handler
+
+
+atexit.register(flush)
+sys.excepthook = _flush_before(sys.excepthook)
+threading.excepthook = _flush_before(threading.excepthook)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(before=flush, after_in_child=_after_fork)
 
 
 def log_action(agent: str, action: str) -> None:
     timestamp = datetime.utcnow().isoformat()
-    with LOG_PATH.open("a", encoding="utf-8") as f:
-        f.write(f"{timestamp} [{agent}] {action}\n")
+    _write(LOG_PATH, f"{timestamp} [{agent}] {action}\n")
 
 
 def read_entries() -> List[str]:
+    flush()
     if not LOG_PATH.exists():
         return []
     return LOG_PATH.read_text(encoding="utf-8").splitlines()
@@ -32,12 +148,12 @@ def log_trace(agent: str, stage: str, data_in: Any, data_out: Any) -> None:
         "input": data_in,
         "output": data_out,
     }
-    with TRACE_PATH.open("a", encoding="utf-8") as f:
-        f.write(f"{json.dumps(entry, ensure_ascii=False)}\n")
+    _write(TRACE_PATH, f"{json.dumps(entry, ensure_ascii=False)}\n")
 
 
 def log_auto_fix(agent: str, status: str, description: str) -> None:
     """Log auto-fix events in a dedicated format."""
     timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-    with LOG_PATH.open("a", encoding="utf-8") as f:
-        f.write(f"{timestamp} | AUTO_FIX | {agent} | {status} | {description}\n")
+    _write(LOG_PATH, f"{timestamp} | AUTO_FIX | {agent} | {status} | {description}\n")
+    # auto-fixes follow failures: get them on disk even if the process dies next
+    flush()
@@ -15,17 +15,20 @@ def normalize_path(p: str | Path) -> Path:
     return Path(p)
 
 
-def save_to_unity_structure(modification):
-    filename = modification["path"]
-    content = modification["content"]
-
+def unity_target(filename: str | Path) -> Path:
+    """Return where a patch file named ``filename`` lands in the scripts dir."""
     rel = normalize_path(filename)
     if len(rel.parts) >= 2 and rel.parts[0] == "Assets" and rel.parts[1] in ("Scripts", "Tests"):
         rel = Path(*rel.parts[2:])
     elif rel.parts and rel.parts[0] in ("Scripts", "Tests"):
         rel = Path(*rel.parts[1:])
+    return SCRIPTS_PATH / rel
+
+
+def save_to_unity_structure(modification):
+    content = modification["content"]
 
-    target_path = SCRIPTS_PATH / rel
+    target_path = unity_target(modification["path"])
     target_path.parent.mkdir(parents=True, exist_ok=True)
     target_path.write_text(content, encoding="utf-8")
     print(f"✅ Файл сохранён в Unity проект: {target_path}")
@@ -4,7 +4,7 @@ import os
 import shutil
 from pathlib import Path
 
-BACKUP_ROOT = Path("_backups")
+BACKUP_ROOT = Path(os.getenv("BACKUP_ROOT", "_backups"))
 
 
 def _prepare_dir(path: Path) -> None:
@@ -17,7 +17,8 @@ def save_backup(feature_name: str, source_path: str) -> None:
     dest = (Path.cwd() / BACKUP_ROOT / feature_name).resolve()
 
     # 💥 Явная проверка, чтобы dest не лежал внутри src
-    if str(dest).startswith(str(src)):
+    # (папка _backups при копировании игнорируется, поэтому она допустима)
+    if dest.is_relative_to(src) and not dest.is_relative_to(src / BACKUP_ROOT.name):
         raise ValueError(f"Backup destination {dest} is inside source {src}. Cannot copy recursively.")
 
     _prepare_dir(dest.parent)
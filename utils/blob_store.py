@@ -0,0 +1,81 @@
+"""Content-addressed storage for large values.
+
+A blob is stored once under the sha256 of its content
+(``<BLOB_STORE_DIR>/<first two hex chars>/<digest>``, zlib-compressed), so
+records keep only the digest and identical payloads share one file.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import time
+import zlib
+from pathlib import Path
+from typing import Iterable
+
+BLOB_DIR = Path(os.getenv("BLOB_STORE_DIR", ".blob_store"))
+# blobs younger than this survive gc: a writer may not have stored the reference yet
+GC_GRACE_SECONDS = 3600
+
+
+def _path(digest: str) -> Path:
+    return BLOB_DIR / digest[:2] / digest
+
+
+def put(data: str | bytes) -> str:
+    """Store ``data`` and return its digest."""
+    raw = data.encode("utf-8") if isinstance(data, str) else data
+    digest = hashlib.sha256(raw).hexdigest()
+    path = _path(digest)
+    if path.exists():
+        # refresh the mtime so a concurrent gc keeps it
+        path.touch()
+        return digest
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{digest}.{os.getpid()}.tmp")
+    tmp.write_bytes(zlib.compress(raw))
+    tmp.replace(path)
+    return digest
+
+
+def get(digest: str) -> bytes | None:
+    try:
+        return zlib.decompress(_path(digest).read_bytes())
+    except (OSError, zlib.error):
+        return None
+
+
+def get_text(digest: str) -> str | None:
+    raw = get(digest)
+    return None if raw is None else raw.decode("utf-8")
+
+
+def gc(referenced: Iterable[str], candidates: Iterable[str] | None = None) -> int:
+    """Delete blobs not in ``referenced``; return how many were removed.
+
+    With ``candidates`` only those digests are considered instead of the
+    whole store.
+    """
+    keep = set(referenced)
+    removed = 0
+    cutoff = time.time() - GC_GRACE_SECONDS
+    if candidates is not None:
+        paths = [_path(digest) for digest in set(candidates)]
+    else:
+        paths = BLOB_DIR.glob("*/*") if BLOB_DIR.exists() else []
+    for path in paths:
+        if path.name in keep or path.name.endswith(".tmp"):
+            continue
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except OSError:
+            continue
+    return removed
+
+
+def size() -> int:
+    """Return the bytes used by the store."""
+    return sum(p.stat().st_size for p in BLOB_DIR.glob("*/*")) if BLOB_DIR.exists() else 0
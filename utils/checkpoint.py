@@ -0,0 +1,163 @@
+"""Per-feature checkpoints for resuming interrupted pipeline runs.
+
+Every completed stage stores its outputs and copies of the files it wrote
+under ``<directory>/``. A resumed run restores a stage instead of running it
+again when the stage's inputs are unchanged. A stage that consumes what
+earlier stages produced puts :meth:`Checkpoint.upstream` into its inputs, so
+it runs again when one of them was re-run with a different result::
+
+    ckpt = Checkpoint("ci_reports/feat/checkpoint", resume=True)
+    report = ckpt.step("ci_test", ci_test.main, {"upstream": ckpt.upstream()})
+"""
+
+from __future__ import annotations
+
+import json
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable
+
+from utils import stage_cache
+
+CHECKPOINT_FILE = "checkpoint.json"
+
+
+class Checkpoint:
+    """Stage results of one feature run.
+
+    Without ``resume`` any previous checkpoint in ``directory`` is discarded.
+    ``on_status(stage, status)`` is called on every status change
+    (``running``, ``done``, ``failed``, ``resumed``).
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        resume: bool = False,
+        on_status: Callable[[str, str], None] | None = None,
+    ) -> None:
+        self.directory = Path(directory)
+        self.on_status = on_status
+        self._lock = threading.Lock()
+        # outputs of the stages completed (run or restored) by this run
+        self._completed: Dict[str, Any] = {}
+        if not resume:
+            shutil.rmtree(self.directory, ignore_errors=True)
+        self._state = self._load()
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            return json.loads((self.directory / CHECKPOINT_FILE).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {"stages": {}}
+
+    def _write(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self.directory / f"{CHECKPOINT_FILE}.tmp"
+        tmp.write_text(json.dumps(self._state, ensure_ascii=False, default=str), encoding="utf-8")
+        tmp.replace(self.directory / CHECKPOINT_FILE)
+
+    def mark(self, name: str, status: str) -> None:
+        with self._lock:
+            self._state["stages"].setdefault(name, {})["status"] = status
+            self._write()
+        if self.on_status:
+            self.on_status(name, status)
+
+    def upstream(self) -> str:
+        """Return a digest of the outputs of every stage completed so far in this run."""
+        with self._lock:
+            return stage_cache.make_key("upstream", dict(self._completed))
+
+    def completed(self) -> list[str]:
+        with self._lock:
+            return [n for n, s in self._state["stages"].items() if s.get("status") in ("done", "resumed")]
+
+    def restore(self, name: str, inputs: Dict[str, Any] | None = None) -> Dict[str, Any] | None:
+        """Return the saved outputs of ``name`` and put its files back.
+
+        ``None`` if the stage did not complete or ran on different ``inputs``.
+        """
+        with self._lock:
+            entry = dict(self._state["stages"].get(name) or {})
+        if entry.get("status") not in ("done", "resumed"):
+            return None
+        if entry.get("key") != stage_cache.make_key(name, inputs or {}):
+            return None
+        try:
+            for item in entry.get("artifacts", []):
+                target = Path(item["path"])
+                target.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(self.directory / item["stored"], target)
+        except OSError as e:
+            print(f"Checkpoint of {name} is incomplete, running it again: {e}")
+            return None
+        with self._lock:
+            self._completed[name] = entry.get("outputs")
+        self.mark(name, "resumed")
+        return entry.get("outputs")
+
+    def save(
+        self,
+        name: str,
+        outputs: Dict[str, Any],
+        artifacts: Iterable[str | Path] = (),
+        inputs: Dict[str, Any] | None = None,
+    ) -> None:
+        """Record ``name`` as done with its outputs and copies of ``artifacts``.
+
+        Artifacts may be files or directories; missing ones are skipped.
+        """
+        stored = []
+        root = self.directory / "files" / name
+        shutil.rmtree(root, ignore_errors=True)
+        for item in artifacts:
+            src = Path(item)
+            for path in sorted(src.rglob("*")) if src.is_dir() else [src]:
+                if not path.is_file():
+                    continue
+                rel = Path("_abs", *path.parts[1:]) if path.is_absolute() else path
+                dest = root / rel
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(path, dest)
+                stored.append({"path": str(path), "stored": (dest.relative_to(self.directory)).as_posix()})
+        entry = {
+            "status": "done",
+            "key": stage_cache.make_key(name, inputs or {}),
+            "outputs": outputs,
+            "artifacts": stored,
+            "ended": time.time(),
+        }
+        with self._lock:
+            self._state["stages"][name] = entry
+            self._completed[name] = outputs
+            self._write()
+        if self.on_status:
+            self.on_status(name, "done")
+
+    def step(
+        self,
+        name: str,
+        func: Callable[[], Any],
+        inputs: Dict[str, Any] | None = None,
+        artifacts: Iterable[str | Path] = (),
+    ) -> Any:
+        """Run ``func`` once per checkpoint and return its result."""
+        restored = self.restore(name, inputs)
+        if restored is not None:
+            print(f"⏩ {name} resumed from checkpoint")
+            return restored.get("result")
+        self.mark(name, "running")
+        try:
+            result = func()
+        except BaseException:
+            self.mark(name, "failed")
+            raise
+        self.save(name, {"result": result}, artifacts, inputs)
+        return result
+
+    def finish(self) -> None:
+        """Drop stored file copies once the whole run succeeded."""
+        shutil.rmtree(self.directory / "files", ignore_errors=True)
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import json
+import os
+import threading
 from pathlib import Path
 from typing import Any, Dict, List
 
@@ -15,7 +17,10 @@ def load_index() -> Dict[str, Any]:
 
 
 def save_index(data: Dict[str, Any]) -> None:
-    INDEX_PATH.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+    # replaced in one step so concurrent readers see the old or the new index
+    tmp = INDEX_PATH.with_name(f"{INDEX_PATH.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+    tmp.replace(INDEX_PATH)
 
 
 def get_feature(feat_id: str) -> Dict[str, Any] | None:
@@ -1,19 +1,226 @@
+from __future__ import annotations
+
 import json
+import os
+import threading
+import time
+from typing import Callable, Iterator
 
 import requests
+from requests.adapters import HTTPAdapter
+
+from utils import llm_cache, llm_metrics
+from utils.llm_scheduler import LLMScheduler, current_context
+from utils.single_flight import SingleFlight
+
+OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434")
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))
+# Number of per-host pools kept by the adapter and the maximum number of
+# keep-alive connections opened to a single host (requests beyond that wait).
+LLM_POOL_CONNECTIONS = int(os.getenv("LLM_POOL_CONNECTIONS", "4"))
+LLM_POOL_MAXSIZE = int(os.getenv("LLM_POOL_MAXSIZE", "8"))
+# Upper bound of generations running against Ollama at the same time,
+# shared by threads and the asyncio client in utils.llm_async. Setting
+# LLM_SCHEDULER_LOCK_DIR extends the limit to every process using that dir.
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "2"))
+LLM_SCHEDULER_LOCK_DIR = os.getenv("LLM_SCHEDULER_LOCK_DIR")
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+_stream_handler: Callable[[str], None] | None = None
+_scheduler = LLMScheduler(LLM_MAX_CONCURRENCY, LLM_SCHEDULER_LOCK_DIR)
+_inflight = SingleFlight()
+
+
+def get_session() -> requests.Session:
+    """Return the shared keep-alive session used for all LLM requests."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=LLM_POOL_CONNECTIONS,
+                    pool_maxsize=LLM_POOL_MAXSIZE,
+                    pool_block=True,
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers.update({"Content-Type": "application/json"})
+                _session = session
+    return _session
+
+
+def close_session() -> None:
+    """Close pooled connections, e.g. before forking worker processes."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def set_stream_handler(handler: Callable[[str], None] | None) -> None:
+    """Forward every generated token to ``handler`` (``None`` disables).
+
+    While a handler is set, ``ask_mistral`` streams its requests so callers
+    such as the playground can print output while it is being generated.
+    """
+    global _stream_handler
+    _stream_handler = handler
+
+
+def get_scheduler() -> LLMScheduler:
+    """Return the scheduler gating requests of this process."""
+    return _scheduler
+
+
+def _slot():
+    return _scheduler.slot(**current_context())
+
+
+def _account(model: str, started: float, wait: float = 0.0, result: dict | None = None, **flags) -> None:
+    """Record tokens and timings of one call for the calling agent/feature."""
+    entry = {
+        **current_context(),
+        "model": model,
+        "queue_wait_seconds": round(wait, 4),
+        "wall_seconds": round(time.monotonic() - started, 4),
+        **flags,
+    }
+    if result:
+        entry.update(llm_metrics.from_ollama(result))
+    llm_metrics.record(entry)
 
 
-def ask_mistral(prompt: str, model: str = "mistral") -> str:
-    """Query local Mistral LLM via Ollama REST API."""
+def _generate_url() -> str:
+    return f"{OLLAMA_URL.rstrip('/')}/api/generate"
+
+
+def stream_mistral(
+    prompt: str,
+    model: str = "mistral",
+    options: dict | None = None,
+    use_cache: bool = True,
+) -> Iterator[str]:
+    """Yield response tokens from Ollama as soon as they are generated.
+
+    Closing the generator early (``break`` in the consumer) drops the HTTP
+    connection, which makes Ollama stop the generation. Only completed
+    answers are written to the cache.
+    """
+    handler = _stream_handler
+    cache_on = use_cache and llm_cache.CACHE_ENABLED
+    key = llm_cache.make_key(model, prompt, options) if cache_on else ""
+    if cache_on:
+        cached = llm_cache.get(key)
+        if cached is not None:
+            _account(model, time.monotonic(), cached=True)
+            if handler:
+                handler(cached)
+            yield cached
+            return
+
+    payload = {"model": model, "prompt": prompt, "stream": True}
+    if options:
+        payload["options"] = options
+    parts: list[str] = []
+    started = time.monotonic()
+    wait = 0.0
+    final: dict = {}
+    try:
+        with _slot() as wait, get_session().post(
+            _generate_url(),
+            data=json.dumps(payload),
+            timeout=LLM_TIMEOUT,
+            stream=True,
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                token = chunk.get("response", "")
+                if token:
+                    parts.append(token)
+                    if handler:
+                        handler(token)
+                    yield token
+                if chunk.get("done"):
+                    final = chunk
+                    break
+    except GeneratorExit:
+        _account(model, started, wait, final, aborted=True)
+        raise
+    except (requests.exceptions.RequestException, ValueError) as exc:
+        _account(model, started, wait, error=True)
+        yield f"⚠ LLM error: {exc}".strip()
+        return
+
+    _account(model, started, wait, final)
+
+    text = "".join(parts).strip()
+    if cache_on and text:
+        llm_cache.put(key, model, text)
+
+
+def _generate(prompt: str, model: str, options: dict | None, cache_key: str) -> str:
+    """Send one non-streaming request and store the answer under ``cache_key``."""
+    payload = {"model": model, "prompt": prompt, "stream": False}
+    if options:
+        payload["options"] = options
+    started = time.monotonic()
+    wait = 0.0
     try:
-        response = requests.post(
-            "http://localhost:11434/api/generate",
-            headers={"Content-Type": "application/json"},
-            data=json.dumps({"model": model, "prompt": prompt, "stream": False}),
-            timeout=30,
-        )
-        response.raise_for_status()
-        result = response.json()
-        return result.get("response", "").strip()
+        with _slot() as wait:
+            response = get_session().post(
+                _generate_url(),
+                data=json.dumps(payload),
+                timeout=LLM_TIMEOUT,
+            )
+            response.raise_for_status()
+            result = response.json()
+        text = result.get("response", "").strip()
     except requests.exceptions.RequestException as exc:
+        _account(model, started, wait, error=True)
         return f"⚠ LLM error: {exc}".strip()
+
+    _account(model, started, wait, result)
+
+    if cache_key and text:
+        llm_cache.put(cache_key, model, text)
+    return text
+
+
+def ask_mistral(
+    prompt: str,
+    model: str = "mistral",
+    options: dict | None = None,
+    use_cache: bool = True,
+) -> str:
+    """Query local Mistral LLM via Ollama REST API.
+
+    Successful responses are cached on disk by model, prompt and ``options``;
+    pass ``use_cache=False`` (or set ``LLM_CACHE=0``) to bypass the cache.
+    Identical requests issued concurrently share a single upstream call
+    unless ``use_cache`` is False.
+    """
+    if _stream_handler is not None:
+        return "".join(stream_mistral(prompt, model, options, use_cache)).strip()
+
+    if not use_cache:
+        return _generate(prompt, model, options, "")
+
+    key = llm_cache.make_key(model, prompt, options)
+    cache_key = key if llm_cache.CACHE_ENABLED else ""
+    if cache_key:
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            _account(model, time.monotonic(), cached=True)
+            return cached
+
+    started = time.monotonic()
+    text, shared = _inflight.do(key, lambda: _generate(prompt, model, options, cache_key))
+    if shared:
+        _account(model, started, shared=True)
+    return text
@@ -0,0 +1,21 @@
+"""Asyncio front-end for the shared LLM client."""
+
+from __future__ import annotations
+
+import asyncio
+
+from utils import llm
+
+
+async def ask_mistral_async(
+    prompt: str,
+    model: str = "mistral",
+    options: dict | None = None,
+    use_cache: bool = True,
+) -> str:
+    """Awaitable ``ask_mistral``.
+
+    The request runs in a worker thread on the pooled session, so it shares
+    the cache and the ``LLM_MAX_CONCURRENCY`` limit with synchronous callers.
+    """
+    return await asyncio.to_thread(llm.ask_mistral, prompt, model, options, use_cache)
@@ -0,0 +1,159 @@
+"""Persistent content-addressed cache for LLM responses."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+CACHE_DIR = Path(os.getenv("LLM_CACHE_DIR", ".llm_cache"))
+CACHE_ENABLED = os.getenv("LLM_CACHE", "1") != "0"
+CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2000"))
+CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+_count: int | None = None
+
+
+def make_key(model: str, prompt: str, options: Dict[str, Any] | None = None) -> str:
+    """Return the cache key for a model, prompt and generation options."""
+    payload = json.dumps(
+        {"model": model, "prompt": prompt, "options": options or {}},
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _entry_path(key: str) -> Path:
+    return CACHE_DIR / key[:2] / f"{key}.json"
+
+
+def _bump(name: str, amount: int = 1) -> None:
+    with _lock:
+        _stats[name] += amount
+
+
+def get(key: str) -> str | None:
+    """Return cached response for ``key`` or ``None`` on miss or expiry."""
+    path = _entry_path(key)
+    try:
+        entry = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        _bump("misses")
+        return None
+    if CACHE_TTL and time.time() - entry.get("created", 0) > CACHE_TTL:
+        _remove(path)
+        _bump("misses")
+        return None
+    try:
+        # mtime doubles as the LRU timestamp
+        os.utime(path)
+    except OSError:
+        pass
+    _bump("hits")
+    return entry.get("response")
+
+
+def put(key: str, model: str, response: str) -> None:
+    """Store ``response`` under ``key`` and evict old entries if needed."""
+    global _count
+    path = _entry_path(key)
+    tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    entry = {"model": model, "response": response, "created": time.time()}
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        existed = path.exists()
+        tmp.write_text(json.dumps(entry, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError:
+        # read-only or full cache dir: the caller still gets its response, uncached
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        return
+    _bump("writes")
+    with _lock:
+        if _count is None:
+            _count = len(_entries())
+        elif not existed:
+            _count += 1
+        over = _count > CACHE_MAX_ENTRIES
+    if over:
+        _evict()
+
+
+def _entries() -> list[Path]:
+    try:
+        return list(CACHE_DIR.glob("*/*.json")) if CACHE_DIR.exists() else []
+    except OSError:
+        return []
+
+
+def _remove(path: Path) -> bool:
+    global _count
+    try:
+        path.unlink()
+    except OSError:
+        return False
+    with _lock:
+        if _count:
+            _count -= 1
+    return True
+
+
+def _evict() -> None:
+    """Drop least recently used entries until the size cap is respected."""
+    global _count
+    files = []
+    for p in _entries():
+        try:
+            files.append((p.stat().st_mtime, p))
+        except OSError:
+            continue
+    files.sort()
+    excess = len(files) - CACHE_MAX_ENTRIES
+    removed = 0
+    for _, path in files[: max(excess, 0)]:
+        try:
+            path.unlink()
+            removed += 1
+        except OSError:
+            continue
+    with _lock:
+        _count = len(files) - removed
+        _stats["evictions"] += removed
+
+
+def clear() -> None:
+    """Remove every cached entry."""
+    global _count
+    for path in _entries():
+        try:
+            path.unlink()
+        except OSError:
+            continue
+    with _lock:
+        _count = 0
+
+
+def stats() -> Dict[str, int]:
+    """Return hit/miss counters for the current process."""
+    with _lock:
+        return dict(_stats)
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "clear":
+        clear()
+        print(f"Cleared {CACHE_DIR}")
+    else:
+        print(json.dumps({"entries": len(_entries()), "dir": str(CACHE_DIR)}, indent=2))
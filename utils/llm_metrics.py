@@ -0,0 +1,149 @@
+"""Token and latency accounting for LLM calls."""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List
+
+METRICS_PATH = Path(os.getenv("LLM_METRICS_PATH", "llm_metrics.jsonl"))
+# above this size the store is moved to ``<name>.1`` (replacing the previous one)
+MAX_BYTES = int(os.getenv("LLM_METRICS_MAX_BYTES", str(20 * 1024 * 1024)))
+
+_lock = threading.Lock()
+_totals: Dict[str, Any] = {"by_agent": {}, "by_feature": {}, "feature_agents": {}, "total": {}}
+
+_FLAGS = ("cached", "shared", "aborted", "error")
+_SUM_FIELDS = (
+    "prompt_tokens",
+    "completion_tokens",
+    "load_seconds",
+    "eval_seconds",
+    "queue_wait_seconds",
+    "wall_seconds",
+)
+
+
+def from_ollama(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract token counts and timings from an Ollama ``/api/generate`` reply."""
+    eval_ns = result.get("eval_duration") or 0
+    completion = result.get("eval_count") or 0
+    return {
+        "prompt_tokens": result.get("prompt_eval_count") or 0,
+        "completion_tokens": completion,
+        "load_seconds": (result.get("load_duration") or 0) / 1e9,
+        "eval_seconds": eval_ns / 1e9,
+        "tokens_per_sec": round(completion / (eval_ns / 1e9), 2) if eval_ns else 0.0,
+    }
+
+
+def _add(bucket: Dict[str, float], entry: Dict[str, Any]) -> None:
+    bucket["calls"] = bucket.get("calls", 0) + 1
+    for flag in _FLAGS:
+        if entry.get(flag):
+            bucket[flag] = bucket.get(flag, 0) + 1
+    for field in _SUM_FIELDS:
+        bucket[field] = bucket.get(field, 0) + (entry.get(field) or 0)
+
+
+def _finish(bucket: Dict[str, float]) -> Dict[str, Any]:
+    out: Dict[str, Any] = {k: round(v, 3) if isinstance(v, float) else v for k, v in bucket.items()}
+    for flag in _FLAGS:
+        out.setdefault(flag, 0)
+    eval_s = bucket.get("eval_seconds", 0)
+    out["tokens_per_sec"] = round(bucket.get("completion_tokens", 0) / eval_s, 2) if eval_s else 0.0
+    out["tokens_used"] = int(bucket.get("prompt_tokens", 0) + bucket.get("completion_tokens", 0))
+    return out
+
+
+def record(entry: Dict[str, Any]) -> None:
+    """Append one call to the metrics store and the in-process totals."""
+    entry = {"time": datetime.utcnow().isoformat(), **entry}
+    agent = entry.get("agent") or "unknown"
+    feature = entry.get("feature") or "unknown"
+    with _lock:
+        _add(_totals["by_agent"].setdefault(agent, {}), entry)
+        _add(_totals["by_feature"].setdefault(feature, {}), entry)
+        _add(_totals["feature_agents"].setdefault(feature, {}).setdefault(agent, {}), entry)
+        _add(_totals["total"], entry)
+        try:
+            METRICS_PATH.parent.mkdir(parents=True, exist_ok=True)
+            if MAX_BYTES and METRICS_PATH.exists() and METRICS_PATH.stat().st_size > MAX_BYTES:
+                os.replace(METRICS_PATH, METRICS_PATH.with_name(METRICS_PATH.name + ".1"))
+            with METRICS_PATH.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        except OSError:
+            pass
+
+
+def summarize(entries: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Aggregate call entries per agent, per feature and overall."""
+    by_agent: Dict[str, Dict[str, float]] = {}
+    by_feature: Dict[str, Dict[str, float]] = {}
+    total: Dict[str, float] = {}
+    for entry in entries:
+        _add(by_agent.setdefault(entry.get("agent") or "unknown", {}), entry)
+        _add(by_feature.setdefault(entry.get("feature") or "unknown", {}), entry)
+        _add(total, entry)
+    return {
+        "by_agent": {k: _finish(v) for k, v in sorted(by_agent.items())},
+        "by_feature": {k: _finish(v) for k, v in sorted(by_feature.items())},
+        "total": _finish(total),
+    }
+
+
+def iter_entries(path: Path | None = None, feature: str | None = None) -> Iterator[Dict[str, Any]]:
+    """Stream stored entries line by line, optionally only those of ``feature``."""
+    path = path or METRICS_PATH
+    # cheap pre-filter: most lines belong to other features
+    needle = json.dumps(feature, ensure_ascii=False) if feature is not None else ""
+    try:
+        f = path.open(encoding="utf-8")
+    except OSError:
+        return
+    with f:
+        for line in f:
+            if needle not in line:
+                continue
+            try:
+                item = json.loads(line)
+            except Exception:
+                continue
+            if feature is None or item.get("feature") == feature:
+                yield item
+
+
+def load(path: Path | None = None, feature: str | None = None) -> List[Dict[str, Any]]:
+    """Read stored entries, optionally only those of ``feature``."""
+    return list(iter_entries(path, feature))
+
+
+def summary(feature: str | None = None, path: Path | None = None) -> Dict[str, Any]:
+    """Aggregate the metrics store, optionally for a single feature."""
+    return summarize(iter_entries(path, feature))
+
+
+def totals(feature: str | None = None) -> Dict[str, Any]:
+    """Aggregates of the calls made by the current process.
+
+    With ``feature`` only that feature's calls are returned, per agent.
+    """
+    with _lock:
+        if feature is not None:
+            agents = _totals["feature_agents"].get(feature, {})
+            return {
+                "by_agent": {k: _finish(v) for k, v in sorted(agents.items())},
+                "total": _finish(_totals["by_feature"].get(feature, {})),
+            }
+        return {
+            "by_agent": {k: _finish(v) for k, v in sorted(_totals["by_agent"].items())},
+            "by_feature": {k: _finish(v) for k, v in sorted(_totals["by_feature"].items())},
+            "total": _finish(_totals["total"]),
+        }
+
+
+if __name__ == "__main__":
+    print(json.dumps(summary(), indent=2, ensure_ascii=False))
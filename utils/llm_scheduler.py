@@ -0,0 +1,210 @@
+"""Priority scheduler that bounds concurrent requests to the local LLM."""
+
+from __future__ import annotations
+
+import contextvars
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Lower value is served first.
+DEFAULT_PRIORITIES: Dict[str, int] = {
+    "CoderAgent": 0,
+    "ProjectManagerAgent": 1,
+    "GameDesignerAgent": 1,
+    "CreativeGameDesigner": 2,
+    "NarrativeDesignerAgent": 2,
+    "LoreKeeperAgent": 2,
+    "ArtMoodAgent": 3,
+}
+DEFAULT_PRIORITY = 2
+
+_context: contextvars.ContextVar[Dict[str, Any]] = contextvars.ContextVar("llm_call_context", default={})
+
+
+def _load_priorities() -> Dict[str, int]:
+    """Merge ``LLM_PRIORITIES`` (``Agent=0,Other=3``) into the defaults."""
+    prios = dict(DEFAULT_PRIORITIES)
+    for item in os.getenv("LLM_PRIORITIES", "").split(","):
+        name, _, value = item.partition("=")
+        if name.strip() and value.strip().lstrip("-").isdigit():
+            prios[name.strip()] = int(value)
+    return prios
+
+
+PRIORITIES = _load_priorities()
+
+
+def priority_for(agent: str | None) -> int:
+    return PRIORITIES.get(agent or "", DEFAULT_PRIORITY)
+
+
+@contextmanager
+def call_context(agent: str | None = None, feature: str | None = None) -> Iterator[None]:
+    """Tag LLM calls made inside the block with the calling agent/feature."""
+    current = dict(_context.get())
+    if agent is not None:
+        current["agent"] = agent
+    if feature is not None:
+        current["feature"] = feature
+    token = _context.set(current)
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+def current_context() -> Dict[str, Any]:
+    """Return ``{"agent": ..., "feature": ...}`` of the running call."""
+    return dict(_context.get())
+
+
+def _try_lock(fh) -> bool:
+    try:
+        if fcntl is not None:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(fh.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def _unlock(fh) -> None:
+    try:
+        if fcntl is not None:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+        else:
+            fh.seek(0)
+            msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+    finally:
+        fh.close()
+
+
+class LLMScheduler:
+    """Grant at most ``max_inflight`` LLM requests at a time.
+
+    Waiting requests are ordered by agent priority, then round-robin across
+    features and FIFO within a feature, so one large feature cannot starve
+    the others. With ``lock_dir`` set the same number of slots is also shared
+    between processes through lock files (priority ordering stays
+    per-process).
+    """
+
+    def __init__(self, max_inflight: int = 2, lock_dir: str | Path | None = None, poll: float = 0.05) -> None:
+        self.max_inflight = max(1, max_inflight)
+        self.lock_dir = Path(lock_dir) if lock_dir else None
+        self.poll = poll
+        self._cond = threading.Condition()
+        self._queue: List[tuple] = []
+        self._seq = itertools.count()
+        self._rounds: Dict[str, int] = {}
+        self._served_round = 0
+        self._inflight = 0
+        self._stats: Dict[int, Dict[str, float]] = {}
+
+    def _acquire_process_slot(self):
+        assert self.lock_dir is not None
+        self.lock_dir.mkdir(parents=True, exist_ok=True)
+        while True:
+            for i in range(self.max_inflight):
+                fh = open(self.lock_dir / f"slot-{i}.lock", "a+")
+                if _try_lock(fh):
+                    return fh
+                fh.close()
+            time.sleep(self.poll)
+
+    def acquire(self, agent: str | None = None, feature: str | None = None) -> tuple[Any, float]:
+        """Block until a slot is free; return ``(handle, queue_wait_seconds)``."""
+        prio = priority_for(agent)
+        feature_key = feature or ""
+        start = time.monotonic()
+        with self._cond:
+            rnd = max(self._rounds.get(feature_key, 0), self._served_round)
+            self._rounds[feature_key] = rnd + 1
+            ticket = (prio, rnd, next(self._seq))
+            heapq.heappush(self._queue, ticket)
+            try:
+                while self._inflight >= self.max_inflight or self._queue[0] != ticket:
+                    self._cond.wait()
+            except BaseException:
+                # an interrupted waiter must not stay at the head of the queue
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+                self._cond.notify_all()
+                raise
+            heapq.heappop(self._queue)
+            self._inflight += 1
+            if rnd > self._served_round:
+                self._served_round = rnd
+                # features behind the served round start there anyway
+                self._rounds = {f: r for f, r in self._rounds.items() if r > rnd}
+            if not self._queue:
+                # nobody waits, so there is no order left to keep fair
+                self._rounds.clear()
+            self._cond.notify_all()
+        handle = None
+        try:
+            if self.lock_dir is not None:
+                handle = self._acquire_process_slot()
+        except BaseException:
+            self._release_local()
+            raise
+        wait = time.monotonic() - start
+        self._record(prio, wait)
+        return handle, wait
+
+    def _release_local(self) -> None:
+        with self._cond:
+            self._inflight -= 1
+            self._cond.notify_all()
+
+    def release(self, handle: Any = None) -> None:
+        if handle is not None:
+            _unlock(handle)
+        self._release_local()
+
+    @contextmanager
+    def slot(self, agent: str | None = None, feature: str | None = None) -> Iterator[float]:
+        """Context manager form of :meth:`acquire`; yields the queue wait."""
+        handle, wait = self.acquire(agent, feature)
+        try:
+            yield wait
+        finally:
+            self.release(handle)
+
+    def _record(self, prio: int, wait: float) -> None:
+        with self._cond:
+            item = self._stats.setdefault(prio, {"count": 0, "wait_total": 0.0, "wait_max": 0.0})
+            item["count"] += 1
+            item["wait_total"] += wait
+            item["wait_max"] = max(item["wait_max"], wait)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue-wait metrics grouped by priority class."""
+        with self._cond:
+            by_prio = {
+                p: {
+                    "count": int(s["count"]),
+                    "wait_avg": round(s["wait_total"] / s["count"], 4) if s["count"] else 0.0,
+                    "wait_max": round(s["wait_max"], 4),
+                }
+                for p, s in sorted(self._stats.items())
+            }
+            return {
+                "max_inflight": self.max_inflight,
+                "inflight": self._inflight,
+                "queued": len(self._queue),
+                "by_priority": by_prio,
+            }
@@ -0,0 +1,163 @@
+"""Stream Unity NUnit 3 result files and keep per-test durations.
+
+PlayMode result files of large projects reach hundreds of megabytes, so the
+document is read with :func:`xml.etree.ElementTree.iterparse` and every
+``test-case`` is dropped as soon as it has been handled: memory stays bounded
+by the nesting depth, not by the number of tests.
+
+Durations of every parsed test are kept in ``TEST_DURATIONS_PATH``
+(``{fullname: {"classname", "last", "mean", "runs"}}``) to spot slow tests
+and to estimate the cost of a test selection.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import xml.etree.ElementTree as ET
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List
+
+DURATIONS_PATH = Path(os.getenv("TEST_DURATIONS_PATH", "test_durations.json"))
+# failures kept with their message; the rest are only counted
+MAX_FAILURES = 20
+# weight of the newest run in the mean duration
+_ALPHA = 0.3
+_COUNTS = ("total", "passed", "failed", "skipped")
+_durations_lock = threading.Lock()
+
+
+@dataclass
+class TestCase:
+    fullname: str
+    classname: str
+    result: str
+    duration: float
+    message: str = ""
+
+
+@dataclass
+class Summary:
+    total: int = 0
+    passed: int = 0
+    failed: int = 0
+    skipped: int = 0
+    duration: float = 0.0
+    failures: List[TestCase] = field(default_factory=list)
+
+    def counts(self) -> Dict[str, int]:
+        return {"passed": self.passed, "failed": self.failed, "skipped": self.skipped}
+
+
+def read_counts(path: str | Path) -> Dict[str, int]:
+    """Return the totals of the ``test-run`` element without reading the cases."""
+    for _, elem in ET.iterparse(path, events=("start",)):
+        return {name: int(elem.get(name, 0)) for name in _COUNTS}
+    return dict.fromkeys(_COUNTS, 0)
+
+
+def iter_cases(path: str | Path) -> Iterator[TestCase]:
+    """Yield the ``test-case`` elements of ``path`` one by one."""
+    stack: List[ET.Element] = []
+    for event, elem in ET.iterparse(path, events=("start", "end")):
+        if event == "start":
+            stack.append(elem)
+            continue
+        stack.pop()
+        if elem.tag != "test-case":
+            continue
+        message = elem.findtext("failure/message") or ""
+        yield TestCase(
+            fullname=elem.get("fullname", elem.get("name", "")),
+            classname=elem.get("classname", ""),
+            result=elem.get("result", ""),
+            duration=float(elem.get("duration", 0) or 0),
+            message=message.strip(),
+        )
+        # the case is done; detaching it keeps the tree from growing
+        if stack:
+            stack[-1].remove(elem)
+
+
+def parse(path: str | Path, on_case: Callable[[TestCase], None] | None = None) -> Summary:
+    """Return the totals and failed cases of a result file.
+
+    ``on_case`` sees every test case while the file is streamed. The totals
+    come from the ``test-run`` attributes and are counted from the cases when
+    Unity left them out.
+    """
+    summary = Summary()
+    counted = dict.fromkeys(_COUNTS, 0)
+    for case in iter_cases(path):
+        counted["total"] += 1
+        key = {"Passed": "passed", "Failed": "failed", "Skipped": "skipped"}.get(case.result)
+        if key:
+            counted[key] += 1
+        summary.duration += case.duration
+        if case.result == "Failed" and len(summary.failures) < MAX_FAILURES:
+            summary.failures.append(case)
+        if on_case is not None:
+            on_case(case)
+    declared = read_counts(path)
+    for name in _COUNTS:
+        setattr(summary, name, declared[name] if declared["total"] else counted[name])
+    return summary
+
+
+def load_durations() -> Dict[str, dict]:
+    try:
+        return json.loads(DURATIONS_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+@contextmanager
+def recording() -> Iterator[Callable[[TestCase], None]]:
+    """Yield a callback merging one case into ``DURATIONS_PATH``.
+
+    Pass it as ``on_case`` to :func:`parse` so cases are recorded while the
+    file is streamed; the store is written once when the block ends, also
+    when parsing fails part way through a truncated file.
+    """
+    with _durations_lock:
+        data = load_durations()
+
+        def add(case: TestCase) -> None:
+            entry = data.get(case.fullname)
+            if entry is None:
+                entry = data[case.fullname] = {"classname": case.classname, "mean": case.duration, "runs": 0}
+            else:
+                entry["mean"] += _ALPHA * (case.duration - entry["mean"])
+            entry["last"] = case.duration
+            entry["runs"] += 1
+
+        try:
+            yield add
+        finally:
+            tmp = DURATIONS_PATH.with_name(DURATIONS_PATH.name + ".tmp")
+            tmp.write_text(json.dumps(data), encoding="utf-8")
+            tmp.replace(DURATIONS_PATH)
+
+
+def record_durations(cases: Iterable[TestCase]) -> None:
+    """Merge the durations of ``cases`` into ``DURATIONS_PATH``."""
+    with recording() as add:
+        for case in cases:
+            add(case)
+
+
+def slowest(limit: int = 10) -> List[tuple[str, float]]:
+    """Return ``(fullname, mean seconds)`` of the slowest recorded tests."""
+    ranked = sorted(((name, e["mean"]) for name, e in load_durations().items()), key=lambda x: x[1], reverse=True)
+    return ranked[:limit]
+
+
+def class_durations() -> Dict[str, float]:
+    """Return the mean duration of each test class (sum of its cases)."""
+    totals: Dict[str, float] = {}
+    for entry in load_durations().values():
+        totals[entry["classname"]] = totals.get(entry["classname"], 0.0) + entry["mean"]
+    return totals
@@ -0,0 +1,62 @@
+"""Reuse toolchain results within one pipeline run.
+
+Inside :func:`run_scope` (entered by ``run_all`` around each feature) an
+expensive call such as a Unity test run or a dotnet build is executed once per
+workspace state: a later call with the same arguments returns the first result
+as long as the files it depends on did not change since. Outside a scope
+every call runs as before.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import copy
+import json
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, Tuple
+
+import config
+from utils import stage_cache
+from utils.agent_journal import log_action
+
+_registry: contextvars.ContextVar[Dict[Tuple[str, str], Tuple[str, Any]] | None] = contextvars.ContextVar(
+    "run_registry", default=None
+)
+
+
+@contextmanager
+def run_scope() -> Iterator[None]:
+    """Share results between all calls made in this block (and its threads)."""
+    token = _registry.set({})
+    try:
+        yield
+    finally:
+        _registry.reset(token)
+
+
+def project_paths(project_path: str | Path | None = None) -> list[Path]:
+    """Return the Unity project directories that decide test and build results."""
+    root = Path(project_path or config.PROJECT_PATH)
+    return [root / "Assets", root / "Packages", root / "ProjectSettings"]
+
+
+def reuse(kind: str, func: Callable[..., Any], *args: Any, paths: Iterable[str | Path], **kwargs: Any) -> Any:
+    """Return ``func(*args, **kwargs)``, reusing an earlier result of this run.
+
+    The result is stored with the state of ``paths`` after the call, so a
+    call whose own side effects touched those files is still reused by the
+    next caller. Exceptions are never stored.
+    """
+    registry = _registry.get()
+    if registry is None:
+        return func(*args, **kwargs)
+    paths = list(paths)
+    key = (kind, json.dumps([args, kwargs], sort_keys=True, default=str))
+    stored = registry.get(key)
+    if stored is not None and stored[0] == stage_cache.source_state(paths):
+        log_action("RunRegistry", f"{kind} reused")
+        return copy.deepcopy(stored[1])
+    result = func(*args, **kwargs)
+    registry[key] = (stage_cache.source_state(paths), copy.deepcopy(result))
+    return result
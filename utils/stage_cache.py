@@ -0,0 +1,189 @@
+"""Persistent memoization of pipeline stages.
+
+A stage result is keyed on the stage name, its input values and the content
+of the source files/directories it depends on. A hit returns the stored
+outputs and copies the stage's artifact files back into place, so the stage
+itself is skipped.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable
+
+CACHE_DIR = Path(os.getenv("STAGE_CACHE_DIR", ".stage_cache"))
+CACHE_ENABLED = os.getenv("STAGE_CACHE", "1") != "0"
+CACHE_MAX_ENTRIES = int(os.getenv("STAGE_CACHE_MAX_ENTRIES", "500"))
+
+# directories that never influence a stage result
+_SKIP_DIRS = {".git", "Library", "Temp", "Logs", "obj", "Build", "__pycache__", ".workspaces", "_backups"}
+
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+# (path, size, mtime_ns) -> sha256 of the content, so unchanged files are read once
+_file_digests: Dict[tuple, str] = {}
+
+
+def file_digest(path: Path) -> str:
+    """Return the sha256 of ``path``; unchanged files are hashed once per process."""
+    st = path.stat()
+    memo = (str(path), st.st_size, st.st_mtime_ns)
+    with _lock:
+        digest = _file_digests.get(memo)
+    if digest is None:
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()
+        with _lock:
+            _file_digests[memo] = digest
+    return digest
+
+
+def source_state(paths: Iterable[str | Path]) -> str:
+    """Return a digest of the content of ``paths`` (files or directory trees)."""
+    h = hashlib.sha256()
+    for root in sorted(str(p) for p in paths):
+        base = Path(root)
+        if base.is_file():
+            files = [base]
+        elif base.is_dir():
+            files = []
+            for dirpath, dirnames, filenames in os.walk(base):
+                dirnames[:] = sorted(d for d in dirnames if d not in _SKIP_DIRS)
+                files.extend(Path(dirpath) / name for name in sorted(filenames))
+        else:
+            h.update(f"{base.name}:missing\n".encode("utf-8"))
+            continue
+        for path in files:
+            try:
+                digest = file_digest(path)
+            except OSError:
+                continue
+            # relative names only, so copies of a project share keys
+            name = base.name if path == base else path.relative_to(base).as_posix()
+            h.update(f"{name}:{digest}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def make_key(stage: str, inputs: Dict[str, Any], sources: Iterable[str | Path] = ()) -> str:
+    """Return the cache key for a stage run on ``inputs`` over ``sources``."""
+    payload = json.dumps(
+        {"stage": stage, "inputs": inputs, "sources": source_state(sources)},
+        ensure_ascii=False,
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _entry_dir(key: str) -> Path:
+    return CACHE_DIR / key[:2] / key
+
+
+def _bump(name: str, amount: int = 1) -> None:
+    with _lock:
+        _stats[name] += amount
+
+
+def get(key: str) -> Dict[str, Any] | None:
+    """Return the stored outputs for ``key`` and restore its artifacts, or ``None``."""
+    entry_dir = _entry_dir(key)
+    try:
+        entry = json.loads((entry_dir / "entry.json").read_text(encoding="utf-8"))
+        for rel in entry.get("artifacts", []):
+            target = Path(rel)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(entry_dir / "files" / rel, target)
+    except (OSError, ValueError):
+        _bump("misses")
+        return None
+    try:
+        # mtime doubles as the LRU timestamp
+        os.utime(entry_dir / "entry.json")
+    except OSError:
+        pass
+    _bump("hits")
+    return entry.get("outputs")
+
+
+def put(key: str, stage: str, outputs: Dict[str, Any], artifacts: Iterable[str | Path] = ()) -> None:
+    """Store ``outputs`` and copies of the ``artifacts`` files under ``key``.
+
+    Artifacts are files or directories relative to the working directory;
+    missing ones are skipped.
+    """
+    entry_dir = _entry_dir(key)
+    tmp = entry_dir.with_name(f"{key}.{os.getpid()}.{threading.get_ident()}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    stored = []
+    for rel in artifacts:
+        src = Path(rel)
+        if src.is_absolute():
+            continue
+        for path in sorted(src.rglob("*")) if src.is_dir() else [src]:
+            if not path.is_file():
+                continue
+            dest = tmp / "files" / path
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(path, dest)
+            stored.append(path.as_posix())
+    tmp.mkdir(parents=True, exist_ok=True)
+    entry = {"stage": stage, "outputs": outputs, "artifacts": stored, "created": time.time()}
+    (tmp / "entry.json").write_text(json.dumps(entry, ensure_ascii=False, default=str), encoding="utf-8")
+    shutil.rmtree(entry_dir, ignore_errors=True)
+    try:
+        os.replace(tmp, entry_dir)
+    except OSError:
+        # another process stored the same key first
+        shutil.rmtree(tmp, ignore_errors=True)
+        return
+    _bump("writes")
+    if len(_entries()) > CACHE_MAX_ENTRIES:
+        _evict()
+
+
+def _entries() -> list[Path]:
+    if not CACHE_DIR.exists():
+        return []
+    return list(CACHE_DIR.glob("*/*/entry.json"))
+
+
+def _evict() -> None:
+    """Drop least recently used entries until the size cap is respected."""
+    files = []
+    for p in _entries():
+        try:
+            files.append((p.stat().st_mtime, p.parent))
+        except OSError:
+            continue
+    files.sort()
+    removed = 0
+    for _, entry_dir in files[: max(len(files) - CACHE_MAX_ENTRIES, 0)]:
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        removed += 1
+    _bump("evictions", removed)
+
+
+def clear() -> None:
+    """Remove every cached stage result."""
+    shutil.rmtree(CACHE_DIR, ignore_errors=True)
+
+
+def stats() -> Dict[str, int]:
+    """Return hit/miss counters for the current process."""
+    with _lock:
+        return dict(_stats)
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "clear":
+        clear()
+        print(f"Cleared {CACHE_DIR}")
+    else:
+        print(json.dumps({"entries": len(_entries()), "dir": str(CACHE_DIR)}, indent=2))
@@ -0,0 +1,189 @@
+"""Declarative stage graph with a parallel scheduler.
+
+A pipeline is a list of :class:`Stage` objects. Each stage names the values
+it consumes and produces; the scheduler runs a stage as soon as its inputs
+exist, several at a time on a thread pool, and never runs stages whose
+outputs nothing needs.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Tuple
+
+from utils import stage_cache
+from utils.agent_journal import log_action
+
+if TYPE_CHECKING:
+    from utils.checkpoint import Checkpoint
+
+MAX_WORKERS = int(os.getenv("PIPELINE_WORKERS", "4"))
+
+
+@dataclass(frozen=True)
+class Stage:
+    """One step of the pipeline.
+
+    ``func`` is called with the ``inputs`` as keyword arguments and returns a
+    mapping with every name in ``outputs``. Stages sharing a name in
+    ``resources`` never run at the same time.
+
+    ``artifacts`` maps the outputs to the files the stage writes; they are
+    saved with checkpoints and restored on resume. With ``cache`` set, results
+    are also memoized in :mod:`utils.stage_cache` on the inputs plus the
+    content of ``sources``. ``cacheable`` can veto storing a particular result
+    (e.g. a failed build).
+    """
+
+    name: str
+    func: Callable[..., Dict[str, Any] | None]
+    inputs: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+    resources: Tuple[str, ...] = ()
+    cache: bool = False
+    sources: Tuple[str, ...] = ()
+    artifacts: Callable[[Dict[str, Any]], Iterable[str]] | None = None
+    cacheable: Callable[[Dict[str, Any]], bool] | None = None
+
+
+def plan(stages: Iterable[Stage], targets: Iterable[str] | None = None, provided: Iterable[str] = ()) -> List[Stage]:
+    """Return the stages needed for ``targets`` in dependency order.
+
+    Without ``targets`` every output is wanted. Values in ``provided`` are
+    taken as given. Ties keep the declaration order.
+    """
+    stages = list(stages)
+    provided = set(provided)
+    producers: Dict[str, Stage] = {}
+    for stage in stages:
+        for name in stage.outputs:
+            if name in producers:
+                raise ValueError(f"'{name}' is produced by both {producers[name].name} and {stage.name}")
+            producers[name] = stage
+    wanted = list(producers) if targets is None else list(targets)
+
+    needed: Dict[str, Stage] = {}
+    stack = []
+    for name in wanted:
+        if name in provided:
+            continue
+        if name not in producers:
+            raise ValueError(f"no stage produces '{name}'")
+        stack.append(producers[name])
+    while stack:
+        stage = stack.pop()
+        if stage.name in needed:
+            continue
+        needed[stage.name] = stage
+        for name in stage.inputs:
+            if name in provided:
+                continue
+            if name not in producers:
+                raise ValueError(f"stage {stage.name} needs '{name}' but nothing produces it")
+            stack.append(producers[name])
+
+    order: List[Stage] = []
+    available = set(provided)
+    remaining = [s for s in stages if s.name in needed]
+    while remaining:
+        ready = [s for s in remaining if available.issuperset(s.inputs)]
+        if not ready:
+            raise ValueError("dependency cycle between " + ", ".join(s.name for s in remaining))
+        for stage in ready:
+            order.append(stage)
+            available.update(stage.outputs)
+            remaining.remove(stage)
+    return order
+
+
+def _call(stage: Stage, kwargs: Dict[str, Any], checkpoint: Checkpoint | None = None) -> Dict[str, Any]:
+    if checkpoint is None:
+        return _run(stage, kwargs)
+    checkpoint.mark(stage.name, "running")
+    try:
+        outputs = _run(stage, kwargs)
+    except BaseException:
+        checkpoint.mark(stage.name, "failed")
+        raise
+    checkpoint.save(stage.name, outputs, stage.artifacts(outputs) if stage.artifacts else (), kwargs)
+    return outputs
+
+
+def _run(stage: Stage, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    start = time.perf_counter()
+    key = None
+    if stage.cache and stage_cache.CACHE_ENABLED:
+        key = stage_cache.make_key(stage.name, kwargs, stage.sources)
+        cached = stage_cache.get(key)
+        if cached is not None and all(name in cached for name in stage.outputs):
+            log_action("StageGraph", f"{stage.name} restored from cache")
+            return {name: cached[name] for name in stage.outputs}
+    result = stage.func(**kwargs) or {}
+    missing = [name for name in stage.outputs if name not in result]
+    if missing:
+        raise RuntimeError(f"stage {stage.name} did not produce {', '.join(missing)}")
+    outputs = {name: result[name] for name in stage.outputs}
+    if key is not None and (stage.cacheable is None or stage.cacheable(outputs)):
+        stage_cache.put(key, stage.name, outputs, stage.artifacts(outputs) if stage.artifacts else ())
+    log_action("StageGraph", f"{stage.name} done in {time.perf_counter() - start:.2f}s")
+    return outputs
+
+
+def run_stages(
+    stages: Iterable[Stage],
+    values: Dict[str, Any] | None = None,
+    targets: Iterable[str] | None = None,
+    max_workers: int | None = None,
+    checkpoint: Checkpoint | None = None,
+) -> Dict[str, Any]:
+    """Execute the stages needed for ``targets`` and return all values.
+
+    Ready stages run concurrently (each in a copy of the caller's context, so
+    ``call_context`` tags carry over). After the first failure nothing new is
+    started; running stages are awaited and the error is re-raised. With a
+    ``checkpoint``, stages completed earlier on the same inputs are restored
+    instead of run, and every finished stage is saved.
+    """
+    stages = list(stages)
+    values = dict(values or {})
+    pending = plan(stages, targets, values)
+    for stage in stages:
+        if stage not in pending:
+            log_action("StageGraph", f"skip {stage.name}: outputs not consumed")
+
+    running: Dict[Future, Stage] = {}
+    busy: set[str] = set()
+    error: BaseException | None = None
+    with ThreadPoolExecutor(max_workers=max_workers or MAX_WORKERS, thread_name_prefix="stage") as pool:
+        while pending or running:
+            if error is None:
+                for stage in list(pending):
+                    if all(name in values for name in stage.inputs) and busy.isdisjoint(stage.resources):
+                        pending.remove(stage)
+                        busy.update(stage.resources)
+                        kwargs = {name: values[name] for name in stage.inputs}
+                        restored = checkpoint.restore(stage.name, kwargs) if checkpoint else None
+                        if restored is not None and all(name in restored for name in stage.outputs):
+                            log_action("StageGraph", f"{stage.name} resumed from checkpoint")
+                            busy.difference_update(stage.resources)
+                            values.update({name: restored[name] for name in stage.outputs})
+                            continue
+                        ctx = contextvars.copy_context()
+                        running[pool.submit(ctx.run, _call, stage, kwargs, checkpoint)] = stage
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                busy.difference_update(stage.resources)
+                try:
+                    values.update(future.result())
+                except BaseException as e:  # noqa: BLE001 - SystemExit from a stage is re-raised below
+                    error = error or e
+    if error is not None:
+        raise error
+    return values
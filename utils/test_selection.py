@@ -0,0 +1,219 @@
+"""Pick the Unity tests affected by the files changed since the last green run.
+
+The dependency map links every C# script to test classes through
+
+* the generated naming (``Foo.cs`` -> ``Test_Foo_Logic``/``Test_Foo_Behaviour``),
+* ``project_map.json`` (scripts and tests listed for the same feature),
+* asmdef references (test assemblies referencing the script's assembly),
+  used when the first two find nothing.
+
+:func:`select` compares the project with the state recorded by
+:func:`record` after the last passing run and returns a ``-testFilter``.
+Anything it cannot map (deleted scripts, packages, settings, scenes, a
+script outside any assembly) and the scheduled full run fall back to the
+whole suite.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Set
+
+from utils import nunit_results, stage_cache
+
+ENABLED = os.getenv("TEST_SELECTION", "0") == "1"
+STATE_PATH = Path(os.getenv("TEST_SELECTION_STATE", ".test_selection.json"))
+# every N-th run, or after this many hours, runs the full suite anyway
+FULL_RUN_EVERY = int(os.getenv("TEST_FULL_RUN_EVERY", "10"))
+FULL_RUN_HOURS = float(os.getenv("TEST_FULL_RUN_HOURS", "24"))
+PROJECT_MAP = Path("project_map.json")
+
+# inputs whose effect on tests cannot be traced to single classes
+_GLOBAL_DIRS = ("Packages", "ProjectSettings")
+_SKIP_SUFFIXES = {".meta", ".md", ".txt"}
+
+
+@dataclass
+class Selection:
+    """Outcome of :func:`select`; ``tests`` is empty for a full run."""
+
+    project: str
+    full: bool
+    reason: str
+    tests: List[str] = field(default_factory=list)
+    state: Dict[str, str] = field(default_factory=dict)
+    # expected run time from the recorded test durations
+    seconds: float = 0.0
+
+    @property
+    def filter(self) -> str | None:
+        """Value for Unity's ``-testFilter`` or ``None`` for the full suite."""
+        return None if self.full else ";".join(self.tests)
+
+
+def _namespace(text: str) -> str:
+    match = re.search(r"namespace\s+([\w.]+)", text)
+    return match.group(1) if match else ""
+
+
+def _classes(path: Path) -> List[str]:
+    """Return the full names of the classes declared in a C# file."""
+    text = path.read_text(encoding="utf-8", errors="ignore")
+    ns = _namespace(text)
+    return [f"{ns}.{name}" if ns else name for name in re.findall(r"\bclass\s+(\w+)", text)]
+
+
+def _asmdefs(project: Path) -> Dict[Path, dict]:
+    found = {}
+    for path in (project / "Assets").rglob("*.asmdef"):
+        try:
+            found[path.parent] = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+    return found
+
+
+def _is_test_assembly(asmdef: dict) -> bool:
+    if asmdef.get("testAssemblies"):
+        return True
+    if "UnityEngine.TestRunner" in asmdef.get("references", []):
+        return True
+    return "TestAssemblies" in asmdef.get("optionalUnityReferences", [])
+
+
+def _owner(path: Path, asmdefs: Dict[Path, dict]) -> Path | None:
+    """Return the directory of the asmdef that compiles ``path``."""
+    for parent in path.parents:
+        if parent in asmdefs:
+            return parent
+    return None
+
+
+def _is_test_file(rel: Path, owner: Path | None, asmdefs: Dict[Path, dict]) -> bool:
+    return "Tests" in rel.parts or (owner is not None and _is_test_assembly(asmdefs[owner]))
+
+
+def build_map(project_path: str | Path) -> Dict[str, Set[str]]:
+    """Return ``{script path relative to the project: {test class full names}}``.
+
+    Test files map to their own classes.
+    """
+    project = Path(project_path)
+    asmdefs = _asmdefs(project)
+    tests: Dict[str, List[str]] = {}
+    scripts: List[Path] = []
+    for path in sorted((project / "Assets").rglob("*.cs")):
+        rel = path.relative_to(project)
+        owner = _owner(path, asmdefs)
+        if _is_test_file(rel, owner, asmdefs):
+            tests[rel.as_posix()] = _classes(path)
+        else:
+            scripts.append(rel)
+
+    deps: Dict[str, Set[str]] = {rel: set(classes) for rel, classes in tests.items()}
+    all_tests = [(rel, name) for rel, classes in tests.items() for name in classes]
+    for rel in scripts:
+        stem = rel.stem
+        deps[rel.as_posix()] = {
+            name for _, name in all_tests if re.fullmatch(rf"Test_{re.escape(stem)}(_\w+)?", name.rsplit(".", 1)[-1])
+        }
+
+    # scripts and tests generated for the same feature belong together
+    try:
+        features = json.loads(PROJECT_MAP.read_text(encoding="utf-8")).get("features", {})
+    except (OSError, ValueError):
+        features = {}
+    by_name = {Path(rel).name: rel for rel in deps}
+    for info in features.values():
+        files = [by_name.get(Path(f).name) for f in info.get("files", [])]
+        feature_tests = {name for f in files if f in tests for name in tests[f]}
+        for f in files:
+            if f and f not in tests:
+                deps[f] |= feature_tests
+
+    # otherwise every test assembly that references the script's assembly
+    test_dirs = {d: a for d, a in asmdefs.items() if _is_test_assembly(a)}
+    for rel in scripts:
+        key = rel.as_posix()
+        owner = _owner(project / rel, asmdefs)
+        if deps[key] or owner is None:
+            continue
+        name = asmdefs[owner].get("name")
+        for test_dir, asmdef in test_dirs.items():
+            if name in asmdef.get("references", []):
+                deps[key] |= {
+                    cls for t, classes in tests.items() if (project / t).is_relative_to(test_dir) for cls in classes
+                }
+    return deps
+
+
+def _snapshot(project: Path) -> Dict[str, str]:
+    """Digest of every file that can influence test results."""
+    state = {}
+    for sub in ("Assets", *_GLOBAL_DIRS):
+        for path in (project / sub).rglob("*") if (project / sub).exists() else []:
+            if path.is_file() and path.suffix not in _SKIP_SUFFIXES:
+                state[path.relative_to(project).as_posix()] = stage_cache.file_digest(path)
+    return state
+
+
+def _load_state() -> Dict[str, dict]:
+    try:
+        return json.loads(STATE_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def select(project_path: str | Path) -> Selection:
+    """Return the tests to run for the changes since the last recorded run."""
+    project = Path(project_path).resolve()
+    key = str(project)
+    current = _snapshot(project)
+    previous = _load_state().get(key)
+
+    def full(reason: str) -> Selection:
+        return Selection(key, True, reason, state=current, seconds=sum(nunit_results.class_durations().values()))
+
+    if not previous:
+        return full("no baseline")
+    if previous.get("runs_since_full", 0) + 1 >= FULL_RUN_EVERY:
+        return full(f"scheduled: every {FULL_RUN_EVERY} runs")
+    if time.time() - previous.get("last_full", 0) >= FULL_RUN_HOURS * 3600:
+        return full(f"scheduled: older than {FULL_RUN_HOURS:g}h")
+
+    before = previous.get("files", {})
+    changed = sorted(rel for rel in current.keys() | before.keys() if current.get(rel) != before.get(rel))
+    if not changed:
+        return full("no changes since the last run")
+    deps = build_map(project)
+    tests: Set[str] = set()
+    for rel in changed:
+        if rel not in current:
+            return full(f"{rel} was deleted")
+        if not rel.endswith(".cs"):
+            return full(f"{rel} is not a script")
+        if not deps.get(rel):
+            return full(f"no tests mapped to {rel}")
+        tests |= deps[rel]
+    durations = nunit_results.class_durations()
+    seconds = sum(durations.get(name, 0.0) for name in tests)
+    return Selection(key, False, f"{len(changed)} changed file(s)", sorted(tests), current, seconds)
+
+
+def record(selection: Selection) -> None:
+    """Remember the project state after a passing run of ``selection``."""
+    data = _load_state()
+    previous = data.get(selection.project) or {}
+    data[selection.project] = {
+        "files": selection.state,
+        "last_full": time.time() if selection.full else previous.get("last_full", 0),
+        "runs_since_full": 0 if selection.full else previous.get("runs_since_full", 0) + 1,
+    }
+    tmp = STATE_PATH.with_name(STATE_PATH.name + ".tmp")
+    tmp.write_text(json.dumps(data), encoding="utf-8")
+    tmp.replace(STATE_PATH)
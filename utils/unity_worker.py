@@ -0,0 +1,203 @@
+"""Long-lived Unity editor that runs test and build jobs.
+
+With ``UNITY_WORKER=1`` the tester and build agents hand their work to a
+batchmode editor started once per project instead of cold-starting Unity
+with ``-quit`` for every call. The editor runs
+``AIUnityStudio.Editor.AIStudioWorker.Run`` (``Assets/Editor/AIStudio``,
+copied into the project on first use) and talks to this module through
+files in ``<UNITY_WORKER_DIR>/<project hash>/``:
+
+* ``jobs/<id>.json`` -- a job written by the client (``tests``, ``build``,
+  ``shutdown``);
+* ``done/<id>.json`` -- ``{"id", "returncode", "log"}`` written by the editor;
+* ``heartbeat`` -- unix time, refreshed by the editor while it is idle.
+
+An editor that exited or stopped beating is restarted before the next job,
+and every ``UNITY_WORKER_MAX_JOBS`` jobs it is recycled to bound leaks.
+"""
+
+from __future__ import annotations
+
+import atexit
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict
+
+import config
+from utils.agent_journal import log_action
+
+WORKER_ENABLED = os.getenv("UNITY_WORKER", "0") == "1"
+WORKER_DIR = Path(os.getenv("UNITY_WORKER_DIR", ".unity_worker"))
+MAX_JOBS = int(os.getenv("UNITY_WORKER_MAX_JOBS", "20"))
+START_TIMEOUT = float(os.getenv("UNITY_WORKER_START_TIMEOUT", "600"))
+HEARTBEAT_TIMEOUT = float(os.getenv("UNITY_WORKER_HEARTBEAT_TIMEOUT", "120"))
+JOB_TIMEOUT = float(os.getenv("UNITY_WORKER_JOB_TIMEOUT", "3600"))
+
+EXECUTE_METHOD = "AIUnityStudio.Editor.AIStudioWorker.Run"
+EDITOR_SCRIPT = Path(__file__).resolve().parents[1] / "Assets" / "Editor" / "AIStudio" / "AIStudioWorker.cs"
+_POLL = 0.05
+
+_workers: Dict[str, "UnityWorker"] = {}
+_workers_lock = threading.Lock()
+
+
+class UnityWorker:
+    """One batchmode editor bound to a project; jobs run one at a time."""
+
+    def __init__(self, project_path: str | Path, directory: str | Path | None = None) -> None:
+        self.project = Path(project_path).resolve()
+        digest = hashlib.sha1(str(self.project).encode("utf-8")).hexdigest()[:12]
+        self.directory = Path(directory or WORKER_DIR / digest).resolve()
+        self.proc: subprocess.Popen | None = None
+        self._stderr = None
+        self.jobs_done = 0
+        self._lock = threading.Lock()
+
+    # lifecycle
+    def start(self) -> None:
+        install_editor_script(self.project)
+        shutil.rmtree(self.directory, ignore_errors=True)
+        (self.directory / "jobs").mkdir(parents=True)
+        (self.directory / "done").mkdir()
+        cmd = [
+            config.UNITY_CLI,
+            "-batchmode",
+            "-projectPath",
+            str(self.project),
+            "-executeMethod",
+            EXECUTE_METHOD,
+            "-workerDir",
+            str(self.directory),
+            "-logFile",
+            str(self.directory / "editor.log"),
+        ]
+        self._stderr = (self.directory / "stderr.log").open("w", encoding="utf-8")
+        self.proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=self._stderr)
+        self.jobs_done = 0
+        deadline = time.monotonic() + START_TIMEOUT
+        while self._heartbeat() is None:
+            if self.proc.poll() is not None:
+                raise RuntimeError(f"Unity worker exited with {self.proc.returncode} during startup")
+            if time.monotonic() > deadline:
+                self.kill()
+                raise RuntimeError(f"Unity worker did not start within {START_TIMEOUT:g}s")
+            time.sleep(_POLL)
+        log_action("UnityWorker", f"started for {self.project}")
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """Ask the editor to exit; kill it if it does not."""
+        if self.proc is None or self.proc.poll() is not None:
+            self.kill()
+            return
+        try:
+            self._wait(self._post({"kind": "shutdown"}), timeout)
+            self.proc.wait(timeout)
+        except (RuntimeError, subprocess.TimeoutExpired):
+            pass
+        self.kill()
+
+    def kill(self) -> None:
+        if self.proc is not None and self.proc.poll() is None:
+            self.proc.kill()
+            self.proc.wait()
+        self.proc = None
+        if self._stderr is not None:
+            self._stderr.close()
+            self._stderr = None
+
+    # health
+    def _heartbeat(self) -> float | None:
+        try:
+            return float((self.directory / "heartbeat").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def healthy(self) -> bool:
+        """True if the editor runs and beat within ``HEARTBEAT_TIMEOUT``."""
+        if self.proc is None or self.proc.poll() is not None:
+            return False
+        beat = self._heartbeat()
+        return beat is not None and time.time() - beat < HEARTBEAT_TIMEOUT
+
+    # jobs
+    def _post(self, job: Dict[str, Any]) -> str:
+        job_id = uuid.uuid4().hex
+        tmp = self.directory / "jobs" / f"{job_id}.json.tmp"
+        tmp.write_text(json.dumps({"id": job_id, **job}), encoding="utf-8")
+        tmp.replace(tmp.with_suffix(""))
+        return job_id
+
+    def _wait(self, job_id: str, timeout: float) -> Dict[str, Any]:
+        done = self.directory / "done" / f"{job_id}.json"
+        deadline = time.monotonic() + timeout
+        while not done.exists():
+            if self.proc is None or self.proc.poll() is not None:
+                raise RuntimeError("Unity worker exited while running a job")
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Unity worker job timed out after {timeout:g}s")
+            time.sleep(_POLL)
+        result = json.loads(done.read_text(encoding="utf-8"))
+        done.unlink()
+        return result
+
+    def submit(self, kind: str, timeout: float | None = None, **args: Any) -> Dict[str, Any]:
+        """Run one job and return ``{"returncode", "log"}``."""
+        with self._lock:
+            if self.jobs_done >= MAX_JOBS:
+                log_action("UnityWorker", f"recycling after {self.jobs_done} jobs")
+                self.stop()
+            if not self.healthy():
+                if self.proc is not None:
+                    log_action("UnityWorker", "unhealthy, restarting")
+                self.kill()
+                self.start()
+            try:
+                result = self._wait(self._post({"kind": kind, **args}), timeout or JOB_TIMEOUT)
+            except RuntimeError:
+                # a hung or dead editor is replaced on the next job
+                self.kill()
+                raise
+            self.jobs_done += 1
+            return result
+
+
+def install_editor_script(project_path: str | Path) -> None:
+    """Copy the worker editor script into the project if it is missing or stale."""
+    target = Path(project_path) / "Assets" / "Editor" / "AIStudio" / EDITOR_SCRIPT.name
+    source = EDITOR_SCRIPT.read_bytes()
+    if not target.exists() or target.read_bytes() != source:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(source)
+
+
+def get_worker(project_path: str | Path) -> UnityWorker:
+    """Return the shared worker of ``project_path``."""
+    key = str(Path(project_path).resolve())
+    with _workers_lock:
+        worker = _workers.get(key)
+        if worker is None:
+            worker = _workers[key] = UnityWorker(key)
+        return worker
+
+
+def submit(project_path: str | Path, kind: str, **args: Any) -> Dict[str, Any]:
+    return get_worker(project_path).submit(kind, **args)
+
+
+def shutdown() -> None:
+    """Stop every worker started by this process."""
+    with _workers_lock:
+        workers = list(_workers.values())
+        _workers.clear()
+    for worker in workers:
+        worker.stop()
+
+
+atexit.register(shutdown)